@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, Header
-from auth.firebase_auth import verify_token
+from firebase_auth import verify_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -0,0 +1,100 @@
+"""
+Concurrent signup-style writes and profile reads against SQLite: the previous engine
+(default rollback journal, no pragmas) vs the tuned one from database.py (WAL,
+synchronous=NORMAL, busy_timeout, pooled connections), plus async reads via aiosqlite.
+
+    cd backend
+    python benchmarks/bench_database.py --threads 16 --ops 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+import database  # noqa: E402
+
+metadata = MetaData()
+users = Table(
+    "bench_users", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String, unique=True, index=True, nullable=False),
+    Column("email", String, nullable=False),
+)
+
+
+def run(label: str, engine, threads: int, ops: int):
+    metadata.create_all(engine)
+    errors = []
+    counts = {"writes": 0, "reads": 0}
+    lock = threading.Lock()
+
+    def worker(index):
+        for op in range(ops):
+            try:
+                with engine.begin() as conn:
+                    if op % 4 == 0:
+                        conn.execute(insert(users).values(username=f"{label}-{index}-{op}", email=f"{index}-{op}@example.com"))
+                        kind = "writes"
+                    else:
+                        conn.execute(select(users).where(users.c.username == f"{label}-{index}-0")).first()
+                        kind = "reads"
+                with lock:
+                    counts[kind] += 1
+            except OperationalError as e:
+                errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<8} {counts['writes'] / elapsed:8.0f} writes/s {counts['reads'] / elapsed:9.0f} reads/s "
+          f"{len(errors):4d} 'database is locked' errors")
+    engine.dispose()
+
+
+async def run_async(url: str, concurrency: int, ops: int):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(database.async_url(url), **database.engine_options(url))
+
+    async def reader(index):
+        for _ in range(ops):
+            async with engine.connect() as conn:
+                await conn.execute(select(users).where(users.c.username == f"tuned-{index}-0"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reader(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"{'async':<8} {'':>17} {concurrency * ops / elapsed:9.0f} reads/s (aiosqlite)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    before_url = "sqlite:///" + os.path.join(directory, "before.db")
+    after_url = "sqlite:///" + os.path.join(directory, "after.db")
+    print(f"{args.threads} threads x {args.ops} operations (1 write : 3 reads)")
+    run("before", create_engine(before_url, connect_args={"check_same_thread": False}), args.threads, args.ops)
+    run("tuned", database.create_db_engine(after_url), args.threads, args.ops)
+    try:
+        import aiosqlite  # noqa: F401
+    except ImportError:
+        print("aiosqlite not installed; skipping the async run")
+    else:
+        asyncio.run(run_async(after_url, args.threads, args.ops))
@@ -0,0 +1,77 @@
+"""
+Login storm benchmark: bcrypt verification inline in request threads (before) vs on
+the dedicated hashing process pool (after).
+
+While CONCURRENCY threads verify passwords as fast as they can, a probe thread runs a
+small CPU-bound task (standing in for itinerary traffic) and records its latency.
+
+    cd backend
+    python benchmarks/bench_password_hashing.py --seconds 10 --rounds 12
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.passwords import PasswordHasher, hash_password  # noqa: E402
+
+PROBE_PAYLOAD = {"hotels": [{"name": f"Hotel {i}", "rating": 4.2, "tags": ["wifi", "pool"]} for i in range(300)]}
+
+
+def run(label: str, verify, hashed: str, seconds: float, concurrency: int, cores: int):
+    stop = threading.Event()
+    logins = [0] * concurrency
+    probe_latencies = []
+
+    def storm(index):
+        while not stop.is_set():
+            verify("correct horse", hashed)
+            logins[index] += 1
+
+    def probe():
+        while not stop.is_set():
+            started = time.perf_counter()
+            json.dumps(PROBE_PAYLOAD)
+            probe_latencies.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=storm, args=(i,)) for i in range(concurrency)]
+    threads.append(threading.Thread(target=probe))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    rate = sum(logins) / seconds
+    probe_latencies.sort()
+    p99 = probe_latencies[int(len(probe_latencies) * 0.99) - 1]
+    print(f"{label:<28} {rate:8.1f} logins/s  {rate / cores:8.1f} per core  "
+          f"probe p50 {statistics.median(probe_latencies) * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=40, help="request threads (anyio's default is 40)")
+    parser.add_argument("--workers", type=int, default=2, help="hashing processes for the 'after' run")
+    args = parser.parse_args()
+    cpu_count = os.cpu_count() or 1
+
+    hashed = hash_password("correct horse", args.rounds)
+    inline = PasswordHasher(workers=0, max_pending=args.concurrency, rounds=args.rounds)
+    pooled = PasswordHasher(workers=args.workers, max_pending=args.concurrency, rounds=args.rounds)
+    pooled.verify("warm up", hash_password("warm up", 4))
+
+    print(f"bcrypt cost {args.rounds}, {args.concurrency} request threads, {cpu_count} CPU(s)")
+    run("before: inline", inline.verify, hashed, args.seconds, args.concurrency, cpu_count)
+    run(f"after: pool ({args.workers} procs)", pooled.verify, hashed, args.seconds, args.concurrency,
+        min(args.workers, cpu_count))
+    pooled.shutdown()
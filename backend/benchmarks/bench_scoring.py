@@ -0,0 +1,75 @@
+"""
+Hotel scoring benchmark: one batched NumPy pass over N candidates vs scoring each
+candidate dict in Python (what a per-hotel loop would cost).
+
+Building the column arrays (Candidates) happens once per candidate list; the score
+pass is what runs per request preference set.
+
+    cd backend
+    python benchmarks/bench_scoring.py --candidates 5000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.scoring import Candidates, Preferences, score_hotels  # noqa: E402
+
+AMENITIES = ["WIFI", "SWIMMING_POOL", "ELEVATOR", "WHEELCHAIR_ACCESSIBLE", "ROOM_SERVICE", "BABY-SITTING", "SPA"]
+POIS = [{"coordinates": {"latitude": 15.55 + i * 0.01, "longitude": 73.75 + i * 0.01}} for i in range(6)]
+
+
+def make_hotels(n: int):
+    rng = random.Random(7)
+    return [{
+        "name": f"Hotel {i}",
+        "pricePerNight": rng.uniform(800, 9000),
+        "rating": rng.choice([3, 3.5, 4, 4.5, 5]),
+        "latitude": 15.3 + rng.random() * 0.5,
+        "longitude": 73.7 + rng.random() * 0.3,
+        "amenities": rng.sample(AMENITIES, 3),
+    } for i in range(n)]
+
+
+def python_score(hotel, budget):
+    price = 1.0 if hotel["pricePerNight"] <= budget else math.exp(-3 * (hotel["pricePerNight"] / budget - 1))
+    distances = []
+    for poi in POIS:
+        lat1, lon1 = math.radians(hotel["latitude"]), math.radians(hotel["longitude"])
+        lat2, lon2 = math.radians(poi["coordinates"]["latitude"]), math.radians(poi["coordinates"]["longitude"])
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        distances.append(2 * 6371 * math.asin(math.sqrt(a)))
+    access = any("WHEELCHAIR" in a or "ELEVATOR" in a for a in hotel["amenities"])
+    return 0.35 * price + 0.25 * hotel["rating"] / 5 + 0.2 * access + 0.1 * math.exp(-sum(distances) / len(distances) / 5)
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    hotels = make_hotels(args.candidates)
+    preferences = Preferences.for_trip(60000, 2, 5, "Veg", ["Wheelchair Access"], POIS)
+    build = best_of(lambda: Candidates.hotels(hotels), 5)
+    candidates = Candidates.hotels(hotels)
+    batched = best_of(lambda: score_hotels(candidates, preferences), args.repeat)
+    looped = best_of(lambda: [python_score(h, preferences.nightly_budget) for h in hotels], 5)
+
+    print(f"{args.candidates} candidates")
+    print(f"  build arrays      {build * 1000:8.3f} ms (once per candidate list)")
+    print(f"  batched score     {batched * 1000:8.3f} ms")
+    print(f"  per-hotel Python  {looped * 1000:8.3f} ms")
@@ -1,18 +1,110 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import declarative_base, sessionmaker
 import os
+import threading
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-SQLALCHEMY_DATABASE_URL = "sqlite:///" + os.path.join(BASE_DIR, "dreamdestiny.db")
+# Any SQLAlchemy URL; SQLite by default, a server database can be swapped in via DATABASE_URL
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL") or "sqlite:///" + os.path.join(BASE_DIR, "dreamdestiny.db")
+# Async URL for async handlers (derived from DATABASE_URL when unset)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Connections per worker process: enough for the request threadpool's concurrent DB users
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# SQLite tuning: WAL lets readers run alongside the single writer
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """Per-connection SQLite settings (journal_mode=WAL persists in the file itself)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def engine_options(url: str) -> dict:
+    options = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+    if _is_sqlite(url):
+        if make_url(url).database in (None, "", ":memory:"):
+            # In-memory databases keep SQLAlchemy's default (per-thread) pool
+            return {"connect_args": {"check_same_thread": False}}
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    else:
+        options.update(pool_pre_ping=True, pool_recycle=1800)
+    return options
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL):
+    engine = create_engine(url, **engine_options(url))
+    if _is_sqlite(url):
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+def async_url(url: str) -> str:
+    """The async-driver form of a database URL (sqlite:// -> sqlite+aiosqlite://)"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for {parsed.get_backend_name()}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Pooled connections must not be shared with forked workers (gunicorn preloads the app)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+_async_engine = None
+_async_session_factory = None
+_async_lock = threading.Lock()
+
+def get_async_engine():
+    """Async engine on the same database (needs aiosqlite for SQLite); created on first use"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _async_lock:
+            if _async_engine is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+                url = ASYNC_DATABASE_URL or async_url(SQLALCHEMY_DATABASE_URL)
+                async_engine = create_async_engine(url, **engine_options(url))
+                if _is_sqlite(url):
+                    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+                _async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+                _async_engine = async_engine
+    return _async_engine
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_session_factory()
+
+async def get_async_db():
+    """Dependency for async handlers, the counterpart of get_db()"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def init_db():
+    """Create missing tables (call once at startup after importing the models)"""
+    Base.metadata.create_all(bind=engine)
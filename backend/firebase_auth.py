@@ -1,14 +1,64 @@
-import firebase_admin
-from firebase_admin import credentials, auth
+import os
+import threading
+
+import requests
 from fastapi import HTTPException
 
-# Initialize Firebase Admin SDK (only once)
-cred = credentials.Certificate("dreamdestiny-firebase-adminsdk.json")
-firebase_admin.initialize_app(cred)
+from services.firebase_tokens import FirebaseTokenVerifier, InvalidIdToken, project_id_from_credentials
+
+FIREBASE_CREDENTIALS = os.getenv("FIREBASE_CREDENTIALS", "dreamdestiny-firebase-adminsdk.json")
+# Needed for local verification; read from the service-account file when unset
+FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID", "")
+
+_firebase_app = None
+_firebase_lock = threading.Lock()
+_verifier = None
+_verifier_lock = threading.Lock()
+
+def get_firebase_app():
+    """Initialize the Firebase Admin SDK on first use (only once per process)"""
+    global _firebase_app
+    if _firebase_app is None:
+        with _firebase_lock:
+            if _firebase_app is None:
+                import firebase_admin
+                from firebase_admin import credentials
+                cred = credentials.Certificate(FIREBASE_CREDENTIALS)
+                _firebase_app = firebase_admin.initialize_app(cred)
+    return _firebase_app
+
+def get_token_verifier():
+    """Local ID-token verifier, or None when the project id is unknown (Admin SDK fallback)"""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                project_id = FIREBASE_PROJECT_ID or project_id_from_credentials(FIREBASE_CREDENTIALS)
+                _verifier = FirebaseTokenVerifier(project_id) if project_id else False
+    return _verifier or None
+
+def warm_up():
+    """Load Google's signing keys and start their refresh thread before the first request"""
+    verifier = get_token_verifier()
+    if verifier is not None:
+        verifier.keys.refresh()
+        verifier.keys.start()
+    return verifier
 
 def verify_token(id_token: str):
+    verifier = get_token_verifier()
+    if verifier is not None:
+        try:
+            return verifier.verify(id_token)
+        except InvalidIdToken:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        except requests.RequestException:
+            raise HTTPException(status_code=503, detail="Token signing keys unavailable")
+
+    from firebase_admin import auth
+    app = get_firebase_app()
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        decoded_token = auth.verify_id_token(id_token, app=app)
         return decoded_token
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -0,0 +1,60 @@
+"""
+Gunicorn settings for production (used by `python start_server.py --prod`, or picked
+up automatically by `gunicorn main:app` run from the backend directory).
+
+Workers are uvicorn (uvloop + httptools when installed). The app is imported once in
+the master before forking so read-only data (station tables, fare tables, the
+in-memory React build) is shared copy-on-write between workers.
+
+Metrics (GET /metrics) are kept per worker: a scrape sees only the worker that answered
+it, so each worker must be scraped separately (one worker per port/container, each a
+Prometheus target) to get totals.
+
+Signals: HUP restarts workers gracefully (new code requires a full restart because of
+preload), TERM drains in-flight requests for up to graceful_timeout seconds.
+"""
+import gc
+import os
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    """One event-loop worker per available core"""
+    return max(1, _cpu_count())
+
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "0") or 0) or default_workers()
+
+try:
+    import uvicorn_worker  # noqa: F401
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+preload_app = True
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+# Recycle workers now and then so slow leaks cannot accumulate
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+accesslog = None
+errorlog = "-"
+
+
+def when_ready(server):
+    # The app is preloaded at this point: build the remaining shared state in the master
+    import main
+    main.services.create_all()
+    # Move everything allocated so far out of the GC's reach, so collections in the
+    # workers do not touch (and copy) the shared pages
+    gc.freeze()
+    server.log.info(f"Preloaded app; starting {workers} {worker_class} worker(s) on {bind}")
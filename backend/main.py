@@ -1,14 +1,38 @@
-from fastapi import FastAPI, HTTPException, APIRouter
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import requests
 import os
 from dotenv import load_dotenv
-from services.amadeus_service import AmadeusService
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-
+# Before the services imports: their settings are read from the environment at import time
 load_dotenv()
+from services.container import services, SERVICE_WARMUP
+from services.runtime import run_blocking, loop_monitor, LoopStallMiddleware
+from services.logging_setup import configure_logging, RequestContextMiddleware
+from services.metrics import registry, upstream_call, MetricsMiddleware, AMADEUS_MOCK_MODE, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from services.tracing import span, TracingMiddleware
+from services.static_assets import StaticAssets, StaticAssetsApp
+from services.responses import FastJSONResponse, CompressionMiddleware, dumps
+from services.cache import cache_stats
+from services.scoring import Preferences, rank_hotels
+from services.budget import BudgetPlan, optimize as optimize_budget
+from services.day_planner import plan_days, format_skeleton
+from services.jobs import job_queue, PermanentJobError, JOB_POLL_INTERVAL, FINISHED as JOB_FINISHED
+from database import init_db
+from routers.auth import router as auth_router
+from routers.users import router as users_router
+from routers.itineraries import router as itineraries_router
+import asyncio
+import logging
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+
+# Structured, queue-backed logging (JSON lines written by a background thread)
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 api = APIRouter(prefix="/api")
@@ -20,13 +44,73 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip/brotli for large API responses (the static build is already precompressed)
+app.add_middleware(CompressionMiddleware)
+# Tag request tasks so event-loop stalls can be traced to an endpoint
+app.add_middleware(LoopStallMiddleware)
+# Root span per request (inside the request-id middleware, so traces carry the id)
+app.add_middleware(TracingMiddleware)
+# Request id / endpoint correlation for every log record
+app.add_middleware(RequestContextMiddleware)
+# Per-route latency, status and in-flight metrics (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    loop_monitor.stop()
+
+@app.on_event("startup")
+async def create_tables():
+    # Adds tables introduced since the database was created (e.g. itineraries)
+    await run_blocking(init_db)
+
+@app.on_event("startup")
+async def start_job_workers():
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await run_blocking(job_queue.stop)
+
+# Heavy services (Amadeus + Indian Rail tables, the React build) are created on first
+# use or by the warm-up below, not at import
+def _create_amadeus_service():
+    from services.amadeus_service import AmadeusService
+    return AmadeusService()
+
+services.register("amadeus", _create_amadeus_service)
+
+def _warm_up_firebase_keys():
+    import firebase_auth
+    return firebase_auth.warm_up()
+
+# Token verification never waits for Google's signing keys once this has run
+services.register("firebase_keys", _warm_up_firebase_keys)
+
+def get_amadeus_service():
+    return services.get("amadeus")
+
+AMADEUS_MOCK_MODE.set_function(
+    lambda: float(services.peek("amadeus").use_mock_data) if services.created("amadeus") else None
+)
 
-# Initialize Amadeus service
-amadeus_service = AmadeusService()
+@app.on_event("startup")
+async def warm_up_services():
+    services.mark("startupReached")
+    if SERVICE_WARMUP == "blocking":
+        await services.warm_up()
+    elif SERVICE_WARMUP == "background":
+        # Keep a reference so the task is not garbage collected mid-flight
+        app.state.warm_up_task = asyncio.create_task(services.warm_up())
 
 # ✅ Store your API keys securely
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
 
 # Google Places API configuration
 GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY", "")  # Use same key or different one
@@ -49,10 +133,15 @@ class TripRequest(BaseModel):
     accessibilityNeeds: list[str] = []
     journeyType: str = "single"  # "single" or "multi"
 
-@app.post("/routers/generate-itinerary")
-def generate_itinerary(trip: TripRequest):
+@app.post("/routers/generate-itinerary", response_class=FastJSONResponse)
+def generate_itinerary(trip: TripRequest, request: Request):
+    if wants_job(request):
+        return submit_job("itinerary", trip)
+    return create_itinerary(trip)
+
+def create_itinerary(trip: TripRequest) -> dict:
     try:
-        print(f"Received trip data: {trip}")  # Debug logging
+        logger.debug("Received trip data: %s", trip)
 
         # Convert string values to integers where needed
         days = int(trip.days) if trip.days else 3
@@ -89,18 +178,21 @@ def generate_itinerary(trip: TripRequest):
         Consider group discounts and family-friendly options when applicable.
         """
 
-        print(f"Generated prompt: {prompt[:200]}...")  # Debug logging
+        logger.debug("Generated prompt: %.200s...", prompt)
 
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-            headers={"Content-Type": "application/json"},
-            json={"contents": [{"parts": [{"text": prompt}]}]},
-        )
+        with upstream_call("gemini") as call:
+            response = requests.post(
+                f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+                headers={"Content-Type": "application/json"},
+                json={"contents": [{"parts": [{"text": prompt}]}]},
+                timeout=GEMINI_TIMEOUT,
+            )
+            call.status = response.status_code
 
-        print(f"Gemini API response status: {response.status_code}")  # Debug logging
+        logger.debug("Gemini API response status: %s", response.status_code)
 
         if response.status_code != 200:
-            print(f"Gemini API error: {response.text}")  # Debug logging
+            logger.error("Gemini API error: %s", response.status_code)
             raise HTTPException(status_code=500, detail=f"Gemini API failed: {response.text}")
 
         data = response.json()
@@ -111,14 +203,14 @@ def generate_itinerary(trip: TripRequest):
             .get("text", "No response.")
         )
 
-        print(f"Generated itinerary length: {len(text)}")  # Debug logging
+        logger.debug("Generated itinerary length: %d", len(text))
         return {"itinerary": text}
 
     except ValueError as e:
-        print(f"Value error: {e}")  # Debug logging
+        logger.warning("Value error: %s", e)
         raise HTTPException(status_code=400, detail=f"Invalid input data: {str(e)}")
     except Exception as e:
-        print(f"Unexpected error: {e}")  # Debug logging
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/places/autocomplete")
@@ -137,12 +229,14 @@ def get_places_autocomplete(query: str):
             "language": "en"
         }
 
-        print(f"Fetching places for query: {query}")  # Debug logging
+        logger.debug("Fetching places for query: %s", query)
 
-        response = requests.get(GOOGLE_PLACES_URL, params=params)
+        with upstream_call("google_places") as call:
+            response = requests.get(GOOGLE_PLACES_URL, params=params, timeout=10)
+            call.status = response.status_code
 
         if response.status_code != 200:
-            print(f"Google Places API error: {response.text}")
+            logger.error("Google Places API error: %s", response.status_code)
             raise HTTPException(status_code=500, detail="Places API failed")
 
         data = response.json()
@@ -160,10 +254,10 @@ def get_places_autocomplete(query: str):
         return {"predictions": predictions}
 
     except Exception as e:
-        print(f"Places autocomplete error: {e}")
+        logger.error("Places autocomplete error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/chat/followup")
+@app.post("/chat/followup", response_class=FastJSONResponse)
 def chat_followup(request: dict):
     """
     Handle follow-up questions and modify the itinerary
@@ -175,7 +269,7 @@ def chat_followup(request: dict):
         if not message:
             raise HTTPException(status_code=400, detail="Message is required")
 
-        print(f"Received follow-up message: {message[:100]}...")  # Debug logging
+        logger.debug("Received follow-up message: %.100s...", message)
 
         # Create a prompt that modifies the existing itinerary
         modification_prompt = f"""
@@ -206,16 +300,19 @@ def chat_followup(request: dict):
         Use INR currency for all costs.
         """
 
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-            headers={"Content-Type": "application/json"},
-            json={"contents": [{"parts": [{"text": modification_prompt}]}]},
-        )
+        with upstream_call("gemini") as call:
+            response = requests.post(
+                f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+                headers={"Content-Type": "application/json"},
+                json={"contents": [{"parts": [{"text": modification_prompt}]}]},
+                timeout=GEMINI_TIMEOUT,
+            )
+            call.status = response.status_code
 
-        print(f"Gemini API response status: {response.status_code}")  # Debug logging
+        logger.debug("Gemini API response status: %s", response.status_code)
 
         if response.status_code != 200:
-            print(f"Gemini API error: {response.text}")  # Debug logging
+            logger.error("Gemini API error: %s", response.status_code)
             raise HTTPException(status_code=500, detail=f"Gemini API failed: {response.text}")
 
         data = response.json()
@@ -226,7 +323,7 @@ def chat_followup(request: dict):
             .get("text", "I'm sorry, I couldn't process your request. Please try again.")
         )
 
-        print(f"Generated modified itinerary length: {len(modified_itinerary)}")  # Debug logging
+        logger.debug("Generated modified itinerary length: %d", len(modified_itinerary))
 
         return {
             "type": "itinerary_update",
@@ -235,7 +332,7 @@ def chat_followup(request: dict):
         }
 
     except Exception as e:
-        print(f"Chat followup error: {e}")
+        logger.error("Chat followup error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Schema for multi-destination request
@@ -252,13 +349,18 @@ class MultiTripRequest(BaseModel):
     foodPreference: str
     accessibilityNeeds: list[str]
 
-@app.post("/routers/generate-multi-itinerary")
-def generate_multi_itinerary(trip: MultiTripRequest):
+@app.post("/routers/generate-multi-itinerary", response_class=FastJSONResponse)
+def generate_multi_itinerary(trip: MultiTripRequest, request: Request):
     """
     Generate multi-destination itinerary
     """
+    if wants_job(request):
+        return submit_job("multi_itinerary", trip)
+    return create_multi_itinerary(trip)
+
+def create_multi_itinerary(trip: MultiTripRequest) -> dict:
     try:
-        print(f"Received multi-trip data: {trip}")  # Debug logging
+        logger.debug("Received multi-trip data: %s", trip)
 
         # Convert string values to integers where needed
         days = int(trip.totalDays) if trip.totalDays else 7
@@ -301,18 +403,21 @@ def generate_multi_itinerary(trip: MultiTripRequest):
         Consider group discounts and family-friendly options when applicable.
         """
 
-        print(f"Generated prompt: {prompt[:200]}...")  # Debug logging
+        logger.debug("Generated prompt: %.200s...", prompt)
 
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-            headers={"Content-Type": "application/json"},
-            json={"contents": [{"parts": [{"text": prompt}]}]},
-        )
+        with upstream_call("gemini") as call:
+            response = requests.post(
+                f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+                headers={"Content-Type": "application/json"},
+                json={"contents": [{"parts": [{"text": prompt}]}]},
+                timeout=GEMINI_TIMEOUT,
+            )
+            call.status = response.status_code
 
-        print(f"Gemini API response status: {response.status_code}")  # Debug logging
+        logger.debug("Gemini API response status: %s", response.status_code)
 
         if response.status_code != 200:
-            print(f"Gemini API error: {response.text}")  # Debug logging
+            logger.error("Gemini API error: %s", response.status_code)
             raise HTTPException(status_code=500, detail=f"Gemini API failed: {response.text}")
 
         data = response.json()
@@ -323,28 +428,57 @@ def generate_multi_itinerary(trip: MultiTripRequest):
             .get("text", "No response.")
         )
 
-        print(f"Generated multi-itinerary length: {len(text)}")  # Debug logging
+        logger.debug("Generated multi-itinerary length: %d", len(text))
         return {"itinerary": text}
 
     except ValueError as e:
-        print(f"Value error: {e}")  # Debug logging
+        logger.warning("Value error: %s", e)
         raise HTTPException(status_code=400, detail=f"Invalid input data: {str(e)}")
     except Exception as e:
-        print(f"Unexpected error: {e}")  # Debug logging
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics")
+def get_metrics():
+    """
+    Prometheus text exposition of request, upstream and fallback metrics
+    """
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+@api.get("/startup")
+def get_startup_report():
+    """
+    Import / startup phase timings and per-service creation cost for this worker
+    """
+    return services.report()
+
+@api.get("/cache")
+def get_cache_stats():
+    """
+    Per-namespace cache hits (by tier) and misses for this worker
+    """
+    return cache_stats()
+
+@api.get("/irctc/quota")
+def get_irctc_quota():
+    """
+    RapidAPI IRCTC quota consumption and shed-call counters
+    """
+    return get_amadeus_service().indian_rail_service.get_quota_stats()
+
 # ✅ New Amadeus Travel Data Endpoint
-@api.post("/travel-data")
+@api.post("/travel-data", response_class=FastJSONResponse)
 async def get_travel_data(trip: TripRequest):
     """
     Get comprehensive travel data using Amadeus APIs
     Returns real-time flights, trains, hotels, and points of interest
     """
     try:
-        print(f"🔍 Fetching travel data for: {trip.source} → {trip.destination}")
+        logger.info("🔍 Fetching travel data for: %s → %s", trip.source, trip.destination)
 
-        # Get comprehensive travel data from Amadeus
-        travel_data = amadeus_service.get_comprehensive_travel_data(
+        # Get comprehensive travel data from Amadeus (sync provider stack, run off the loop)
+        travel_data = await run_blocking(
+            get_amadeus_service().get_comprehensive_travel_data,
             source=trip.source,
             destination=trip.destination,
             start_date=trip.startDate,
@@ -354,38 +488,179 @@ async def get_travel_data(trip: TripRequest):
             interests=trip.interests if trip.interests else []
         )
 
-        print(f"✅ Travel data fetched successfully")
-        print(f"📊 Transport options: {len(travel_data.get('transportOptions', []))}")
-        print(f"🏨 Hotels found: {len(travel_data.get('hotels', []))}")
-        print(f"📍 POIs found: {len(travel_data.get('pointsOfInterest', []))}")
+        logger.info(
+            "✅ Travel data fetched successfully: %d transport options, %d hotels, %d POIs",
+            len(travel_data.get('transportOptions', [])),
+            len(travel_data.get('hotels', [])),
+            len(travel_data.get('pointsOfInterest', []))
+        )
 
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": travel_data,
             "message": "Travel data fetched successfully"
-        }
+        })
 
     except Exception as e:
-        print(f"❌ Error fetching travel data: {e}")
+        logger.error("❌ Error fetching travel data: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch travel data: {str(e)}")
 
+def plan_budget(trip: TripRequest, travel_data: dict, days: int) -> BudgetPlan:
+    """Best transport + hotel combinations that leave room in the budget for daily spending"""
+    preferences = Preferences.for_trip(
+        int(trip.budget), int(trip.numberOfPersons), max(days - 1, 1), trip.foodPreference, trip.accessibilityNeeds,
+        travel_data.get("pointsOfInterest", [])
+    )
+    return optimize_budget(
+        travel_data.get("transportOptions", []), travel_data.get("hotels", []), int(trip.budget),
+        int(trip.numberOfPersons), days, preferences
+    )
+
+def format_budget_constraints(plan: BudgetPlan) -> str:
+    best = plan.best
+    if best is None:
+        return ""
+    lines = [
+        f"- Transport: {best.transport['provider']} ({best.transport['departure']} → {best.transport['arrival']}), "
+        f"₹{best.transport_cost:.0f} for the group, return included",
+        f"- Stay: {best.hotel['name']} for {plan.nights} night(s), ₹{best.hotel_cost:.0f}",
+    ]
+    if plan.feasible:
+        lines.append(f"- Meals, local travel and tickets: at most ₹{plan.daily_allowance():.0f} per person per day")
+    else:
+        lines.append(f"- Even this cheapest option costs ₹{best.total:.0f}; keep every other expense to the minimum")
+    return "\n".join(lines)
+
+def build_enhanced_prompt(trip: TripRequest, travel_data: dict, destinations: list, primary_destination: str, days: int,
+                          budget_plan: BudgetPlan = None, day_plan: list = None) -> str:
+    """Gemini prompt for an itinerary grounded in the fetched travel data"""
+    budget = int(trip.budget)
+    budget_constraints = format_budget_constraints(budget_plan) if budget_plan else ""
+
+    # Format transport options for prompt
+    transport_info = ""
+    if travel_data.get("transportOptions"):
+        transport_info = "\n".join([
+            f"- {opt['provider']}: {opt['departure']} → {opt['arrival']} ({opt['duration']}) - {opt['price']}"
+            for opt in travel_data["transportOptions"][:3]  # Top 3 options
+        ])
+
+    # Format hotel options for prompt: the 3 best matches for budget, accessibility and location
+    hotel_info = ""
+    if travel_data.get("hotels"):
+        preferences = Preferences.for_trip(
+            budget, int(trip.numberOfPersons), max(days - 1, 1), trip.foodPreference, trip.accessibilityNeeds,
+            travel_data.get("pointsOfInterest", [])
+        )
+        hotel_info = "\n".join([
+            f"- {hotel['name']} ({hotel['location']}): {hotel['price']} - Rating: {hotel['rating']}/5"
+            for hotel in rank_hotels(travel_data["hotels"], preferences, 3)
+        ])
+
+    # Format POI options for prompt (a fixed day plan already names the sights)
+    skeleton = format_skeleton(day_plan) if day_plan and any(day["stops"] for day in day_plan) else ""
+    poi_info = ""
+    if travel_data.get("pointsOfInterest") and not skeleton:
+        poi_info = "\n".join([
+            f"- {poi['name']} ({poi['type']}): {', '.join(poi.get('tags', [])[:3])}"
+            for poi in travel_data["pointsOfInterest"][:5]  # Top 5 options
+        ])
+
+    # Create destination string for prompt
+    if trip.journeyType == "multi" and destinations:
+        destination_str = f"multiple destinations: {trip.source} → {' → '.join(destinations)}"
+        journey_description = f"multi-destination journey covering {len(destinations)} cities"
+    else:
+        destination_str = f"{trip.source} to {primary_destination}"
+        journey_description = "single destination trip"
+
+    if skeleton:
+        # The route is decided locally; Gemini only writes the prose around it
+        points_of_interest = f"""🗓️ FIXED DAY PLAN (already routed: keep every day's sights, slots and order; add no other sights):
+    {skeleton}"""
+        itinerary_format = f"""👉 Write ONLY the itinerary, one or two short sentences per line, in this format (no introductions or conclusions):
+
+    Day N: [Short title]
+    Morning: [The planned stop with a start time; on Day 1 the journey from {trip.source}]
+    Afternoon: [The planned stop with a start time]
+    Evening: [The planned stop with a start time]
+    Meals: [One {trip.foodPreference} restaurant with cuisine type]
+    Accommodation: [The budget-checked hotel]
+
+    Write all {days} days. A free slot is for rest, travel or a short walk nearby; include the return journey on the last day."""
+    else:
+        points_of_interest = f"""📍 POINTS OF INTEREST:
+    {poi_info if poi_info else "Popular attractions and activities available"}"""
+        itinerary_format = f"""👉 Please provide ONLY the itinerary in this EXACT format (no extra text, introductions, or conclusions):
+
+    Day 1: Departure from {trip.source} to {trip.destination}
+    Morning: [Travel arrangements using the recommended transport options above for {trip.numberOfPersons} person(s)]
+    Afternoon: [Arrival and initial activities in {trip.destination}]
+    Evening: [Evening activities and settling in]
+    Meals: [Restaurant suggestions with cuisine type for {trip.numberOfPersons} person(s)]
+    Accommodation: [Use one of the recommended hotels above for {trip.numberOfPersons} person(s)]
+
+    Day 2: Exploring {trip.destination}
+    Morning: [Activity from the points of interest above with time and location for {trip.numberOfPersons} person(s)]
+    Afternoon: [Activity from the points of interest above with time and location for {trip.numberOfPersons} person(s)]
+    Evening: [Activity from the points of interest above with time and location for {trip.numberOfPersons} person(s)]
+    Meals: [Restaurant suggestions with cuisine type for {trip.numberOfPersons} person(s)]
+    Accommodation: [Hotel/stay suggestion for {trip.numberOfPersons} person(s)]
+
+    Continue this format for all {days} days. Include return journey planning if needed.
+    Be specific with timings, locations, and costs in INR for {trip.numberOfPersons} person(s).
+    Use the real-time data provided above for accurate recommendations.
+    Consider group discounts and family-friendly options when applicable."""
+
+    return f"""
+    Create a detailed {days}-day travel itinerary for a {journey_description}.
+    Route: {destination_str}
+    Number of travelers: {trip.numberOfPersons} person(s).
+    Mode of transport: {trip.transportMode}.
+    Budget: ₹{budget} INR (total for {trip.numberOfPersons} person(s)).
+    Dates: {trip.startDate} to {trip.endDate}.
+    Interests: {', '.join(trip.interests) if trip.interests else 'general sightseeing'}.
+    Food preference: {trip.foodPreference}.
+    Accessibility needs: {', '.join(trip.accessibilityNeeds) if trip.accessibilityNeeds else 'None'}.
+
+    🚄 AVAILABLE TRANSPORT OPTIONS:
+    {transport_info if transport_info else "Standard transport options available"}
+
+    🏨 RECOMMENDED HOTELS:
+    {hotel_info if hotel_info else "Various accommodation options available"}
+
+    {points_of_interest}
+
+    💰 BUDGET-CHECKED CHOICES (fixed; the plan must use these and stay within ₹{budget} in total):
+    {budget_constraints if budget_constraints else "Keep the total cost within the budget"}
+
+    🛡️ TRAVEL RESTRICTIONS:
+    {travel_data.get('restrictions', 'No specific restrictions')}
+
+    {itinerary_format}
+    """
+
 # ✅ Enhanced Itinerary Generation with Amadeus Data
-@app.post("/api/generate-itinerary-with-amadeus")
-async def generate_itinerary_with_amadeus(trip: TripRequest):
+@app.post("/api/generate-itinerary-with-amadeus", response_class=FastJSONResponse)
+async def generate_itinerary_with_amadeus(trip: TripRequest, request: Request):
     """
     Generate itinerary using both Amadeus real-time data and Gemini AI
     """
+    if wants_job(request):
+        return await run_blocking(submit_job, "amadeus_itinerary", trip)
+    return FastJSONResponse(await run_blocking(create_itinerary_with_amadeus, trip))
+
+def create_itinerary_with_amadeus(trip: TripRequest) -> dict:
     try:
-        print(f"🚀 Generating enhanced itinerary with Amadeus data")
-        print(f"📊 Journey type: {trip.journeyType}")
+        logger.info("🚀 Generating enhanced itinerary with Amadeus data (%s journey)", trip.journeyType)
 
         # Handle multi-destination vs single destination
         if trip.journeyType == "multi" and trip.destinations:
-            print(f"🗺️ Multi-destination trip: {trip.source} → {' → '.join(trip.destinations)}")
+            logger.debug("🗺️ Multi-destination trip: %s → %s", trip.source, trip.destinations)
             destinations = trip.destinations
             days = int(trip.totalDays) if trip.totalDays else int(trip.days) if trip.days else 7
         else:
-            print(f"🎯 Single destination trip: {trip.source} → {trip.destination}")
+            logger.debug("🎯 Single destination trip: %s → %s", trip.source, trip.destination)
             destinations = [trip.destination] if trip.destination else []
             days = int(trip.days) if trip.days else int(trip.totalDays) if trip.totalDays else 3
 
@@ -393,95 +668,26 @@ async def generate_itinerary_with_amadeus(trip: TripRequest):
         # For multi-destination, get data for the first destination
         primary_destination = destinations[0] if destinations else trip.destination
 
-        travel_data = amadeus_service.get_comprehensive_travel_data(
-            source=trip.source,
-            destination=primary_destination,
-            start_date=trip.startDate,
-            end_date=trip.endDate,
-            transport_mode=trip.transportMode,
-            num_persons=int(trip.numberOfPersons),
-            interests=trip.interests if trip.interests else []
-        )
-
-        # Step 2: Create enhanced prompt with real-time data
-        budget = int(trip.budget)
-
-        # Format transport options for prompt
-        transport_info = ""
-        if travel_data.get("transportOptions"):
-            transport_info = "\n".join([
-                f"- {opt['provider']}: {opt['departure']} → {opt['arrival']} ({opt['duration']}) - {opt['price']}"
-                for opt in travel_data["transportOptions"][:3]  # Top 3 options
-            ])
-
-        # Format hotel options for prompt
-        hotel_info = ""
-        if travel_data.get("hotels"):
-            hotel_info = "\n".join([
-                f"- {hotel['name']} ({hotel['location']}): {hotel['price']} - Rating: {hotel['rating']}/5"
-                for hotel in travel_data["hotels"][:3]  # Top 3 options
-            ])
-
-        # Format POI options for prompt
-        poi_info = ""
-        if travel_data.get("pointsOfInterest"):
-            poi_info = "\n".join([
-                f"- {poi['name']} ({poi['type']}): {', '.join(poi.get('tags', [])[:3])}"
-                for poi in travel_data["pointsOfInterest"][:5]  # Top 5 options
-            ])
-
-        # Create destination string for prompt
-        if trip.journeyType == "multi" and destinations:
-            destination_str = f"multiple destinations: {trip.source} → {' → '.join(destinations)}"
-            journey_description = f"multi-destination journey covering {len(destinations)} cities"
-        else:
-            destination_str = f"{trip.source} to {primary_destination}"
-            journey_description = "single destination trip"
-
-        enhanced_prompt = f"""
-        Create a detailed {days}-day travel itinerary for a {journey_description}.
-        Route: {destination_str}
-        Number of travelers: {trip.numberOfPersons} person(s).
-        Mode of transport: {trip.transportMode}.
-        Budget: ₹{budget} INR (total for {trip.numberOfPersons} person(s)).
-        Dates: {trip.startDate} to {trip.endDate}.
-        Interests: {', '.join(trip.interests) if trip.interests else 'general sightseeing'}.
-        Food preference: {trip.foodPreference}.
-        Accessibility needs: {', '.join(trip.accessibilityNeeds) if trip.accessibilityNeeds else 'None'}.
-
-        🚄 AVAILABLE TRANSPORT OPTIONS:
-        {transport_info if transport_info else "Standard transport options available"}
-
-        🏨 RECOMMENDED HOTELS:
-        {hotel_info if hotel_info else "Various accommodation options available"}
-
-        📍 POINTS OF INTEREST:
-        {poi_info if poi_info else "Popular attractions and activities available"}
-
-        🛡️ TRAVEL RESTRICTIONS:
-        {travel_data.get('restrictions', 'No specific restrictions')}
-
-        👉 Please provide ONLY the itinerary in this EXACT format (no extra text, introductions, or conclusions):
-
-        Day 1: Departure from {trip.source} to {trip.destination}
-        Morning: [Travel arrangements using the recommended transport options above for {trip.numberOfPersons} person(s)]
-        Afternoon: [Arrival and initial activities in {trip.destination}]
-        Evening: [Evening activities and settling in]
-        Meals: [Restaurant suggestions with cuisine type for {trip.numberOfPersons} person(s)]
-        Accommodation: [Use one of the recommended hotels above for {trip.numberOfPersons} person(s)]
-
-        Day 2: Exploring {trip.destination}
-        Morning: [Activity from the points of interest above with time and location for {trip.numberOfPersons} person(s)]
-        Afternoon: [Activity from the points of interest above with time and location for {trip.numberOfPersons} person(s)]
-        Evening: [Activity from the points of interest above with time and location for {trip.numberOfPersons} person(s)]
-        Meals: [Restaurant suggestions with cuisine type for {trip.numberOfPersons} person(s)]
-        Accommodation: [Hotel/stay suggestion for {trip.numberOfPersons} person(s)]
-
-        Continue this format for all {days} days. Include return journey planning if needed.
-        Be specific with timings, locations, and costs in INR for {trip.numberOfPersons} person(s).
-        Use the real-time data provided above for accurate recommendations.
-        Consider group discounts and family-friendly options when applicable.
-        """
+        with span("travel_data"):
+            travel_data = get_amadeus_service().get_comprehensive_travel_data(
+                source=trip.source,
+                destination=primary_destination,
+                start_date=trip.startDate,
+                end_date=trip.endDate,
+                transport_mode=trip.transportMode,
+                num_persons=int(trip.numberOfPersons),
+                interests=trip.interests if trip.interests else []
+            )
+
+        # Step 2: Pick transport + hotel within the budget, then build the prompt around them
+        with span("plan_budget"):
+            budget_plan = plan_budget(trip, travel_data, days)
+        with span("plan_days"):
+            hotel = budget_plan.best.hotel if budget_plan.best else None
+            day_plan = plan_days(travel_data.get("pointsOfInterest", []), days, hotel)
+        with span("build_prompt"):
+            enhanced_prompt = build_enhanced_prompt(trip, travel_data, destinations, primary_destination, days,
+                                                    budget_plan, day_plan)
 
         # Step 3: Generate itinerary with Gemini using enhanced prompt
         headers = {
@@ -500,11 +706,14 @@ async def generate_itinerary_with_amadeus(trip: TripRequest):
             ]
         }
 
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-            headers=headers,
-            json=payload
-        )
+        with upstream_call("gemini") as call:
+            response = requests.post(
+                f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+                headers=headers,
+                json=payload,
+                timeout=GEMINI_TIMEOUT
+            )
+            call.status = response.status_code
 
         if response.status_code != 200:
             raise HTTPException(status_code=500, detail=f"Gemini API error: {response.text}")
@@ -517,24 +726,117 @@ async def generate_itinerary_with_amadeus(trip: TripRequest):
             .get("text", "No response.")
         )
 
-        print(f"✅ Enhanced itinerary generated successfully")
+        logger.info("✅ Enhanced itinerary generated successfully")
 
         return {
             "success": True,
             "itinerary": itinerary_text,
             "travelData": travel_data,
+            "budgetPlan": budget_plan.to_dict(),
+            "dayPlan": day_plan,
             "message": "Enhanced itinerary generated with real-time data"
         }
 
+    except ValueError as e:
+        logger.warning("Value error: %s", e)
+        raise HTTPException(status_code=400, detail=f"Invalid input data: {str(e)}")
     except Exception as e:
-        print(f"❌ Error generating enhanced itinerary: {e}")
+        logger.error("❌ Error generating enhanced itinerary: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to generate enhanced itinerary: {str(e)}")
+# Background jobs: with `Prefer: respond-async` (or ?mode=async) the generation endpoints
+# answer 202 with a job id; a worker pool generates the itinerary and clients poll
+# /api/jobs/{id} or follow /api/jobs/{id}/events (server-sent events)
+def _job_handler(create, model):
+    def handler(payload: dict) -> dict:
+        try:
+            trip = model(**payload)
+        except ValueError as e:
+            raise PermanentJobError(str(e))
+        try:
+            return create(trip)
+        except HTTPException as e:
+            if e.status_code < 500:
+                raise PermanentJobError(e.detail)
+            raise
+    return handler
+
+job_queue.register("itinerary", _job_handler(create_itinerary, TripRequest))
+job_queue.register("multi_itinerary", _job_handler(create_multi_itinerary, MultiTripRequest))
+job_queue.register("amadeus_itinerary", _job_handler(create_itinerary_with_amadeus, TripRequest))
+
+def wants_job(request: Request) -> bool:
+    return (
+        "respond-async" in request.headers.get("prefer", "").lower()
+        or request.query_params.get("mode") == "async"
+    )
+
+def submit_job(kind: str, trip: BaseModel) -> JSONResponse:
+    job_id = job_queue.submit(kind, jsonable_encoder(trip, exclude_unset=True))
+    status_url = f"/api/jobs/{job_id}"
+    return JSONResponse(
+        {"jobId": job_id, "status": "queued", "statusUrl": status_url, "eventsUrl": f"{status_url}/events"},
+        status_code=202,
+        headers={"Location": status_url},
+    )
+
+@api.get("/jobs/{job_id}", response_class=FastJSONResponse)
+def get_job(job_id: str):
+    """
+    Status of a background generation job (includes the result once it succeeded)
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(job)
+
+@api.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-sent events: one `status` event per change, ending with the finished job
+    """
+    job = await run_blocking(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        nonlocal job
+        last = None
+        while True:
+            state = (job["status"], job["attempts"])
+            if state != last:
+                last = state
+                yield b"event: status\ndata: " + dumps(job) + b"\n\n"
+            if job["status"] in JOB_FINISHED:
+                return
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+            job = await run_blocking(job_queue.get, job_id)
+            if job is None:
+                return
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 frontend_build_path = os.path.join(os.path.dirname(__file__), "../frontend/client/build")
 
-app.mount("/static", StaticFiles(directory=os.path.join(frontend_build_path, "static")), name="static")
+# React build held in memory with gzip/brotli variants and strong ETags
+frontend_assets = StaticAssets(frontend_build_path)
+
+services.register("frontend_build", frontend_assets.load)
+
+app.mount("/static", StaticAssetsApp(frontend_assets, "static"), name="static")
 
 app.include_router(api)
+# Accounts (JWT from /login) and their saved itineraries
+app.include_router(auth_router)
+app.include_router(users_router)
+app.include_router(itineraries_router)
 @app.get("/{full_path:path}")
-async def serve_react(full_path: str):
-    index_file = os.path.join(frontend_build_path, "index.html")
-    return FileResponse(index_file)
+async def serve_react(full_path: str, request: Request):
+    # Top-level build files (favicon, manifest, ...) first, then the SPA entry point
+    response = frontend_assets.response(full_path, request.headers, request.method) if full_path else None
+    if response is None:
+        response = frontend_assets.response("index.html", request.headers, request.method)
+    if response is None:
+        return JSONResponse({"detail": "Frontend build not found"}, status_code=404)
+    return response
+
+services.mark("mainImport", time.perf_counter() - _import_started)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String
-from backend.database import Base
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, JSON, LargeBinary, String
+from database import Base
 
 class User(Base):
     __tablename__ = "users"
@@ -7,3 +8,25 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+
+class Itinerary(Base):
+    """A generated itinerary: zlib-compressed text plus the parsed day-by-day form"""
+    __tablename__ = "itineraries"
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    source = Column(String)
+    destination = Column(String)
+    destinations = Column(JSON)
+    start_date = Column(Date)
+    end_date = Column(Date)
+    days = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    text_compressed = Column(LargeBinary, nullable=False)
+    structured = Column(JSON)
+    request = Column(JSON)
+
+    __table_args__ = (
+        # History pages: WHERE user_id = ? ORDER BY created_at DESC, id DESC (keyset)
+        Index("ix_itineraries_user_created", "user_id", "created_at", "id"),
+        Index("ix_itineraries_destination_start", "destination", "start_date"),
+    )
@@ -1 +1 @@
-from . import users, auth, itinerary
+from . import users, auth, itineraries
@@ -1,36 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from jose import jwt
 from datetime import timedelta, datetime
-from backend.database import get_db
-from backend import models, schemas
+from typing import Optional
+from database import get_db
+import models, schemas
+from services.passwords import password_hasher, HasherBusy
 
 router = APIRouter()
 SECRET_KEY = "CHANGE_THIS_TO_A_SECURE_RANDOM_VALUE"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
+    return password_hasher.verify(plain, hashed)
 
-def create_access_token(data: dict, expires_delta: timedelta | None = None):
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def _busy():
+    return HTTPException(status_code=503, detail="Too many sign-in attempts, please retry", headers={"Retry-After": "1"})
+
 @router.post("/signup", response_model=schemas.Token)
 def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
     existing = db.query(models.User).filter((models.User.username==user.username) | (models.User.email==user.email)).first()
     if existing:
         raise HTTPException(status_code=400, detail="Username or email already registered")
-    hashed = get_password_hash(user.password)
+    try:
+        hashed = get_password_hash(user.password)
+    except HasherBusy:
+        raise _busy()
     new_user = models.User(username=user.username, email=user.email, hashed_password=hashed)
     db.add(new_user)
     db.commit()
@@ -41,7 +46,17 @@ def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=schemas.Token)
 def login(user: schemas.UserCreate, db: Session = Depends(get_db)):
     db_user = db.query(models.User).filter(models.User.username==user.username).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = password_hasher.verify_and_update(user.password, db_user.hashed_password)
+    except HasherBusy:
+        raise _busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made: store one with the current cost
+        db_user.hashed_password = new_hash
+        db.commit()
     token = create_access_token({"sub": db_user.username})
     return {"access_token": token, "token_type": "bearer"}
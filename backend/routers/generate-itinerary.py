@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from backend.database import get_db
+from database import get_db
 from sqlalchemy.orm import Session
-from backend.services.recommender import generate_trip_plan
+from services.recommender import generate_trip_plan_async
 from pydantic import BaseModel
 from typing import List
 
@@ -20,7 +20,7 @@ class TripRequest(BaseModel):
     accessibilityNeeds: List[str]
 
 @router.post("/generate")
-def generate_itinerary(trip: TripRequest, db: Session = Depends(get_db)):
+async def generate_itinerary(trip: TripRequest, db: Session = Depends(get_db)):
     try:
         # Convert frontend data to format expected by generate_trip_plan
         preferences = {
@@ -36,7 +36,8 @@ def generate_itinerary(trip: TripRequest, db: Session = Depends(get_db)):
             "accessibility_needs": trip.accessibilityNeeds
         }
 
-        plan = generate_trip_plan(preferences)
+        # Providers run concurrently; late ones leave their section empty (plan["partial"])
+        plan = await generate_trip_plan_async(preferences)
         return {"status": "success", "itinerary": plan}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
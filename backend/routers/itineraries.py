@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only
+from typing import Optional
+from database import get_db
+import models, schemas
+from routers.users import get_current_user
+from services.itinerary_store import (
+    compress_text, decompress_text, parse_itinerary, parse_date, encode_cursor, decode_cursor
+)
+
+router = APIRouter(prefix="/itineraries", tags=["Itineraries"])
+
+# Columns needed for a history page (the compressed text stays on disk)
+_SUMMARY_COLUMNS = (
+    models.Itinerary.id, models.Itinerary.source, models.Itinerary.destination, models.Itinerary.destinations,
+    models.Itinerary.start_date, models.Itinerary.end_date, models.Itinerary.days, models.Itinerary.created_at,
+)
+
+def _summary(item: models.Itinerary) -> dict:
+    return {
+        "id": item.id,
+        "source": item.source,
+        "destination": item.destination,
+        "destinations": item.destinations,
+        "startDate": item.start_date,
+        "endDate": item.end_date,
+        "days": item.days,
+        "createdAt": item.created_at,
+    }
+
+@router.post("", response_model=schemas.ItineraryOut, status_code=201)
+def save_itinerary(body: schemas.ItineraryCreate, token: str, db: Session = Depends(get_db)):
+    """Store a generated itinerary in the user's history"""
+    user = get_current_user(token, db)
+    structured = parse_itinerary(body.itinerary)
+    item = models.Itinerary(
+        user_id=user.id,
+        source=body.source,
+        destination=body.destination or (body.destinations[0] if body.destinations else None),
+        destinations=body.destinations,
+        start_date=parse_date(body.startDate),
+        end_date=parse_date(body.endDate),
+        days=body.days or len(structured) or None,
+        text_compressed=compress_text(body.itinerary),
+        structured=structured,
+        request=body.request,
+    )
+    db.add(item)
+    db.commit()
+    db.refresh(item)
+    return {**_summary(item), "itinerary": body.itinerary, "structured": structured, "request": body.request}
+
+@router.get("", response_model=schemas.ItineraryPage)
+def list_itineraries(token: str, limit: int = Query(20, ge=1, le=100), cursor: Optional[str] = None,
+                     db: Session = Depends(get_db)):
+    """
+    The user's itineraries, newest first. Pass the returned nextCursor to get the next
+    page; each page is an index range scan on (user_id, created_at, id), however deep.
+    """
+    user = get_current_user(token, db)
+    query = db.query(models.Itinerary).options(load_only(*_SUMMARY_COLUMNS)).filter(models.Itinerary.user_id == user.id)
+    if cursor:
+        try:
+            created_at, item_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.filter(or_(
+            models.Itinerary.created_at < created_at,
+            and_(models.Itinerary.created_at == created_at, models.Itinerary.id < item_id),
+        ))
+    rows = query.order_by(models.Itinerary.created_at.desc(), models.Itinerary.id.desc()).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if len(rows) > limit else None
+    return {"items": [_summary(item) for item in items], "nextCursor": next_cursor}
+
+@router.get("/{itinerary_id}", response_model=schemas.ItineraryOut)
+def get_itinerary(itinerary_id: int, token: str, db: Session = Depends(get_db)):
+    user = get_current_user(token, db)
+    item = db.query(models.Itinerary).filter(
+        models.Itinerary.id == itinerary_id, models.Itinerary.user_id == user.id
+    ).first()
+    if item is None:
+        raise HTTPException(status_code=404, detail="Itinerary not found")
+    return {
+        **_summary(item),
+        "itinerary": decompress_text(item.text_compressed),
+        "structured": item.structured,
+        "request": item.request,
+    }
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from backend.database import get_db
+from database import get_db
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
-from backend import models, schemas
+import models, schemas
+from services.user_cache import decode_token, get_user, invalidate_user
 from jose import jwt
 
 router = APIRouter()
@@ -12,17 +14,30 @@ def get_current_user(token: str, db: Session):
     from jose import JWTError
     credentials_exception = HTTPException(status_code=401, detail="Could not validate credentials")
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token, lambda t: jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM]))
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.username==username).first()
+    # Served from the user cache; the database is only queried on a miss
+    user = get_user(
+        username,
+        payload.get("exp"),
+        lambda name: db.query(models.User).filter(models.User.username==name).first()
+    )
     if user is None:
         raise credentials_exception
     return user
 
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    invalidate_user(target.username)
+    # A renamed user must not stay reachable under the old name either
+    for old_name in inspect(target).attrs.username.history.deleted or ():
+        invalidate_user(old_name)
+
 @router.get("/me", response_model=schemas.UserOut)
 def read_me(token: str, db: Session = Depends(get_db)):
     user = get_current_user(token, db)
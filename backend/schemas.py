@@ -1,3 +1,5 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 class UserCreate(BaseModel):
@@ -15,3 +17,32 @@ class UserOut(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+
+class ItineraryCreate(BaseModel):
+    source: Optional[str] = None
+    destination: Optional[str] = None
+    destinations: Optional[List[str]] = None
+    startDate: Optional[str] = None
+    endDate: Optional[str] = None
+    days: Optional[int] = None
+    itinerary: str
+    request: Optional[Dict[str, Any]] = None
+
+class ItinerarySummary(BaseModel):
+    id: int
+    source: Optional[str] = None
+    destination: Optional[str] = None
+    destinations: Optional[List[str]] = None
+    startDate: Optional[date] = None
+    endDate: Optional[date] = None
+    days: Optional[int] = None
+    createdAt: datetime
+
+class ItineraryOut(ItinerarySummary):
+    itinerary: str
+    structured: Optional[List[Dict[str, Any]]] = None
+    request: Optional[Dict[str, Any]] = None
+
+class ItineraryPage(BaseModel):
+    items: List[ItinerarySummary]
+    nextCursor: Optional[str] = None
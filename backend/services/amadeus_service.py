@@ -1,13 +1,15 @@
+import hashlib
 import os
 import requests
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
+from .cache import get_cache
 from .indian_rail_service import IndianRailService
+from .metrics import AMADEUS_MOCK_MODE, upstream_call
+from .tracing import span
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AmadeusService:
@@ -17,6 +19,9 @@ class AmadeusService:
         self.base_url = os.getenv('AMADEUS_BASE_URL', 'https://api.amadeus.com')
         self.access_token = None
         self.token_expires_at = None
+        # Tokens are shared across workers so each one does not fetch its own
+        self.token_cache = get_cache("amadeus_token", max_entries=4)
+        self.token_cache_key = hashlib.sha256((self.api_key or "").encode()).hexdigest()[:16]
 
         # Initialize Indian Rail service for accurate train data
         self.indian_rail_service = IndianRailService()
@@ -35,7 +40,13 @@ class AmadeusService:
         # Check if token is still valid
         if self.access_token and self.token_expires_at and datetime.now() < self.token_expires_at:
             return self.access_token
-        
+
+        cached = self.token_cache.get(self.token_cache_key)
+        if cached:
+            self.access_token = cached["token"]
+            self.token_expires_at = datetime.fromtimestamp(cached["expiresAt"])
+            return self.access_token
+
         # Get new token
         url = f"{self.base_url}/v1/security/oauth2/token"
         headers = {
@@ -48,13 +59,20 @@ class AmadeusService:
         }
         
         try:
-            response = requests.post(url, headers=headers, data=data)
+            with upstream_call("amadeus_token") as call:
+                response = requests.post(url, headers=headers, data=data)
+                call.status = response.status_code
             response.raise_for_status()
             
             token_data = response.json()
             self.access_token = token_data['access_token']
             expires_in = token_data.get('expires_in', 3600)  # Default 1 hour
             self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)  # Refresh 1 min early
+            self.token_cache.set(
+                self.token_cache_key,
+                {"token": self.access_token, "expiresAt": self.token_expires_at.timestamp()},
+                ttl=max(1, expires_in - 60)
+            )
             
             logger.info("Successfully obtained Amadeus access token")
             return self.access_token
@@ -80,7 +98,9 @@ class AmadeusService:
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            with upstream_call(self._upstream_name(endpoint)) as call:
+                response = requests.get(url, headers=headers, params=params)
+                call.status = response.status_code
             response.raise_for_status()
             return response.json()
             
@@ -88,6 +108,17 @@ class AmadeusService:
             logger.error(f"Amadeus API request failed: {e}")
             return self._get_mock_response(endpoint, params)
     
+    @staticmethod
+    def _upstream_name(endpoint: str) -> str:
+        """Metrics label for an Amadeus endpoint"""
+        if 'flight-offers' in endpoint:
+            return "amadeus_flights"
+        if 'hotel-offers' in endpoint:
+            return "amadeus_hotels"
+        if 'points-of-interest' in endpoint or '/pois' in endpoint:
+            return "amadeus_pois"
+        return "amadeus"
+
     def _get_mock_response(self, endpoint: str, params: Dict = None) -> Dict:
         """Return mock data when API is not available"""
         logger.info(f"Using mock data for endpoint: {endpoint}")
@@ -96,7 +127,7 @@ class AmadeusService:
             return self._mock_flight_data(params)
         elif 'hotel-offers' in endpoint:
             return self._mock_hotel_data(params)
-        elif 'points-of-interest' in endpoint:
+        elif 'points-of-interest' in endpoint or '/pois' in endpoint:
             return self._mock_poi_data(params)
         elif 'rail-station' in endpoint or 'train' in endpoint:
             return self._mock_train_data(params)
@@ -531,36 +562,39 @@ class AmadeusService:
 
         try:
             # Get transport options based on mode
-            if transport_mode.lower() == 'flight':
-                transport_data = self.search_flights(
-                    source, destination, start_date, end_date, num_persons
-                )
-                result["transportOptions"] = self._format_flight_options(transport_data)
-            elif transport_mode.lower() == 'train':
-                transport_data = self.search_trains(
-                    source, destination, start_date, num_persons
-                )
-                result["transportOptions"] = self._format_train_options(transport_data)
-            else:
-                # For bus/car, use train data as fallback
-                transport_data = self.search_trains(
-                    source, destination, start_date, num_persons
-                )
-                result["transportOptions"] = self._format_train_options(transport_data)
+            with span("travel.transport", mode=transport_mode):
+                if transport_mode.lower() == 'flight':
+                    transport_data = self.search_flights(
+                        source, destination, start_date, end_date, num_persons
+                    )
+                    result["transportOptions"] = self._format_flight_options(transport_data)
+                elif transport_mode.lower() == 'train':
+                    transport_data = self.search_trains(
+                        source, destination, start_date, num_persons
+                    )
+                    result["transportOptions"] = self._format_train_options(transport_data)
+                else:
+                    # For bus/car, use train data as fallback
+                    transport_data = self.search_trains(
+                        source, destination, start_date, num_persons
+                    )
+                    result["transportOptions"] = self._format_train_options(transport_data)
 
             # Get hotels
-            hotel_data = self.search_hotels(
-                destination, start_date, end_date, num_persons, 1
-            )
-            result["hotels"] = self._format_hotel_options(hotel_data)
+            with span("travel.hotels"):
+                hotel_data = self.search_hotels(
+                    destination, start_date, end_date, num_persons, 1
+                )
+                result["hotels"] = self._format_hotel_options(hotel_data)
 
             # Get points of interest
-            dest_coords = self._get_city_coordinates(destination)
-            if dest_coords:
-                poi_data = self.search_points_of_interest(
-                    dest_coords['lat'], dest_coords['lng'], 10, interests
-                )
-                result["pointsOfInterest"] = self._format_poi_options(poi_data)
+            with span("travel.pois"):
+                dest_coords = self._get_city_coordinates(destination)
+                if dest_coords:
+                    poi_data = self.search_points_of_interest(
+                        dest_coords['lat'], dest_coords['lng'], 10, interests
+                    )
+                    result["pointsOfInterest"] = self._format_poi_options(poi_data)
 
             # Get travel restrictions
             restrictions_data = self.get_travel_restrictions('IN', 'IN')
@@ -593,6 +627,10 @@ class AmadeusService:
         """Format train data for frontend"""
         options = []
         for train in data.get("data", []):
+            if isinstance(train.get("price"), str):
+                # IndianRailService results are already in this shape
+                options.append(train)
+                continue
             options.append({
                 "mode": "Train",
                 "provider": f"{train.get('trainName', '')} ({train.get('trainNumber', '')})",
@@ -607,25 +645,39 @@ class AmadeusService:
         return options
 
     def _format_hotel_options(self, data: Dict) -> List[Dict]:
-        """Format hotel data for frontend"""
+        """Format hotel data for frontend (cheapest offer per hotel, priced per night)"""
         options = []
         for hotel_offer in data.get("data", []):
             hotel = hotel_offer.get("hotel", {})
             offers = hotel_offer.get("offers", [])
 
             if offers:
-                offer = offers[0]  # Take first offer
+                nightly = min(self._nightly_price(offer) for offer in offers)
                 options.append({
                     "name": hotel.get("name", ""),
                     "location": hotel.get("address", {}).get("lines", [""])[0],
                     "rating": float(hotel.get("rating", "0")),
-                    "price": f"₹{offer.get('price', {}).get('total', '0')}/night",
+                    "price": f"₹{nightly:.0f}/night",
+                    "pricePerNight": nightly,
+                    "latitude": hotel.get("latitude"),
+                    "longitude": hotel.get("longitude"),
                     "amenities": hotel.get("amenities", []),
                     "description": hotel.get("description", {}).get("text", ""),
                     "contact": hotel.get("contact", {}).get("phone", "")
                 })
         return options
 
+    @staticmethod
+    def _nightly_price(offer: Dict) -> float:
+        """Offer totals cover the whole stay"""
+        total = float(offer.get("price", {}).get("total", "0"))
+        try:
+            nights = (datetime.strptime(offer["checkOutDate"], "%Y-%m-%d")
+                      - datetime.strptime(offer["checkInDate"], "%Y-%m-%d")).days
+        except (KeyError, ValueError):
+            nights = 1
+        return round(total / max(nights, 1), 2)
+
     def _format_poi_options(self, data: Dict) -> List[Dict]:
         """Format points of interest data for frontend"""
         options = []
@@ -0,0 +1,193 @@
+import bisect
+import heapq
+import math
+import os
+import re
+from typing import Dict, List, Optional, Sequence
+
+from .scoring import Candidates, Preferences, score_hotels
+
+# Money each traveller needs per day for meals, local transport and entry fees;
+# a combination is only feasible if this much is left after transport and hotel
+BUDGET_DAILY_SPEND_PER_PERSON = float(os.getenv("BUDGET_DAILY_SPEND_PER_PERSON", "700"))
+# Travellers sharing one hotel room
+ROOM_OCCUPANCY = int(os.getenv("ROOM_OCCUPANCY", "2"))
+
+# Objective: hotel match and journey time, plus a small bonus for money left over
+HOTEL_WEIGHT = 0.6
+TRANSPORT_WEIGHT = 0.3
+SAVINGS_WEIGHT = 0.1
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_ISO_DURATION = re.compile(r"^P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?", re.IGNORECASE)
+_HOURS_MINUTES = re.compile(r"(?:(\d+)\s*h)?\s*(?:(\d+)\s*m)?", re.IGNORECASE)
+
+
+def _amount(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or ""))
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+def duration_minutes(value: str) -> Optional[float]:
+    """Minutes in "PT6H15M" (Amadeus) or "6h 15m" / "06:15" (rail) durations"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if ":" in value:
+        hours, _, minutes = value.partition(":")
+        return int(hours) * 60 + int(minutes or 0) if hours.isdigit() else None
+    match = _ISO_DURATION.match(value) if value[:1].upper() == "P" else _HOURS_MINUTES.fullmatch(value)
+    if not match or not any(match.groups()):
+        return None
+    parts = [int(part or 0) for part in match.groups()]
+    if len(parts) == 3:
+        return parts[0] * 1440 + parts[1] * 60 + parts[2]
+    return parts[0] * 60 + parts[1]
+
+
+def transport_cost(option: Dict, persons: int) -> Optional[float]:
+    """Group cost of an option there and back (flight offers are round trips, trains are quoted one way)"""
+    total = _amount(option.get("price"))
+    if total is None:
+        per_person = _amount(option.get("pricePerPerson"))
+        total = per_person * persons if per_person is not None else None
+    if total is None:
+        return None
+    return total * 2 if option.get("mode", "").lower() == "train" else total
+
+
+class Combination:
+    __slots__ = ("transport", "hotel", "transport_cost", "hotel_cost", "total", "left_over", "score")
+
+    def __init__(self, transport: Dict, hotel: Dict, transport_cost: float, hotel_cost: float,
+                 budget: float, score: float):
+        self.transport = transport
+        self.hotel = hotel
+        self.transport_cost = transport_cost
+        self.hotel_cost = hotel_cost
+        self.total = transport_cost + hotel_cost
+        self.left_over = budget - self.total
+        self.score = score
+
+    def to_dict(self) -> Dict:
+        return {
+            "transport": self.transport,
+            "hotel": self.hotel,
+            "transportCost": round(self.transport_cost),
+            "hotelCost": round(self.hotel_cost),
+            "total": round(self.total),
+            "leftOver": round(self.left_over),
+            "score": round(self.score, 3),
+        }
+
+
+class BudgetPlan:
+    """Best transport + hotel combinations for a trip, or the cheapest one when none fits"""
+
+    __slots__ = ("budget", "persons", "nights", "days", "combinations", "feasible")
+
+    def __init__(self, budget: float, persons: int, nights: int, days: int,
+                 combinations: List[Combination], feasible: bool):
+        self.budget = budget
+        self.persons = persons
+        self.nights = nights
+        self.days = days
+        self.combinations = combinations
+        self.feasible = feasible
+
+    @property
+    def best(self) -> Optional[Combination]:
+        return self.combinations[0] if self.combinations else None
+
+    def daily_allowance(self) -> float:
+        """What each traveller may spend per day once the best combination is paid for"""
+        if not self.best:
+            return self.budget / max(self.persons * self.days, 1)
+        return max(self.best.left_over, 0) / max(self.persons * self.days, 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            "budget": round(self.budget),
+            "feasible": self.feasible,
+            "dailyAllowancePerPerson": round(self.daily_allowance()),
+            "combinations": [c.to_dict() for c in self.combinations],
+        }
+
+
+def optimize(transport_options: Sequence[Dict], hotels: Sequence[Dict], budget: float, persons: int,
+             days: int, preferences: Preferences = None, limit: int = 3) -> BudgetPlan:
+    """
+    Top `limit` (transport, hotel) pairs by score whose cost, plus the daily spend
+    reserve, fits the budget. Hotels are sorted by cost once; for each transport
+    option only hotels it can afford are considered, best first, and the search
+    stops as soon as the best remaining hotel cannot beat the current top `limit`.
+    """
+    persons = max(int(persons or 1), 1)
+    days = max(int(days or 1), 1)
+    nights = max(days - 1, 1)
+    rooms = math.ceil(persons / ROOM_OCCUPANCY)
+    reserve = BUDGET_DAILY_SPEND_PER_PERSON * persons * days
+    spendable = budget - reserve
+
+    # Transport: group cost and a journey-time score (fastest option = 1)
+    transports = []
+    for option in transport_options:
+        cost = transport_cost(option, persons)
+        if cost is not None:
+            transports.append((option, cost, duration_minutes(option.get("duration", ""))))
+    fastest = min((minutes for _, _, minutes in transports if minutes), default=None)
+    transports = [
+        (option, cost, fastest / minutes if fastest and minutes else 0.5) for option, cost, minutes in transports
+    ]
+
+    # Hotels: stay cost and match score, sorted by cost (for the affordability cut) and by score
+    candidates = Candidates.hotels(hotels)
+    hotel_scores = score_hotels(candidates, preferences or Preferences())
+    stays = sorted(
+        (candidates.price[i] * nights * rooms, float(hotel_scores[i]), i)
+        for i in range(len(candidates)) if not math.isnan(candidates.price[i])
+    )
+    stay_costs = [cost for cost, _, _ in stays]
+    by_score = sorted(range(len(stays)), key=lambda k: -stays[k][1])
+    top_hotel_score = stays[by_score[0]][1] if stays else 0.0
+
+    def objective(transport_score: float, hotel_score: float, total: float) -> float:
+        savings = (spendable - total) / budget if budget else 0.0
+        return HOTEL_WEIGHT * hotel_score + TRANSPORT_WEIGHT * transport_score + SAVINGS_WEIGHT * savings
+
+    best: List = []  # min-heap of (objective, tie-breaker, Combination)
+    counter = 0
+    for option, t_cost, t_score in sorted(transports, key=lambda t: -t[2]):
+        affordable = bisect.bisect_right(stay_costs, spendable - t_cost)
+        if not affordable:
+            continue
+        if len(best) == limit and objective(t_score, top_hotel_score, t_cost) <= best[0][0]:
+            continue
+        for k in by_score:
+            if k >= affordable:
+                continue
+            h_cost, h_score, h_index = stays[k]
+            # Upper bound for this transport: the best affordable hotel at zero cost
+            if len(best) == limit and objective(t_score, h_score, t_cost) <= best[0][0]:
+                break
+            value = objective(t_score, h_score, t_cost + h_cost)
+            combination = Combination(option, candidates.items[h_index], t_cost, h_cost, budget, value)
+            counter += 1
+            if len(best) < limit:
+                heapq.heappush(best, (value, -counter, combination))
+            elif value > best[0][0]:
+                heapq.heapreplace(best, (value, -counter, combination))
+    if best:
+        combinations = [entry[2] for entry in sorted(best, key=lambda entry: (-entry[0], -entry[1]))]
+        return BudgetPlan(budget, persons, nights, days, combinations, True)
+
+    # Nothing fits: report the cheapest pair so the plan can say how far over it is
+    if transports and stays:
+        option, t_cost, t_score = min(transports, key=lambda t: t[1])
+        h_cost, h_score, h_index = stays[0]
+        cheapest = Combination(option, candidates.items[h_index], t_cost, h_cost, budget,
+                               objective(t_score, h_score, t_cost + h_cost))
+        return BudgetPlan(budget, persons, nights, days, [cheapest], False)
+    return BudgetPlan(budget, persons, nights, days, [], False)
@@ -0,0 +1,421 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .metrics import registry
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; shared tiers fall back to JSON
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tiers behind the per-process LRU: "redis" (needs CACHE_REDIS_URL) and/or "sqlite"
+CACHE_TIERS = [t.strip() for t in os.getenv("CACHE_TIERS", "redis,sqlite").lower().split(",") if t.strip()]
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH") or os.path.join(BASE_DIR, "cache.db")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "dd")
+# A failing shared tier is skipped for this long before it is tried again
+CACHE_TIER_COOLDOWN = 30.0
+
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by namespace, tier and result", ("namespace", "tier", "result"))
+CACHE_ERRORS = registry.counter(
+    "cache_errors_total", "Shared cache tier failures", ("namespace", "tier"))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None,
+                   should_cache: Callable[[Any], bool] = None) -> Any:
+        """Return the cached value, or load, cache and return it"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if should_cache is None or should_cache(value):
+            self.set(key, value, ttl)
+        return value
+
+    def __len__(self):
+        return len(self._data)
+
+
+def dumps(value: Any, expires_at: float) -> bytes:
+    """Encode a value with its absolute expiry (msgpack when installed, JSON otherwise)"""
+    if msgpack is not None:
+        return b"m" + msgpack.packb([expires_at, value], use_bin_type=True)
+    return b"j" + json.dumps([expires_at, value], separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Tuple[float, Any]:
+    """Decode dumps() output; returns (expires_at, value)"""
+    kind, body = data[:1], data[1:]
+    if kind == b"m":
+        if msgpack is None:
+            raise ValueError("msgpack entry but msgpack is not installed")
+        expires_at, value = msgpack.unpackb(body, raw=False)
+    elif kind == b"j":
+        expires_at, value = json.loads(body)
+    else:
+        raise ValueError("Unknown cache entry format")
+    return expires_at, value
+
+
+class CacheTierError(Exception):
+    """A shared tier could not be reached or returned garbage"""
+
+
+class SQLiteTier:
+    """Cache entries in a local SQLite file (shared by workers on the host, survives restarts)"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = CACHE_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=2, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS cache_entries ("
+                        " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+                    )
+                    self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise CacheTierError(str(e))
+        return row[0] if row else None
+
+    def set(self, key: str, data: bytes, ttl: float):
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, sqlite3.Binary(data), time.time() + ttl)
+            )
+            self._writes += 1
+            if self._writes % 500 == 0:
+                conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            raise CacheTierError(str(e))
+
+    def delete(self, key: str):
+        try:
+            self._connect().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            raise CacheTierError(str(e))
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class _RespConnection:
+    """One blocking RESP2 connection"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def command(self, *args) -> Any:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self.sock.sendall(b"".join(parts))
+        return self._read()
+
+    def _read(self) -> Any:
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from cache server: {line[:20]!r}")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisTier:
+    """
+    Shared tier for any server speaking the Redis protocol (Redis, Valkey, KeyDB, ...).
+    Minimal RESP2 client with one connection per thread; short timeouts so a slow or
+    missing server degrades to a cache miss instead of a slow request.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, timeout: float = 0.25):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> _RespConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = _RespConnection(self.host, self.port, self.timeout)
+            if self.password:
+                conn.command("AUTH", self.password)
+            if self.db:
+                conn.command("SELECT", self.db)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _command(self, *args) -> Any:
+        try:
+            return self._connection().command(*args)
+        except (OSError, RespError, ValueError) as e:
+            conn = getattr(self._local, "conn", None)
+            if conn is not None:
+                conn.close()
+                self._local.conn = None
+            raise CacheTierError(str(e))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, data: bytes, ttl: float):
+        self._command("SET", key, data, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self._command("DEL", key)
+
+
+class Cache:
+    """
+    Namespaced read-through cache: per-process LRU first, then the shared tiers in
+    order. Hits in a lower tier are copied into the tiers above it with the remaining
+    TTL; sets write through to every tier.
+    """
+
+    def __init__(self, namespace: str, default_ttl: float = 300, max_entries: int = 1024, tiers: List = None):
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.memory = TTLCache(max_entries=max_entries, default_ttl=default_ttl)
+        self.tiers = list(tiers or [])
+        self._prefix = f"{CACHE_KEY_PREFIX}:{namespace}:"
+        self._down_until = {}
+
+    def _key(self, key: Hashable) -> str:
+        if isinstance(key, tuple):
+            key = "|".join(str(part) for part in key)
+        return self._prefix + str(key)
+
+    def _available(self, tier) -> bool:
+        return self._down_until.get(tier.name, 0) <= time.monotonic()
+
+    def _failed(self, tier, error: Exception):
+        CACHE_ERRORS.inc(self.namespace, tier.name)
+        self._down_until[tier.name] = time.monotonic() + CACHE_TIER_COOLDOWN
+        logger.warning(f"⚠️ Cache tier {tier.name} failed ({error}); skipping it for {CACHE_TIER_COOLDOWN:.0f}s")
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        full_key = self._key(key)
+        value = self.memory.get(full_key, _MISSING)
+        if value is not _MISSING:
+            CACHE_REQUESTS.inc(self.namespace, "memory", "hit")
+            return value
+
+        for index, tier in enumerate(self.tiers):
+            if not self._available(tier):
+                continue
+            try:
+                data = tier.get(full_key)
+                if data is None:
+                    continue
+                expires_at, value = loads(bytes(data))
+            except (CacheTierError, ValueError) as e:
+                self._failed(tier, e)
+                continue
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                continue
+            CACHE_REQUESTS.inc(self.namespace, tier.name, "hit")
+            self.memory.set(full_key, value, remaining)
+            for upper in self.tiers[:index]:
+                self._write(upper, full_key, bytes(data), remaining)
+            return value
+
+        CACHE_REQUESTS.inc(self.namespace, "all", "miss")
+        return default
+
+    def _write(self, tier, full_key: str, data: bytes, ttl: float):
+        if not self._available(tier):
+            return
+        try:
+            tier.set(full_key, data, ttl)
+        except CacheTierError as e:
+            self._failed(tier, e)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        full_key = self._key(key)
+        self.memory.set(full_key, value, ttl)
+        if not self.tiers:
+            return
+        try:
+            data = dumps(value, time.time() + ttl)
+        except (TypeError, ValueError, OverflowError) as e:
+            # Not representable in the shared format: keep it in this process only
+            logger.debug(f"Cache value for {full_key} is not serializable: {e}")
+            return
+        for tier in self.tiers:
+            self._write(tier, full_key, data, ttl)
+
+    def delete(self, key: Hashable):
+        """Remove a key from every tier (explicit invalidation)"""
+        full_key = self._key(key)
+        self.memory.delete(full_key)
+        for tier in self.tiers:
+            if self._available(tier):
+                try:
+                    tier.delete(full_key)
+                except CacheTierError as e:
+                    self._failed(tier, e)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None,
+                   should_cache: Callable[[Any], bool] = None) -> Any:
+        """Return the cached value, or load, cache and return it"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if should_cache is None or should_cache(value):
+            self.set(key, value, ttl)
+        return value
+
+    def stats(self) -> Dict:
+        tiers = ["memory"] + [tier.name for tier in self.tiers]
+        stats = {tier: {"hits": CACHE_REQUESTS.value(self.namespace, tier, "hit")} for tier in tiers}
+        stats["misses"] = CACHE_REQUESTS.value(self.namespace, "all", "miss")
+        stats["memoryEntries"] = len(self.memory)
+        return stats
+
+
+_shared_tiers = None
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def shared_tiers() -> List:
+    """Shared tiers configured by CACHE_TIERS / CACHE_REDIS_URL / CACHE_SQLITE_PATH"""
+    global _shared_tiers
+    if _shared_tiers is None:
+        tiers = []
+        for name in CACHE_TIERS:
+            if name == "redis" and CACHE_REDIS_URL:
+                tiers.append(RedisTier(CACHE_REDIS_URL))
+            elif name == "sqlite":
+                tiers.append(SQLiteTier(CACHE_SQLITE_PATH))
+        _shared_tiers = tiers
+    return _shared_tiers
+
+
+def get_cache(namespace: str, default_ttl: float = 300, max_entries: int = 1024) -> Cache:
+    """The process-wide cache for a namespace (created on first request)"""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = Cache(namespace, default_ttl, max_entries, shared_tiers())
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict]:
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.stats() for cache in caches}
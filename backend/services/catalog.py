@@ -0,0 +1,113 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRAPER_CATALOG_PATH = os.getenv("SCRAPER_CATALOG_PATH") or os.path.join(BASE_DIR, "catalog.db")
+
+
+class Catalog:
+    """
+    Local store of crawled hotels and restaurants, plus per-page validators (ETag /
+    Last-Modified) for incremental re-crawls. Request handlers only ever read from here.
+    """
+
+    def __init__(self, path: str = SCRAPER_CATALOG_PATH):
+        self.path = path
+        self._local = threading.local()
+        # Opened on first use so importing the app writes nothing
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS places ("
+                        " kind TEXT NOT NULL, destination TEXT NOT NULL, name TEXT NOT NULL,"
+                        " source TEXT NOT NULL, page_url TEXT NOT NULL, data TEXT NOT NULL,"
+                        " updated_at REAL NOT NULL, PRIMARY KEY (kind, destination, source, name))"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS places_page ON places (page_url)")
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS pages ("
+                        " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+                        " fetched_at REAL NOT NULL, status INTEGER NOT NULL, items INTEGER NOT NULL)"
+                    )
+                    self._initialized = True
+        return conn
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional-request headers for a page crawled before"""
+        row = self._connect().execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def replace_page(self, url: str, kind: str, destination: str, source: str, items: Iterable[Dict],
+                     etag: Optional[str], last_modified: Optional[str], status: int = 200) -> int:
+        """Store the items parsed from one page, replacing what that page yielded before"""
+        now = time.time()
+        destination = destination.strip().lower()
+        rows = [
+            (kind, destination, item["name"], source, url, json.dumps(item, ensure_ascii=False), now)
+            for item in items if item.get("name")
+        ]
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM places WHERE page_url = ?", (url,))
+            conn.executemany("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, fetched_at, status, items)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, now, status, len(rows))
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def touch_page(self, url: str, status: int):
+        """Record a re-crawl that did not change the page (304)"""
+        self._connect().execute(
+            "UPDATE pages SET fetched_at = ?, status = ? WHERE url = ?", (time.time(), status, url)
+        )
+
+    def places(self, kind: str, destination: str) -> List[Dict]:
+        rows = self._connect().execute(
+            "SELECT data FROM places WHERE kind = ? AND destination = ? ORDER BY name",
+            (kind, destination.strip().lower())
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def hotels(self, destination: str) -> List[Dict]:
+        return self.places("hotels", destination)
+
+    def restaurants(self, destination: str, veg_only: bool = False) -> List[Dict]:
+        restaurants = self.places("restaurants", destination)
+        return [r for r in restaurants if r.get("veg_friendly")] if veg_only else restaurants
+
+    def is_empty(self) -> bool:
+        if not os.path.exists(self.path):
+            return True
+        return self._connect().execute("SELECT 1 FROM places LIMIT 1").fetchone() is None
+
+
+catalog = Catalog()
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# "background": create services in a startup task, "blocking": finish before serving,
+# "off": create each service on first use only
+SERVICE_WARMUP = os.getenv("SERVICE_WARMUP", "background").lower()
+
+_process_started = time.perf_counter()
+
+
+class ServiceContainer:
+    """
+    Registry of heavy services created on first use.
+    Factories run at most once per process (concurrent callers wait for the first);
+    creation times are recorded for the startup report.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+        self.timings = {}
+        self.phases = {}
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                instance = self._factories[name]()
+                self.timings[name] = round(time.perf_counter() - started, 4)
+                self._instances[name] = instance
+                logger.info(f"🧩 Created service '{name}' in {self.timings[name] * 1000:.0f} ms")
+        return instance
+
+    def created(self, name: str) -> bool:
+        return name in self._instances
+
+    def peek(self, name: str) -> Optional[Any]:
+        """The instance if it already exists (never creates it)"""
+        return self._instances.get(name)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def create_all(self, names: Iterable[str] = None):
+        """Create services synchronously (e.g. in a pre-fork master)"""
+        for name in names or self.names:
+            self.get(name)
+
+    async def warm_up(self, names: Iterable[str] = None):
+        """Create services concurrently off the event loop"""
+        from .runtime import run_blocking
+
+        started = time.perf_counter()
+        names = list(names or self.names)
+        results = await asyncio.gather(*(run_blocking(self.get, name) for name in names), return_exceptions=True)
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Warm-up of service '{name}' failed: {result}")
+        self.mark("warmUp", time.perf_counter() - started)
+        self.mark("warmUpFinished")
+
+    def mark(self, phase: str, seconds: float = None):
+        """Record a phase duration, or (without seconds) when it was reached, measured from container import"""
+        self.phases[phase] = round(time.perf_counter() - _process_started if seconds is None else seconds, 4)
+
+    def report(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "phases": dict(self.phases),
+            "services": {
+                name: {"created": name in self._instances, "seconds": self.timings.get(name)}
+                for name in self._factories
+            },
+            "warmUpMode": SERVICE_WARMUP,
+        }
+
+
+services = ServiceContainer()
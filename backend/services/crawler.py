@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .catalog import Catalog, catalog as default_catalog
+from .metrics import registry
+from .site_parsers import SiteSpec
+
+logger = logging.getLogger(__name__)
+
+# JSON list of site specs (see site_parsers.SiteSpec) crawled by `python -m services.crawler`
+SCRAPER_SOURCES = os.getenv("SCRAPER_SOURCES", "")
+SCRAPER_USER_AGENT = os.getenv("SCRAPER_USER_AGENT", "DreamDestinyBot/1.0 (+https://dreamdestiny.example/bot)")
+# Politeness: requests in flight per domain, and the minimum gap between their starts
+SCRAPER_DOMAIN_CONCURRENCY = int(os.getenv("SCRAPER_DOMAIN_CONCURRENCY", "2"))
+SCRAPER_DOMAIN_DELAY = float(os.getenv("SCRAPER_DOMAIN_DELAY", "1.0"))
+SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "20"))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "15"))
+SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "2"))
+# Longest Retry-After we are willing to sleep through before giving up on a page
+SCRAPER_MAX_RETRY_AFTER = float(os.getenv("SCRAPER_MAX_RETRY_AFTER", "30"))
+
+CRAWL_PAGES = registry.counter("crawl_pages_total", "Crawled pages by site and outcome", ("site", "outcome"))
+CRAWL_SECONDS = registry.histogram("crawl_page_seconds", "Crawl fetch latency", ("site",))
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class DomainGate:
+    """Per-domain politeness: bounded concurrency plus a minimum delay between request starts"""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.delay = delay
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        async with self._lock:
+            wait = self._next_start - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = time.monotonic() + self.delay
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+    def back_off(self, seconds: float):
+        """Push the next request to this domain out (Retry-After)"""
+        self._next_start = max(self._next_start, time.monotonic() + seconds)
+
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    value = response.headers.get("Retry-After", "")
+    try:
+        return min(float(value), SCRAPER_MAX_RETRY_AFTER)
+    except ValueError:
+        return min(2.0 ** attempt, SCRAPER_MAX_RETRY_AFTER)
+
+
+class Crawler:
+    """
+    Async crawler that fills the catalog. One pooled client for every site; pages
+    crawled before are fetched conditionally and a 304 skips parsing entirely.
+    """
+
+    def __init__(self, catalog: Catalog = None, domain_concurrency: int = SCRAPER_DOMAIN_CONCURRENCY,
+                 domain_delay: float = SCRAPER_DOMAIN_DELAY, max_retries: int = SCRAPER_MAX_RETRIES,
+                 timeout: float = SCRAPER_TIMEOUT, user_agent: str = SCRAPER_USER_AGENT,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.catalog = catalog or default_catalog
+        self.domain_concurrency = domain_concurrency
+        self.domain_delay = domain_delay
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.transport = transport
+        self._gates: Dict[str, DomainGate] = {}
+
+    def _gate(self, url: str) -> DomainGate:
+        domain = urlsplit(url).netloc.lower()
+        gate = self._gates.get(domain)
+        if gate is None:
+            gate = self._gates[domain] = DomainGate(self.domain_concurrency, self.domain_delay)
+        return gate
+
+    async def _get(self, client: httpx.AsyncClient, site: SiteSpec, url: str) -> httpx.Response:
+        gate = self._gate(url)
+        headers = self.catalog.validators(url)
+        for attempt in range(self.max_retries + 1):
+            async with gate:
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                CRAWL_SECONDS.observe(time.perf_counter() - started, site.name)
+            if response.status_code not in _RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            delay = _retry_after(response, attempt)
+            gate.back_off(delay)
+            logger.warning(f"🔁 {url} answered {response.status_code}; retrying in {delay:.1f}s")
+        return response
+
+    async def crawl_page(self, client: httpx.AsyncClient, site: SiteSpec, url: str) -> str:
+        """Fetch one page and update the catalog; returns the outcome"""
+        try:
+            response = await self._get(client, site, url)
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Crawl of {url} failed: {e}")
+            outcome = "error"
+        else:
+            if response.status_code == 304:
+                self.catalog.touch_page(url, 304)
+                outcome = "not_modified"
+            elif response.status_code == 200:
+                items = site.parse(response.text)
+                self.catalog.replace_page(
+                    url, site.kind, site.destination, site.name, items,
+                    response.headers.get("ETag"), response.headers.get("Last-Modified")
+                )
+                outcome = "updated"
+            else:
+                logger.warning(f"⚠️ Crawl of {url} returned {response.status_code}")
+                outcome = "error"
+        CRAWL_PAGES.inc(site.name, outcome)
+        return outcome
+
+    async def crawl(self, sites: Iterable[SiteSpec]) -> Dict[str, int]:
+        """Crawl every page of every site concurrently (politeness is enforced per domain)"""
+        self._gates = {}  # asyncio primitives belong to this run's event loop
+        limits = httpx.Limits(max_connections=SCRAPER_MAX_CONNECTIONS,
+                              max_keepalive_connections=SCRAPER_MAX_CONNECTIONS)
+        async with httpx.AsyncClient(
+            headers={"User-Agent": self.user_agent, "Accept": "text/html"}, limits=limits,
+            timeout=self.timeout, follow_redirects=True, transport=self.transport
+        ) as client:
+            pages = [(site, url) for site in sites for url in site.urls]
+            outcomes = await asyncio.gather(*(self.crawl_page(client, site, url) for site, url in pages))
+        summary = {"updated": 0, "not_modified": 0, "error": 0}
+        for outcome in outcomes:
+            summary[outcome] += 1
+        logger.info(f"🕷️ Crawled {len(pages)} pages: {summary}")
+        return summary
+
+
+def load_sites(path: str) -> List[SiteSpec]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [SiteSpec(spec) for spec in json.load(f)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Crawl hotel/restaurant listings into the local catalog")
+    parser.add_argument("--sources", default=SCRAPER_SOURCES, help="JSON file of site specs")
+    args = parser.parse_args()
+    if not args.sources:
+        parser.error("--sources (or SCRAPER_SOURCES) is required")
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(Crawler().crawl(load_sites(args.sources))))
@@ -0,0 +1,200 @@
+import math
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .scoring import EARTH_RADIUS_KM
+
+SLOTS = ("morning", "afternoon", "evening")
+# POIs planned per full day (one per slot by default)
+PLANNER_POIS_PER_DAY = int(os.getenv("PLANNER_POIS_PER_DAY", "3"))
+# Detour (km) we accept to put a POI in a slot that suits it
+SLOT_PENALTY_KM = float(os.getenv("PLANNER_SLOT_PENALTY_KM", "4"))
+
+# Slots that suit each POI category (Amadeus categories, formatted as in _format_poi_options)
+CATEGORY_SLOTS = {
+    "Beach": ("evening", "morning"),
+    "Religious Site": ("morning", "evening"),
+    "Historical Site": ("morning", "afternoon"),
+    "Sights": ("morning", "afternoon"),
+    "Museum": ("morning", "afternoon"),
+    "Shopping": ("afternoon", "evening"),
+    "Nightlife": ("evening",),
+    "Restaurant": ("afternoon", "evening"),
+}
+
+
+class Stop:
+    __slots__ = ("poi", "name", "rank", "slots", "lat", "lon")
+
+    def __init__(self, poi: Dict, lat: float, lon: float):
+        self.poi = poi
+        self.name = poi.get("name", "")
+        try:
+            self.rank = float(poi.get("rank") or 0)
+        except (TypeError, ValueError):
+            self.rank = 0.0
+        self.slots = CATEGORY_SLOTS.get(poi.get("type", ""), SLOTS)
+        self.lat = lat
+        self.lon = lon
+
+
+def _stops(pois: Sequence[Dict]) -> List[Stop]:
+    stops = []
+    for poi in pois:
+        coordinates = poi.get("coordinates") or {}
+        lat, lon = coordinates.get("latitude"), coordinates.get("longitude")
+        if lat is not None and lon is not None:
+            stops.append(Stop(poi, float(lat), float(lon)))
+    # Best-ranked first, names break ties so the same input always gives the same plan
+    stops.sort(key=lambda stop: (-stop.rank, stop.name))
+    return stops
+
+
+def _project(lats: np.ndarray, lons: np.ndarray, lat0: float) -> np.ndarray:
+    """Local equirectangular projection in km (accurate at city scale)"""
+    x = np.radians(lons) * math.cos(math.radians(lat0)) * EARTH_RADIUS_KM
+    y = np.radians(lats) * EARTH_RADIUS_KM
+    return np.stack([x, y], axis=1)
+
+
+def cluster(points: np.ndarray, capacities: Sequence[int], first_seed: int = 0,
+            iterations: int = 10) -> List[List[int]]:
+    """
+    Split points into len(capacities) geographic clusters, cluster g holding at most
+    capacities[g] points. Farthest-point seeding from `first_seed`, then Lloyd
+    iterations with a capacity-aware assignment (closest pairs first). Deterministic
+    for a given input order.
+    """
+    n = len(points)
+    groups = max(1, min(len(capacities), n))
+    seeds = [first_seed]
+    nearest = np.linalg.norm(points - points[first_seed], axis=1)
+    while len(seeds) < groups:
+        seed = int(np.argmax(nearest))
+        seeds.append(seed)
+        nearest = np.minimum(nearest, np.linalg.norm(points - points[seed], axis=1))
+    centroids = points[seeds].copy()
+
+    assignment = np.full(n, -1)
+    for _ in range(iterations):
+        distances = np.linalg.norm(points[:, None, :] - centroids[None, :, :], axis=2)
+        previous = assignment
+        assignment = np.full(n, -1)
+        load = [0] * groups
+        for flat in np.argsort(distances, axis=None, kind="stable"):
+            point, group = divmod(int(flat), groups)
+            if assignment[point] == -1 and load[group] < capacities[group]:
+                assignment[point] = group
+                load[group] += 1
+        if np.array_equal(assignment, previous):
+            break
+        for group in range(groups):
+            members = assignment == group
+            if members.any():
+                centroids[group] = points[members].mean(axis=0)
+    return [[int(i) for i in np.flatnonzero(assignment == group)] for group in range(groups)]
+
+
+def _slot_for(position: int, count: int, slots: Sequence[str]) -> str:
+    return slots[min(position * len(slots) // max(count, 1), len(slots) - 1)]
+
+
+def _route_cost(order: List[int], start: Optional[np.ndarray], points: np.ndarray, stops: List[Stop],
+                slots: Sequence[str]) -> float:
+    cost = 0.0
+    previous = start
+    for position, index in enumerate(order):
+        if previous is not None:
+            cost += float(np.linalg.norm(points[index] - previous))
+        previous = points[index]
+        if _slot_for(position, len(order), slots) not in stops[index].slots:
+            cost += SLOT_PENALTY_KM
+    return cost
+
+
+def order_day(members: List[int], start: Optional[np.ndarray], points: np.ndarray, stops: List[Stop],
+              slots: Sequence[str] = SLOTS) -> List[int]:
+    """Nearest-neighbour route from the hotel, improved with 2-opt on distance plus slot penalties"""
+    remaining = list(members)
+    order = []
+    current = start if start is not None else points[remaining[0]]
+    while remaining:
+        nearest = min(remaining, key=lambda i: (float(np.linalg.norm(points[i] - current)), i))
+        order.append(nearest)
+        remaining.remove(nearest)
+        current = points[nearest]
+
+    best = _route_cost(order, start, points, stops, slots)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                cost = _route_cost(candidate, start, points, stops, slots)
+                if cost < best - 1e-9:
+                    order, best, improved = candidate, cost, True
+    return order
+
+
+def plan_days(pois: Sequence[Dict], days: int, hotel: Optional[Dict] = None,
+              arrival_day: bool = True) -> List[Dict]:
+    """
+    Day-by-day skeleton: which POIs on which day, in which order and slot. When the
+    first day is also the travel day only its afternoon and evening are planned,
+    with the POIs closest to the hotel. Days left without POIs are free.
+    """
+    days = max(int(days or 1), 1)
+    day_slots = [SLOTS[1:] if arrival_day and day == 1 else SLOTS for day in range(1, days + 1)]
+    capacities = [max(1, PLANNER_POIS_PER_DAY * len(slots) // len(SLOTS)) for slots in day_slots]
+    stops = _stops(pois)[:sum(capacities)]
+    plan = [{"day": day, "stops": []} for day in range(1, days + 1)]
+    if not stops:
+        return plan
+
+    lats = np.array([stop.lat for stop in stops])
+    lons = np.array([stop.lon for stop in stops])
+    hotel_lat = hotel.get("latitude") if hotel else None
+    hotel_lon = hotel.get("longitude") if hotel else None
+    start = None
+    if hotel_lat is not None and hotel_lon is not None:
+        lat0 = float(hotel_lat)
+        start = _project(np.array([lat0]), np.array([float(hotel_lon)]), lat0)[0]
+    else:
+        lat0 = float(lats.mean())
+    points = _project(lats, lons, lat0)
+
+    # Day 1 grows around the POI nearest the hotel (or the best-ranked one); later days
+    # follow by distance from the hotel, so the trip works outwards
+    first_seed = int(np.argmin(np.linalg.norm(points - start, axis=1))) if start is not None else 0
+    # As many days as the sights fill; the remaining days stay free
+    used = next(count for count in range(1, days + 1) if sum(capacities[:count]) >= len(stops))
+    clusters = cluster(points, capacities[:used], first_seed)
+    origin = start if start is not None else points[first_seed]
+    later = sorted((members for members in clusters[1:] if members),
+                   key=lambda members: (float(np.linalg.norm(points[members].mean(axis=0) - origin)), members[0]))
+
+    for day, slots, members in zip(plan, day_slots, [clusters[0]] + later):
+        previous = start
+        order = order_day(members, start, points, stops, slots)
+        for position, index in enumerate(order):
+            leg = float(np.linalg.norm(points[index] - previous)) if previous is not None else 0.0
+            previous = points[index]
+            day["stops"].append({
+                "slot": _slot_for(position, len(order), slots),
+                "name": stops[index].name,
+                "type": stops[index].poi.get("type", ""),
+                "distanceKm": round(leg, 1),
+            })
+    return plan
+
+
+def format_skeleton(plan: List[Dict]) -> str:
+    """Compact one-line-per-day form for the prompt"""
+    lines = []
+    for day in plan:
+        stops = " | ".join(f"{stop['slot'].title()}: {stop['name']}" for stop in day["stops"])
+        lines.append(f"Day {day['day']}: {stops if stops else 'free / travel'}")
+    return "\n".join(lines)
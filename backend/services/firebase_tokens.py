@@ -0,0 +1,198 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+# Refresh the keys this long before Google's Cache-Control max-age runs out
+FIREBASE_CERTS_REFRESH_MARGIN = float(os.getenv("FIREBASE_CERTS_REFRESH_MARGIN", "300"))
+# Unknown key ids trigger an early refresh at most this often
+FIREBASE_CERTS_MIN_REFRESH_INTERVAL = float(os.getenv("FIREBASE_CERTS_MIN_REFRESH_INTERVAL", "60"))
+# Already verified tokens are trusted for this long (never past their exp)
+FIREBASE_VERIFIED_TOKEN_TTL = float(os.getenv("FIREBASE_VERIFIED_TOKEN_TTL", "300"))
+FIREBASE_CLOCK_SKEW = float(os.getenv("FIREBASE_CLOCK_SKEW", "0"))
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class InvalidIdToken(Exception):
+    """The token is malformed, badly signed, expired or issued for another project"""
+
+
+def fetch_google_certificates(url: str = FIREBASE_CERTS_URL) -> Tuple[Dict[str, str], float]:
+    """({key id: PEM certificate}, seconds the response may be cached)"""
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+    return response.json(), float(match.group(1)) if match else 3600.0
+
+
+class SigningKeys:
+    """
+    Google's token signing keys held in memory. A background thread refreshes them
+    shortly before their Cache-Control max-age runs out, so verification never waits
+    for a fetch (except for the very first one when the keys were not warmed up).
+    """
+
+    def __init__(self, fetch: Callable[[], Tuple[Dict[str, str], float]] = fetch_google_certificates,
+                 refresh_margin: float = FIREBASE_CERTS_REFRESH_MARGIN,
+                 min_refresh_interval: float = FIREBASE_CERTS_MIN_REFRESH_INTERVAL):
+        self._fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        self._keys = {}
+        self.expires_at = 0.0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._cold_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread_pid = None
+
+    def refresh(self):
+        certificates, max_age = self._fetch()
+        keys = {
+            kid: x509.load_pem_x509_certificate(pem.encode("ascii")).public_key()
+            for kid, pem in certificates.items()
+        }
+        now = time.time()
+        with self._lock:
+            self._keys = keys
+            self.expires_at = now + max_age
+            self._refreshed_at = now
+        logger.info(f"🔑 Loaded {len(keys)} Firebase signing key(s), valid for {max_age:.0f}s")
+
+    def start(self):
+        """Start the refresh thread (once per process)"""
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            threading.Thread(target=self._refresh_loop, name="firebase-keys", daemon=True).start()
+            self._thread_pid = os.getpid()
+
+    def _refresh_loop(self):
+        while True:
+            delay = self.expires_at - self.refresh_margin - time.time()
+            if delay > 0:
+                self._wake.wait(delay)
+                # Woken by an unknown key id right after a refresh: defer the next one
+                # rather than drop it, so rotated keys still arrive
+                wait = self._refreshed_at + self.min_refresh_interval - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+                self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"⚠️ Firebase signing key refresh failed: {e}")
+                # Keep the current keys and try again shortly
+                self._wake.wait(self.min_refresh_interval)
+                self._wake.clear()
+
+    def get(self, kid: str):
+        if not self._keys:
+            # Only when the keys were never loaded (warm_up() avoids this)
+            with self._cold_lock:
+                if not self._keys:
+                    self.refresh()
+        self.start()
+        key = self._keys.get(kid)
+        if key is None:
+            # Keys may have rotated ahead of schedule
+            self._wake.set()
+        return key
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class FirebaseTokenVerifier:
+    """
+    Verifies Firebase ID tokens locally (RS256 signature plus the claims the Admin SDK
+    checks) and remembers verified tokens by hash, so repeated calls cost a dict lookup.
+    """
+
+    def __init__(self, project_id: str, keys: SigningKeys = None,
+                 verified_ttl: float = FIREBASE_VERIFIED_TOKEN_TTL, max_entries: int = 10000):
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self.keys = keys or SigningKeys()
+        self.verified_ttl = verified_ttl
+        self._verified = TTLCache(max_entries=max_entries)
+
+    def verify(self, token: str) -> Dict:
+        now = time.time()
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        claims = self._verified.get(digest)
+        if claims is not None and claims["exp"] + FIREBASE_CLOCK_SKEW > now:
+            return claims
+
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            claims = json.loads(_b64decode(payload_segment))
+            signature = _b64decode(signature_segment)
+        except (ValueError, TypeError) as e:
+            raise InvalidIdToken(f"Malformed token: {e}")
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise InvalidIdToken("Malformed token")
+
+        if header.get("alg") != "RS256":
+            raise InvalidIdToken("Token must be signed with RS256")
+        key = self.keys.get(header.get("kid"))
+        if key is None:
+            raise InvalidIdToken("Token signed with an unknown key")
+        try:
+            key.verify(signature, f"{header_segment}.{payload_segment}".encode("ascii"),
+                       padding.PKCS1v15(), hashes.SHA256())
+        except InvalidSignature:
+            raise InvalidIdToken("Invalid token signature")
+
+        self._check_claims(claims, now)
+        claims["uid"] = claims["sub"]
+        ttl = min(self.verified_ttl, claims["exp"] - now)
+        if ttl > 0:
+            self._verified.set(digest, claims, ttl)
+        return claims
+
+    def _check_claims(self, claims: Dict, now: float):
+        if claims.get("aud") != self.project_id:
+            raise InvalidIdToken("Token issued for another project")
+        if claims.get("iss") != self.issuer:
+            raise InvalidIdToken("Unexpected token issuer")
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise InvalidIdToken("Invalid token subject")
+        for claim in ("exp", "iat"):
+            if not isinstance(claims.get(claim), (int, float)):
+                raise InvalidIdToken(f"Missing {claim} claim")
+        if claims["exp"] + FIREBASE_CLOCK_SKEW <= now:
+            raise InvalidIdToken("Token expired")
+        if claims["iat"] - FIREBASE_CLOCK_SKEW > now or claims.get("auth_time", 0) - FIREBASE_CLOCK_SKEW > now:
+            raise InvalidIdToken("Token used before it was issued")
+
+
+def project_id_from_credentials(path: str) -> Optional[str]:
+    """project_id from a service-account JSON file, if it can be read"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("project_id")
+    except (OSError, ValueError):
+        return None
@@ -2,13 +2,45 @@ import os
 import requests
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import zip_longest
+from .cache import get_cache
+from .rail_fares import RailFareEngine, parse_upstream_fares
+from .rail_records import parse_trains, parse_distance
+from .irctc_client import IRCTCClient, QuotaExceeded
+from .metrics import RAIL_FALLBACKS
+from .runtime import submit_in_context
+from .tracing import span
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Used when the route distance is unknown (RPM-MAS)
+DEFAULT_ROUTE_DISTANCE_KM = 485
+
+# Cache lifetimes for per-train lookups (seconds)
+SCHEDULE_CACHE_TTL = 24 * 3600
+FARE_CACHE_TTL = 6 * 3600
+AVAILABILITY_CACHE_TTL = 5 * 60
+SEARCH_CACHE_TTL = 10 * 60
+
+# Batch enrichment limits
+ENRICH_MAX_WORKERS = int(os.getenv("IRCTC_ENRICH_MAX_WORKERS", "8"))
+ENRICH_DEADLINE_SECONDS = float(os.getenv("IRCTC_ENRICH_DEADLINE", "12"))
+# Upstream fare lookups per batch (one per train type) used to refresh the fare tables
+ENRICH_FARE_SAMPLE_SIZE = int(os.getenv("IRCTC_ENRICH_FARE_SAMPLE", "2"))
+# Enrich the trains offered through the travel-data pipeline (costs upstream quota)
+ENRICH_SEARCH_RESULTS = os.getenv("IRCTC_ENRICH_RESULTS", "false").lower() == "true"
+ENRICH_MAX_TRAINS = int(os.getenv("IRCTC_ENRICH_MAX_TRAINS", "5"))
+
+# Fan-out limit for multi-station city searches
+SEARCH_MAX_WORKERS = int(os.getenv("IRCTC_SEARCH_MAX_WORKERS", "6"))
+# Station pairs searched per city pair (primary pair first, then primary x alternates, both sides in turn)
+SEARCH_MAX_PAIRS = int(os.getenv("IRCTC_SEARCH_MAX_PAIRS", "4"))
+# Below this share of the monthly quota only the primary pair is searched
+SEARCH_FANOUT_MIN_QUOTA_SHARE = 0.2
+
 class IndianRailService:
     def __init__(self):
         # RapidAPI IRCTC endpoints (using the working endpoint you found)
@@ -21,6 +53,17 @@ class IndianRailService:
             'X-RapidAPI-Key': self.rapidapi_key,
             'X-RapidAPI-Host': self.rapidapi_host
         }
+
+        # Pooled, quota-aware client shared by every IRCTC call
+        self.client = IRCTCClient(self.rapidapi_key, self.rapidapi_host, self.base_url)
+
+        # Distance-slab fare tables used to price every train/class locally
+        self.fare_engine = RailFareEngine()
+
+        # Per-lookup cache (shared across workers) and bounded pool for batch enrichment
+        self.lookup_cache = get_cache("rail", max_entries=4096)
+        self.enrich_executor = ThreadPoolExecutor(max_workers=ENRICH_MAX_WORKERS, thread_name_prefix="irctc-enrich")
+        self.search_executor = ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="irctc-search")
         
         # Comprehensive IRCTC station code mapping
         self.station_codes = {
@@ -88,7 +131,8 @@ class IndianRailService:
             'agra': 'AGC',
             'lucknow': 'LJN',
             'kanpur': 'CNB',
-            'allahabad': 'ALD',
+            'allahabad': 'PRYJ',
+            'prayagraj': 'PRYJ',
             'varanasi': 'BSB',
             'patna': 'PNBE',
             'gaya': 'GAYA',
@@ -115,6 +159,42 @@ class IndianRailService:
             'margao': 'MAO',
             'panaji': 'PNJI'
         }
+
+        # Cities served by several stations; the first code is the primary one
+        self.station_groups = {
+            'chennai': ('MAS', 'MS', 'TBM'),
+            'mumbai': ('CSTM', 'BCT', 'LTT', 'DR'),
+            'delhi': ('NDLS', 'DLI', 'NZM', 'ANVT', 'DEE'),
+            'new delhi': ('NDLS', 'DLI', 'NZM', 'ANVT', 'DEE'),
+            'kolkata': ('HWH', 'SDAH', 'KOAA'),
+            'bangalore': ('SBC', 'YPR', 'SMVB', 'BNC'),
+            'bengaluru': ('SBC', 'YPR', 'SMVB', 'BNC'),
+            'hyderabad': ('SC', 'HYB', 'KCG'),
+            'secunderabad': ('SC', 'HYB', 'KCG'),
+            'pune': ('PUNE', 'KK'),
+            'ahmedabad': ('ADI', 'SBI'),
+            'jaipur': ('JP', 'GADJ'),
+            'lucknow': ('LJN', 'LKO'),
+            'kanpur': ('CNB', 'CPA'),
+            'allahabad': ('PRYJ', 'ALY'),
+            'prayagraj': ('PRYJ', 'ALY'),
+            'varanasi': ('BSB', 'BSBS'),
+            'patna': ('PNBE', 'RJPB', 'PPTA'),
+            'bhopal': ('BPL', 'RKMP'),
+            'kochi': ('ERS', 'ERN'),
+            'ernakulam': ('ERS', 'ERN'),
+            'trivandrum': ('TVC', 'KCVL'),
+            'thiruvananthapuram': ('TVC', 'KCVL'),
+            'mangalore': ('MAQ', 'MAJN'),
+            'goa': ('MAO', 'KRMI', 'VSG'),
+            'coimbatore': ('CBE', 'CBF', 'PTJ'),
+            'madurai': ('MDU',),
+        }
+
+        # Every code we can recognise without a lookup
+        self.known_codes = frozenset(self.station_codes.values()).union(
+            *self.station_groups.values()
+        )
         
         # Realistic train data for Rajapalayam-Chennai route
         self.realistic_train_data = {
@@ -232,6 +312,10 @@ class IndianRailService:
         """Get station code from station name with fuzzy matching"""
         station_key = station_name.lower().strip()
 
+        # Already a known station code
+        if station_name.strip().upper() in self.known_codes:
+            return station_name.strip().upper()
+
         # Direct match
         if station_key in self.station_codes:
             return self.station_codes[station_key]
@@ -257,14 +341,20 @@ class IndianRailService:
         logger.warning(f"⚠️ No station code found for '{station_name}', using fallback: {fallback_code}")
         return fallback_code
 
+    def get_station_codes(self, city: str) -> tuple:
+        """Get every station serving a city (a single code for specific stations)"""
+        city_key = city.lower().strip()
+        if city_key in self.station_groups:
+            return self.station_groups[city_key]
+        return (self.get_station_code(city),)
+
     def _search_station_code_via_api(self, station_name: str) -> str:
         """Search for station code using IRCTC API"""
         try:
             # Try station search endpoint if available
-            search_url = f"{self.base_url}/api/v3/stationSearch"
             params = {'stationName': station_name}
 
-            response = requests.get(search_url, headers=self.headers, params=params, timeout=10)
+            response = self.client.get("/api/v3/stationSearch", params=params, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if 'data' in data and len(data['data']) > 0:
@@ -278,12 +368,104 @@ class IndianRailService:
         return None
     
     def search_trains_between_stations(self, source: str, destination: str, date: str = None) -> Dict:
-        """Search trains between two stations using RapidAPI IRCTC"""
+        """Search trains between two cities across all of their stations"""
         try:
-            source_code = self.get_station_code(source)
-            dest_code = self.get_station_code(destination)
+            with span("rail.station_resolution", source=source, destination=destination):
+                source_codes = self.get_station_codes(source)
+                dest_codes = self.get_station_codes(destination)
+                pairs = self._station_pairs(source_codes, dest_codes)
+            if not pairs:
+                return self._get_realistic_train_data(source_codes[0], dest_codes[0])
+
+            logger.info(f"🚄 Searching trains from {source} ({'/'.join(source_codes)}) to {destination} ({'/'.join(dest_codes)}) across {len(pairs)} station pair(s)")
+
+            with span("rail.search", pairs=len(pairs)):
+                if len(pairs) == 1:
+                    results = [self._search_station_pair(pairs[0][0], pairs[0][1], date)]
+                else:
+                    futures = [submit_in_context(self.search_executor, self._search_station_pair, s, d, date) for s, d in pairs]
+                    results = [future.result() for future in futures]
+
+            merged = self._merge_search_results(results, source_codes, dest_codes)
+            merged["stationPairs"] = [f"{s}-{d}" for s, d in pairs]
+            return merged
 
-            logger.info(f"🚄 Searching trains from {source} ({source_code}) to {destination} ({dest_code}) using IRCTC API")
+        except Exception as e:
+            logger.error(f"❌ Error searching trains: {e}")
+            return {"trains": [], "error": str(e)}
+
+    def _station_pairs(self, source_codes: tuple, dest_codes: tuple) -> List[tuple]:
+        """
+        Station pairs to search, in priority order: the primary pair, then the primary
+        station against the alternates on the other side, taking destination and source
+        alternates in turn so the cap never spends the whole budget on one side. The
+        list is capped so one search stays within a single burst of the rate limiter,
+        and shrinks to the primary pair when the monthly quota is running low.
+        """
+        primary_source, primary_dest = source_codes[0], dest_codes[0]
+        candidates = [(primary_source, primary_dest)]
+        alternates = zip_longest([(primary_source, d) for d in dest_codes[1:]],
+                                 [(s, primary_dest) for s in source_codes[1:]])
+        candidates += [pair for both in alternates for pair in both if pair is not None]
+        pairs = []
+        for pair in candidates:
+            if pair[0] != pair[1] and pair not in pairs:
+                pairs.append(pair)
+
+        limit = min(SEARCH_MAX_PAIRS, int(self.client.bucket.capacity))
+        usage = self.client.bucket.usage()
+        if usage["monthlyRemaining"] < usage["monthlyQuota"] * SEARCH_FANOUT_MIN_QUOTA_SHARE:
+            limit = 1
+        return pairs[:max(1, limit)]
+
+    def _merge_search_results(self, results: List[Dict], source_codes: tuple, dest_codes: tuple) -> Dict:
+        """Merge per-pair results (in station priority order), de-duplicating by train number"""
+        if len(results) == 1:
+            return results[0]
+
+        trains = []
+        seen = set()
+        data_sources = set()
+        for result in results:
+            if result.get("trains"):
+                data_sources.add(result.get("dataSource"))
+            for train in result.get("trains", []):
+                number = train.get("trainNumber")
+                if number in seen:
+                    continue
+                seen.add(number)
+                trains.append(train)
+
+        merged = {
+            "trains": trains,
+            "source": source_codes[0],
+            "destination": dest_codes[0],
+            "sourceStations": list(source_codes),
+            "destinationStations": list(dest_codes),
+            "totalTrains": len(trains)
+        }
+        if "irctc_api" in data_sources:
+            merged["dataSource"] = "irctc_api"
+        elif data_sources:
+            merged["dataSource"] = data_sources.pop()
+        else:
+            merged["dataSource"] = "no_data"
+            merged["error"] = f"No trains found between {'/'.join(source_codes)} and {'/'.join(dest_codes)}"
+        return merged
+
+    def _search_station_pair(self, source_code: str, dest_code: str, date: str = None) -> Dict:
+        """Search one station pair; API results are cached per pair and date"""
+        return self.lookup_cache.get_or_set(
+            ("search", source_code, dest_code, date),
+            lambda: self._fetch_station_pair(source_code, dest_code, date),
+            ttl=SEARCH_CACHE_TTL,
+            should_cache=lambda result: result.get("dataSource") == "irctc_api"
+        )
+
+    def _fetch_station_pair(self, source_code: str, dest_code: str, date: str = None) -> Dict:
+        """Search trains between two station codes using RapidAPI IRCTC"""
+        try:
+            logger.info(f"🚄 Searching trains from {source_code} to {dest_code} using IRCTC API")
 
             # Check if RapidAPI key is available
             if not self.rapidapi_key or self.rapidapi_key == '':
@@ -293,7 +475,7 @@ class IndianRailService:
             # Try RapidAPI IRCTC endpoints
             try:
                 # IRCTC API endpoint (using the working format you found)
-                endpoint = f"{self.base_url}/api/v3/trainBetweenStations"
+                endpoint = "/api/v3/trainBetweenStations"
 
                 # Parameters for the API call (including required dateOfJourney)
                 journey_date = date or '2025-08-22'  # Use provided date or default
@@ -305,15 +487,13 @@ class IndianRailService:
 
                 try:
                     logger.info(f"🔍 Trying IRCTC API endpoint: {endpoint}")
-                    response = requests.get(endpoint, headers=self.headers, params=params, timeout=15)
+                    response = self.client.get(endpoint, params=params, timeout=15)
 
                     if response.status_code == 200:
-                        data = response.json()
                         logger.info(f"✅ Successfully fetched data from IRCTC API!")
-                        logger.info(f"📊 Response keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
 
-                        # Try to format the response
-                        formatted_data = self._format_irctc_api_response(data, source_code, dest_code)
+                        # Parse the raw body incrementally into train records
+                        formatted_data = self._format_irctc_api_response(response.content, source_code, dest_code)
                         if formatted_data.get('trains'):
                             return formatted_data
 
@@ -324,6 +504,8 @@ class IndianRailService:
                     else:
                         logger.warning(f"⚠️ API returned status {response.status_code}: {response.text[:200]}")
 
+                except QuotaExceeded as e:
+                    logger.warning(f"🚦 IRCTC call shed: {e}")
                 except requests.exceptions.Timeout:
                     logger.warning(f"⏰ Timeout for IRCTC API")
                 except requests.exceptions.RequestException as e:
@@ -344,6 +526,7 @@ class IndianRailService:
     
     def _get_realistic_train_data(self, source_code: str, dest_code: str) -> Dict:
         """Get realistic train data based on actual routes"""
+        RAIL_FALLBACKS.inc()
         route_key = f"{source_code}_to_{dest_code}"
         
         if route_key in self.realistic_train_data:
@@ -367,123 +550,35 @@ class IndianRailService:
                 "dataSource": "no_data"
             }
     
-    def _format_irctc_api_response(self, data: Dict, source_code: str, dest_code: str) -> Dict:
-        """Format IRCTC API response to our standard format"""
+    def _format_irctc_api_response(self, data: Union[bytes, str, Dict], source_code: str, dest_code: str) -> Dict:
+        """Format IRCTC API response (raw body or decoded JSON) to our standard format"""
         try:
-            trains = []
-
-            # Handle IRCTC API response format
-            train_list = []
+            train_records, errors = parse_trains(data, source_code, dest_code)
 
             # Check for errors first
-            if 'errors' in data:
-                logger.warning(f"⚠️ IRCTC API returned errors: {data['errors']}")
+            if errors:
+                logger.warning(f"⚠️ IRCTC API returned errors: {errors}")
                 return {
                     "trains": [],
                     "source": source_code,
                     "destination": dest_code,
                     "totalTrains": 0,
-                    "error": f"IRCTC API errors: {data['errors']}",
+                    "error": f"IRCTC API errors: {errors}",
                     "dataSource": "irctc_api_error"
                 }
 
-            if isinstance(data, dict):
-                # Try common response structures for IRCTC API
-                if 'data' in data and isinstance(data['data'], list):
-                    train_list = data['data']
-                elif 'trains' in data and isinstance(data['trains'], list):
-                    train_list = data['trains']
-                elif 'result' in data and isinstance(data['result'], list):
-                    train_list = data['result']
-                elif 'trainBtwnStnsList' in data and isinstance(data['trainBtwnStnsList'], list):
-                    train_list = data['trainBtwnStnsList']
-                elif isinstance(data, list):
-                    train_list = data
-                else:
-                    # If data is a dict but not in expected format, try to extract train info
-                    for _, value in data.items():
-                        if isinstance(value, list) and len(value) > 0:
-                            # Check if this looks like train data
-                            if isinstance(value[0], dict) and any(k in value[0] for k in ['train_number', 'trainNumber', 'train_name', 'trainName', 'trainNo', 'trainName']):
-                                train_list = value
-                                break
-
-            for train_info in train_list:
-                if not isinstance(train_info, dict):
-                    continue
-
-                # Extract train information using actual IRCTC API field names
-                train_number = train_info.get('train_number', '')
-                train_name = train_info.get('train_name', '')
-
-                # Departure and arrival times
-                dept_time = train_info.get('from_std', '')  # Standard departure time
-                arr_time = train_info.get('to_std', '')     # Standard arrival time
+            # Price every train in one pass, keeping only classes the fare tables know
+            fare_matrix = self.fare_engine.fare_matrix(
+                [t.distance_km or DEFAULT_ROUTE_DISTANCE_KM for t in train_records],
+                [t.train_type for t in train_records]
+            )
+            class_index = self.fare_engine.class_index
+            for row, train in enumerate(train_records):
+                codes = tuple(code for code in train.class_codes if code in class_index) or ("SL",)
+                train.class_codes = codes
+                train.fares = tuple(int(fare_matrix[row, class_index[code], 0]) for code in codes)
 
-                # Duration and distance
-                duration = train_info.get('duration', '')
-                distance = f"{train_info.get('distance', 0)} km"
-
-                # Running days
-                running_days = train_info.get('run_days', [])
-
-                # Station information
-                from_station = train_info.get('from_station_name', source_code)
-                to_station = train_info.get('to_station_name', dest_code)
-
-                # Train type and class information
-                train_type = train_info.get('train_type', 'MAIL EXPRESS')
-                class_types = train_info.get('class_type', ['SL'])
-
-                # Calculate basic fare (this would need a separate API call for exact fares)
-                base_distance = train_info.get('distance', 485)
-                estimated_fare = int(base_distance * 0.38)  # Rough estimate for sleeper class
-
-                # Create classes with estimated fares based on distance
-                classes = {
-                    "SL": {"fare": estimated_fare, "available": "Available"},
-                    "3A": {"fare": int(estimated_fare * 2.6), "available": "Available"},
-                    "2A": {"fare": int(estimated_fare * 3.8), "available": "Available"},
-                    "1A": {"fare": int(estimated_fare * 6.3), "available": "Available"}
-                }
-
-                # Only include classes that are actually available for this train
-                available_classes = {}
-                for class_code in class_types:
-                    if class_code in ['SL', '3A', '2A', '1A']:
-                        available_classes[class_code] = classes[class_code]
-                    elif class_code == 'CC':  # Chair Car
-                        available_classes['CC'] = {"fare": int(estimated_fare * 1.5), "available": "Available"}
-                    elif class_code == 'EC':  # Executive Chair Car
-                        available_classes['EC'] = {"fare": int(estimated_fare * 2.0), "available": "Available"}
-
-                if not available_classes:
-                    available_classes = {"SL": classes["SL"]}  # Default to sleeper
-
-                if train_number and train_name:
-                    formatted_train = {
-                        "trainNumber": str(train_number),
-                        "trainName": str(train_name),
-                        "departure": {
-                            "station": train_info.get('from_station_name', source_code),
-                            "stationCode": source_code,
-                            "time": str(dept_time),
-                            "platform": "1"
-                        },
-                        "arrival": {
-                            "station": train_info.get('to_station_name', dest_code),
-                            "stationCode": dest_code,
-                            "time": str(arr_time),
-                            "platform": "1"
-                        },
-                        "duration": str(duration),
-                        "distance": str(distance),
-                        "classes": available_classes,
-                        "runsOn": running_days or ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-                        "route": [source_code, dest_code],
-                        "trainType": train_info.get('train_type', 'MAIL EXPRESS')
-                    }
-                    trains.append(formatted_train)
+            trains = [train.to_dict() for train in train_records]
 
             if trains:
                 logger.info(f"✅ Successfully formatted {len(trains)} trains from IRCTC API")
@@ -518,10 +613,18 @@ class IndianRailService:
     
     def get_train_schedule(self, train_number: str) -> Dict:
         """Get train schedule by train number"""
+        return self.lookup_cache.get_or_set(
+            ("schedule", train_number),
+            lambda: self._fetch_train_schedule(train_number),
+            ttl=SCHEDULE_CACHE_TTL,
+            should_cache=lambda result: "error" not in result
+        )
+
+    def _fetch_train_schedule(self, train_number: str) -> Dict:
         try:
             # Try real API first
-            endpoint = f"{self.base_url}/train-schedule/{train_number}"
-            response = requests.get(endpoint, timeout=10)
+            endpoint = f"/train-schedule/{train_number}"
+            response = self.client.get(endpoint, timeout=10)
             
             if response.status_code == 200:
                 return response.json()
@@ -531,41 +634,87 @@ class IndianRailService:
         
         # Return mock data for common trains
         return {"error": "Train schedule not available"}
+
+    def get_seat_availability(self, train_number: str, source_code: str, dest_code: str,
+                              class_type: str, date: str, quota: str = "GN") -> Dict:
+        """Get seat availability for one train/class on a date"""
+        return self.lookup_cache.get_or_set(
+            ("availability", train_number, source_code, dest_code, class_type, date, quota),
+            lambda: self._fetch_seat_availability(train_number, source_code, dest_code, class_type, date, quota),
+            ttl=AVAILABILITY_CACHE_TTL,
+            should_cache=lambda result: "error" not in result
+        )
+
+    def _fetch_seat_availability(self, train_number: str, source_code: str, dest_code: str,
+                                 class_type: str, date: str, quota: str) -> Dict:
+        try:
+            params = {
+                'trainNo': train_number,
+                'fromStationCode': source_code,
+                'toStationCode': dest_code,
+                'classType': class_type,
+                'quota': quota,
+                'date': date
+            }
+            response = self.client.get("/api/v1/checkSeatAvailability", params=params, timeout=10)
+
+            if response.status_code == 200:
+                data = response.json()
+                rows = data.get("data") if isinstance(data, dict) else None
+                if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+                    status = rows[0].get("current_status") or rows[0].get("status")
+                    if status:
+                        return {"class": class_type, "date": date, "status": str(status)}
+
+        except Exception as e:
+            logger.warning(f"Seat availability API failed: {e}")
+
+        return {"error": "Seat availability not available"}
     
-    def get_train_fare(self, train_number: str, source: str, destination: str, class_type: str = "SL") -> Dict:
+    def get_train_fare(self, train_number: str, source: str, destination: str, class_type: str = "SL",
+                       distance_km: Optional[float] = None, train_type: Optional[str] = None) -> Dict:
         """Get train fare between stations"""
+        return self.lookup_cache.get_or_set(
+            ("fare", train_number, source, destination, class_type),
+            lambda: self._fetch_train_fare(train_number, source, destination, class_type, distance_km, train_type),
+            ttl=FARE_CACHE_TTL,
+            should_cache=lambda result: "error" not in result and result.get("dataSource") != "realistic_fare"
+        )
+
+    def _fetch_train_fare(self, train_number: str, source: str, destination: str, class_type: str,
+                          distance_km: Optional[float], train_type: Optional[str]) -> Dict:
         try:
             source_code = self.get_station_code(source)
             dest_code = self.get_station_code(destination)
             
             # Try real API
-            endpoint = f"{self.base_url}/train-fare/{train_number}/{source_code}/{dest_code}/{class_type}"
-            response = requests.get(endpoint, timeout=10)
+            endpoint = f"/train-fare/{train_number}/{source_code}/{dest_code}/{class_type}"
+            response = self.client.get(endpoint, timeout=10)
             
             if response.status_code == 200:
-                return response.json()
+                data = response.json()
+                # Upstream fares only recalibrate the local tables
+                distance = distance_km or self._get_route_distance(source_code, dest_code)
+                self.fare_engine.refresh(
+                    (train_type, code, distance, fare) for code, fare in parse_upstream_fares(data)
+                )
+                return data
                 
         except Exception as e:
             logger.warning(f"Train fare API failed: {e}")
         
         # Use realistic fare data
-        return self._get_realistic_fare(train_number, source, destination, class_type)
+        return self._get_realistic_fare(train_number, source, destination, class_type, distance_km, train_type)
     
-    def _get_realistic_fare(self, train_number: str, source: str, destination: str, class_type: str) -> Dict:
+    def _get_realistic_fare(self, train_number: str, source: str, destination: str, class_type: str,
+                            distance_km: Optional[float] = None, train_type: Optional[str] = None) -> Dict:
         """Get realistic fare based on distance and class"""
-        # Simplified fare calculation based on distance
-        base_fares = {
-            "SL": 0.38,   # per km
-            "3A": 1.0,    # per km  
-            "2A": 1.43,   # per km
-            "1A": 2.4     # per km
-        }
-        
-        # Approximate distance (this would be more accurate with real data)
-        distance = 485  # km for RPM-MAS route
-        
-        if class_type in base_fares:
-            fare = int(distance * base_fares[class_type])
+        distance = distance_km or self._get_route_distance(
+            self.get_station_code(source), self.get_station_code(destination)
+        )
+
+        fare = self.fare_engine.fare(distance, class_type, train_type)
+        if fare is not None:
             return {
                 "trainNumber": train_number,
                 "source": source,
@@ -573,14 +722,139 @@ class IndianRailService:
                 "class": class_type,
                 "fare": fare,
                 "distance": distance,
-                "currency": "INR"
+                "currency": "INR",
+                "dataSource": "realistic_fare"
             }
         
         return {"error": "Fare not available"}
+
+    def _get_route_distance(self, source_code: str, dest_code: str) -> float:
+        """Best known distance for a route, from local route data"""
+        for train in self.realistic_train_data.get(f"{source_code}_to_{dest_code}", []):
+            distance = self._parse_distance(train.get("distance"))
+            if distance:
+                return distance
+        return DEFAULT_ROUTE_DISTANCE_KM
+
+    @staticmethod
+    def _parse_distance(value) -> float:
+        """Parse distances such as 485, "485" or "485 km" into km"""
+        return parse_distance(value, DEFAULT_ROUTE_DISTANCE_KM) or DEFAULT_ROUTE_DISTANCE_KM
     
+    def get_quota_stats(self) -> Dict:
+        """RapidAPI quota consumption and shedding counters"""
+        return self.client.stats()
+
+    def enrich_trains(self, search_result: Dict, date: str = None, classes: tuple = None,
+                      deadline: float = None) -> List[Dict]:
+        """
+        Enrich every train of a search result with schedule, fares and class availability.
+        Lookups run concurrently on the shared bounded pool and anything not back by the
+        deadline is left out; each finished lookup stays cached for later searches.
+        Upstream fares are only fetched for a small sample (one train per train type) to
+        refresh the fare tables, which then price every train in one pass.
+        """
+        trains = search_result.get("trains", [])
+        if not trains:
+            return []
+
+        deadline = ENRICH_DEADLINE_SECONDS if deadline is None else deadline
+        journey_date = date or datetime.now().strftime("%Y-%m-%d")
+        source_code = search_result.get("source", "")
+        dest_code = search_result.get("destination", "")
+        executor = self.enrich_executor
+
+        jobs = {}
+        submitted = set()
+        sampled_types = set()
+        for index, train in enumerate(trains):
+            number = train.get("trainNumber", "")
+            from_code = train.get("departure", {}).get("stationCode") or source_code
+            to_code = train.get("arrival", {}).get("stationCode") or dest_code
+            train_classes = [c for c in train.get("classes", {}) if classes is None or c in classes]
+
+            if ("schedule", number) not in submitted:
+                submitted.add(("schedule", number))
+                jobs[submit_in_context(executor, self.get_train_schedule, number)] = ("schedule", number, None)
+
+            train_type = self.fare_engine.normalize_train_type(train.get("trainType"))
+            if (train.get("trainType") and train_classes and train_type not in sampled_types
+                    and len(sampled_types) < ENRICH_FARE_SAMPLE_SIZE):
+                sampled_types.add(train_type)
+                jobs[submit_in_context(
+                    executor, self.get_train_fare, number, from_code, to_code, train_classes[0],
+                    self._parse_distance(train.get("distance")), train.get("trainType")
+                )] = ("fare", number, None)
+
+            for class_code in train_classes:
+                key = ("availability", number, from_code, to_code, class_code)
+                if key in submitted:
+                    continue
+                submitted.add(key)
+                jobs[submit_in_context(
+                    executor, self.get_seat_availability, number, from_code, to_code, class_code, journey_date
+                )] = ("availability", number, class_code)
+
+        with span("rail.enrich", lookups=len(jobs)):
+            done, pending = wait(jobs, timeout=deadline)
+        for future in pending:
+            future.cancel()
+
+        # Collect lookups by train number
+        schedules = {}
+        availability = {}
+        failed = {}
+        for future, (kind, number, class_code) in jobs.items():
+            label = f"{kind}:{class_code}" if class_code else kind
+            result = None
+            if future in done and not future.cancelled() and future.exception() is None:
+                result = future.result()
+            if result is None or "error" in result:
+                failed.setdefault(number, []).append(label)
+            elif kind == "schedule":
+                schedules[number] = result
+            elif kind == "availability":
+                availability[(number, class_code)] = result["status"]
+
+        # The fare sample has refreshed the tables by now; re-price everything in one pass
+        fare_matrix = self.fare_engine.fare_matrix(
+            [self._parse_distance(t.get("distance")) for t in trains],
+            [t.get("trainType") for t in trains]
+        )
+
+        enriched = []
+        for index, train in enumerate(trains):
+            number = train.get("trainNumber", "")
+            item = dict(train)
+            item["classes"] = {code: dict(info) for code, info in train.get("classes", {}).items()}
+            for code, info in item["classes"].items():
+                class_idx = self.fare_engine.class_index.get(code)
+                if item.get("trainType") and class_idx is not None:
+                    info["fare"] = int(fare_matrix[index, class_idx, 0])
+                if (number, code) in availability:
+                    info["available"] = availability[(number, code)]
+            if number in schedules:
+                item["schedule"] = schedules[number]
+            missing = failed.get(number, [])
+            item["enrichment"] = {"complete": not missing, "missing": list(missing)}
+            enriched.append(item)
+
+        if pending:
+            logger.warning(f"⏰ Train enrichment deadline hit: {len(pending)} of {len(jobs)} lookups dropped")
+        logger.info(f"🧩 Enriched {len(enriched)} trains with {len(done)} lookups")
+        return enriched
+
     def format_for_amadeus_integration(self, source: str, destination: str, date: str, passengers: int = 1) -> Dict:
         """Format train data for integration with our travel system"""
         train_data = self.search_trains_between_stations(source, destination, date)
+
+        # Live sleeper availability and schedules for the first few API results
+        if ENRICH_SEARCH_RESULTS and train_data.get("dataSource") == "irctc_api":
+            head = dict(train_data, trains=train_data["trains"][:ENRICH_MAX_TRAINS])
+            train_data = dict(
+                train_data,
+                trains=self.enrich_trains(head, date, classes=("SL",)) + train_data["trains"][ENRICH_MAX_TRAINS:]
+            )
         
         formatted_options = []
         
@@ -605,7 +879,8 @@ class IndianRailService:
                     "arrival": train.get("arrival", {}).get("platform", "")
                 },
                 "route": train.get("route", []),
-                "runsOn": train.get("runsOn", [])
+                "runsOn": train.get("runsOn", []),
+                **({"schedule": train["schedule"]} if "schedule" in train else {})
             })
         
         return {
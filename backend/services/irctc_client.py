@@ -0,0 +1,260 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import upstream_call
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_QUOTA_STATE_PATH = os.path.join(BASE_DIR, "irctc_quota.db")
+
+
+class QuotaExceeded(Exception):
+    """Raised when a call is shed because the RapidAPI budget is exhausted"""
+
+
+class TokenBucket:
+    """
+    Requests-per-second token bucket plus a monthly quota counter.
+    State lives in a small SQLite file so every worker process on the host draws
+    from the same budget; BEGIN IMMEDIATE serializes the read-modify-write.
+    """
+
+    def __init__(self, rate: float, capacity: float, monthly_quota: int, state_path: str = DEFAULT_QUOTA_STATE_PATH):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.monthly_quota = int(monthly_quota)
+        self.state_path = state_path
+        self._local = threading.local()
+        # The state file is opened on first use so importing the app writes nothing
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.state_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._init_state(conn)
+                    self._initialized = True
+        return conn
+
+    def _init_state(self, conn: sqlite3.Connection):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bucket ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1),"
+            " tokens REAL NOT NULL, updated_at REAL NOT NULL,"
+            " month TEXT NOT NULL, month_used INTEGER NOT NULL,"
+            " blocked_until REAL NOT NULL DEFAULT 0)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO bucket (id, tokens, updated_at, month, month_used, blocked_until) "
+            "VALUES (1, ?, ?, ?, 0, 0)",
+            (self.capacity, time.time(), self._current_month())
+        )
+
+    @staticmethod
+    def _current_month() -> str:
+        return datetime.utcnow().strftime("%Y-%m")
+
+    def try_acquire(self) -> Optional[float]:
+        """
+        Take one token if possible.
+        Returns 0 on success, the seconds to wait before retrying, or None when the
+        monthly quota is exhausted.
+        """
+        conn = self._connect()
+        now = time.time()
+        month = self._current_month()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated_at, stored_month, month_used, blocked_until = conn.execute(
+                "SELECT tokens, updated_at, month, month_used, blocked_until FROM bucket WHERE id = 1"
+            ).fetchone()
+
+            if stored_month != month:
+                month_used = 0
+            if month_used >= self.monthly_quota:
+                conn.execute("UPDATE bucket SET month = ?, month_used = ? WHERE id = 1", (month, month_used))
+                return None
+            if now < blocked_until:
+                return blocked_until - now
+
+            tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                month_used += 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+
+            conn.execute(
+                "UPDATE bucket SET tokens = ?, updated_at = ?, month = ?, month_used = ? WHERE id = 1",
+                (tokens, now, month, month_used)
+            )
+            return wait
+        finally:
+            conn.execute("COMMIT")
+
+    def block_for(self, seconds: float):
+        """Stop handing out tokens for a while (e.g. after a 429)"""
+        conn = self._connect()
+        # Refill restarts from the end of the cooldown, not from the last grant
+        blocked_until = time.time() + seconds
+        conn.execute(
+            "UPDATE bucket SET blocked_until = MAX(blocked_until, ?), tokens = 0,"
+            " updated_at = MAX(blocked_until, ?) WHERE id = 1",
+            (blocked_until, blocked_until)
+        )
+
+    def sync_remaining(self, remaining: int):
+        """Align the monthly counter with the provider's own remaining-requests header"""
+        conn = self._connect()
+        conn.execute(
+            "UPDATE bucket SET month = ?, month_used = ? WHERE id = 1",
+            (self._current_month(), max(0, self.monthly_quota - int(remaining)))
+        )
+
+    def usage(self) -> Dict:
+        """Current monthly consumption"""
+        if not self._initialized and not os.path.exists(self.state_path):
+            return {"monthlyQuota": self.monthly_quota, "monthlyUsed": 0, "monthlyRemaining": self.monthly_quota}
+        month, month_used = self._connect().execute(
+            "SELECT month, month_used FROM bucket WHERE id = 1"
+        ).fetchone()
+        if month != self._current_month():
+            month_used = 0
+        return {
+            "monthlyQuota": self.monthly_quota,
+            "monthlyUsed": month_used,
+            "monthlyRemaining": max(0, self.monthly_quota - month_used)
+        }
+
+
+class IRCTCClient:
+    """RapidAPI IRCTC client with a pooled session and a shared quota-aware rate limiter"""
+
+    def __init__(self, api_key: str, host: str = "irctc1.p.rapidapi.com", base_url: str = None,
+                 requests_per_second: float = None, monthly_quota: int = None,
+                 max_queue_wait: float = None, max_queued: int = None, state_path: str = None):
+        self.api_key = api_key
+        self.host = host
+        self.base_url = base_url or f"https://{host}"
+        self.headers = {
+            'X-RapidAPI-Key': api_key,
+            'X-RapidAPI-Host': host
+        }
+
+        rps = requests_per_second or float(os.getenv("IRCTC_REQUESTS_PER_SECOND", "5"))
+        self.bucket = TokenBucket(
+            rate=rps,
+            capacity=max(1.0, rps),
+            monthly_quota=monthly_quota or int(os.getenv("IRCTC_MONTHLY_QUOTA", "1000")),
+            state_path=state_path or os.getenv("IRCTC_QUOTA_STATE_PATH", DEFAULT_QUOTA_STATE_PATH)
+        )
+        self.max_queue_wait = max_queue_wait if max_queue_wait is not None else float(os.getenv("IRCTC_MAX_QUEUE_WAIT", "2"))
+        self._queue_slots = threading.BoundedSemaphore(max_queued or int(os.getenv("IRCTC_MAX_QUEUED", "32")))
+
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "shedQueueFull": 0,
+            "shedQuotaExhausted": 0,
+            "shedTimeout": 0,
+            "rateLimited": 0,
+            "queuedSeconds": 0.0
+        }
+
+    @property
+    def session(self) -> requests.Session:
+        """One pooled session per process (sessions must not cross a fork)"""
+        if self._session is None or self._session_pid != os.getpid():
+            with self._session_lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def _count(self, key: str, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _acquire(self):
+        """Wait for a token (bounded queue and wait), or shed the call"""
+        if not self._queue_slots.acquire(blocking=False):
+            self._count("shedQueueFull")
+            raise QuotaExceeded("IRCTC request queue is full")
+
+        started = time.monotonic()
+        deadline = started + self.max_queue_wait
+        try:
+            while True:
+                wait = self.bucket.try_acquire()
+                if wait is None:
+                    self._count("shedQuotaExhausted")
+                    raise QuotaExceeded("IRCTC monthly quota exhausted")
+                if wait == 0:
+                    return
+                if time.monotonic() + wait > deadline:
+                    self._count("shedTimeout")
+                    raise QuotaExceeded("IRCTC rate limit budget exhausted")
+                time.sleep(wait)
+        finally:
+            self._count("queuedSeconds", time.monotonic() - started)
+            self._queue_slots.release()
+
+    def get(self, path: str, params: Dict = None, timeout: float = 10) -> requests.Response:
+        """GET a RapidAPI IRCTC endpoint; raises QuotaExceeded when the call is shed"""
+        self._acquire()
+        self._count("requests")
+
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        with upstream_call("irctc") as call:
+            response = self.session.get(url, params=params, timeout=timeout)
+            call.status = response.status_code
+
+        if response.status_code == 429:
+            self._count("rateLimited")
+            retry_after = response.headers.get("Retry-After")
+            try:
+                cooldown = float(retry_after) if retry_after else 60.0
+            except ValueError:
+                cooldown = 60.0
+            logger.warning(f"⚠️ IRCTC API rate limited, pausing calls for {cooldown:.0f}s")
+            self.bucket.block_for(cooldown)
+
+        remaining = response.headers.get("X-RateLimit-Requests-Remaining")
+        if remaining is not None and remaining.isdigit():
+            self.bucket.sync_remaining(int(remaining))
+
+        return response
+
+    def stats(self) -> Dict:
+        """Quota consumption and shedding counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(self.bucket.usage())
+        return stats
@@ -0,0 +1,67 @@
+import base64
+import re
+import zlib
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+_DAY = re.compile(r"^\s*\**\s*Day\s+(\d+)\s*[:\-–]\s*(.*?)\**\s*$", re.IGNORECASE)
+_SECTION = re.compile(r"^\s*[-*•]*\s*\**\s*(Morning|Afternoon|Evening|Meals|Accommodation)\s*\**\s*:\s*\**\s*(.*)$",
+                      re.IGNORECASE)
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def parse_itinerary(text: str) -> List[Dict]:
+    """
+    Day-by-day form of the Gemini itinerary format
+    ("Day N: title" followed by Morning/Afternoon/Evening/Meals/Accommodation lines)
+    """
+    days = []
+    current = None
+    section = None
+    for line in text.splitlines():
+        day_match = _DAY.match(line)
+        if day_match:
+            current = {"day": int(day_match.group(1)), "title": day_match.group(2).strip()}
+            days.append(current)
+            section = None
+            continue
+        if current is None:
+            continue
+        section_match = _SECTION.match(line)
+        if section_match:
+            section = section_match.group(1).lower()
+            current[section] = section_match.group(2).strip()
+        elif section and line.strip():
+            # Continuation of the previous section
+            current[section] = f"{current[section]} {line.strip()}".strip()
+    return days
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(value[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Opaque keyset cursor: the (created_at, id) of the last item on a page"""
+    raw = f"{created_at.isoformat()}|{item_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor(); raises ValueError for anything else"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        created_at, item_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
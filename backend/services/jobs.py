@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from .logging_setup import request_id_var
+from .metrics import registry
+from .responses import dumps
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH") or os.path.join(BASE_DIR, "jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Retry n waits JOB_RETRY_BACKOFF * 2**(n-1) seconds
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "2"))
+# A running job whose worker died is handed out again once its lease runs out
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+# Finished jobs are kept this long for polling clients
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "86400"))
+
+FINISHED = ("succeeded", "failed")
+
+JOBS = registry.counter("jobs_total", "Background jobs finished, by kind and outcome", ("kind", "outcome"))
+JOB_SECONDS = registry.histogram(
+    "job_duration_seconds", "Background job run time per attempt", ("kind",),
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+JOB_QUEUE_DEPTH = registry.gauge("job_queue_depth", "Jobs waiting to run (all workers on the host)")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. invalid input)"""
+
+
+class JobStore:
+    """
+    Durable job queue in a SQLite file, shared by every worker process on the host.
+    Claims use BEGIN IMMEDIATE so each job is handed to exactly one worker at a time.
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        # The queue file is opened on first use so importing the app writes nothing
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS jobs ("
+                        " id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL,"
+                        " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                        " max_attempts INTEGER NOT NULL, result TEXT, error TEXT,"
+                        " created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+                        " run_after REAL NOT NULL, locked_until REAL)"
+                    )
+                    conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after)")
+                    self._initialized = True
+        return conn
+
+    def add(self, kind: str, payload: Dict, max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, kind, payload, status, max_attempts, created_at, updated_at, run_after)"
+            " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), max_attempts, now, now, now)
+        )
+        return job_id
+
+    def claim(self, lease: float = JOB_LEASE_SECONDS) -> Optional[sqlite3.Row]:
+        """
+        Take the oldest runnable job (or one whose worker lease ran out). A job whose
+        lease ran out on its last attempt is failed instead of being run again.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            exhausted = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, locked_until = NULL, updated_at = ?"
+                " WHERE status = 'running' AND locked_until < ? AND attempts >= max_attempts",
+                ("Worker stopped during the last attempt", now, now)
+            ).rowcount
+            if exhausted:
+                logger.warning(f"⚠️ Failed {exhausted} job(s) whose worker stopped during the last attempt")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND run_after <= ?)"
+                " OR (status = 'running' AND locked_until < ?) ORDER BY run_after LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_until = ?, updated_at = ?"
+                " WHERE id = ?",
+                (now + lease, now, row["id"])
+            )
+            return conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        finally:
+            conn.execute("COMMIT")
+
+    def succeed(self, job_id: str, result_json: str):
+        self._connect().execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, locked_until = NULL, updated_at = ?"
+            " WHERE id = ?",
+            (result_json, time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str, retry_in: Optional[float]):
+        """Requeue after retry_in seconds, or mark the job failed for good when None"""
+        now = time.time()
+        if retry_in is None:
+            self._connect().execute(
+                "UPDATE jobs SET status = 'failed', error = ?, locked_until = NULL, updated_at = ? WHERE id = ?",
+                (error, now, job_id)
+            )
+        else:
+            self._connect().execute(
+                "UPDATE jobs SET status = 'queued', error = ?, locked_until = NULL, updated_at = ?, run_after = ?"
+                " WHERE id = ?",
+                (error, now, now + retry_in, job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "maxAttempts": row["max_attempts"],
+            "createdAt": row["created_at"],
+            "updatedAt": row["updated_at"],
+        }
+        if row["error"]:
+            job["error"] = row["error"]
+        if row["status"] == "succeeded":
+            job["result"] = json.loads(row["result"])
+        return job
+
+    def depth(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def purge(self, older_than: float = JOB_RESULT_TTL) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+            (time.time() - older_than,)
+        )
+        return cursor.rowcount
+
+
+class JobQueue:
+    """
+    Background generation: handlers run on a small thread pool in each worker process,
+    pulling from the shared JobStore, with exponential-backoff retries.
+    """
+
+    def __init__(self, store: JobStore = None, workers: int = JOB_WORKERS):
+        self.store = store or JobStore()
+        self.workers = workers
+        self._handlers = {}
+        self._threads = []
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._claims = 0
+
+    def register(self, kind: str, handler: Callable[[Dict], Any]):
+        self._handlers[kind] = handler
+
+    def start(self):
+        """Start this process's worker threads (idempotent, restarted after a fork)"""
+        if self._pid == os.getpid() or self.workers <= 0:
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+            logger.info(f"🧵 Started {self.workers} background job worker(s)")
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._pid = None
+
+    def submit(self, kind: str, payload: Dict) -> str:
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind '{kind}'")
+        job_id = self.store.add(kind, payload)
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim()
+            except sqlite3.Error as e:
+                logger.error(f"❌ Job queue unavailable: {e}")
+                job = None
+            if job is None:
+                self._wake.wait(JOB_POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            self._execute(job)
+            self._claims += 1
+            if self._claims % 1000 == 0:
+                self.store.purge()
+
+    def _execute(self, job: sqlite3.Row):
+        kind = job["kind"]
+        handler = self._handlers.get(kind)
+        token = request_id_var.set(f"job-{job['id'][:12]}")
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job kind '{kind}'")
+            with span(f"job.{kind}", root=True, job_id=job["id"], attempt=job["attempts"]):
+                result = handler(json.loads(job["payload"]))
+            self.store.succeed(job["id"], dumps(result).decode("utf-8"))
+            JOBS.inc(kind, "succeeded")
+            logger.info(f"✅ Job {kind} {job['id']} finished (attempt {job['attempts']})")
+        except Exception as e:
+            permanent = isinstance(e, PermanentJobError) or job["attempts"] >= job["max_attempts"]
+            retry_in = None if permanent else JOB_RETRY_BACKOFF * 2 ** (job["attempts"] - 1)
+            self.store.fail(job["id"], str(e) or type(e).__name__, retry_in)
+            JOBS.inc(kind, "failed" if permanent else "retried")
+            logger.warning(
+                f"⚠️ Job {kind} {job['id']} attempt {job['attempts']} failed: {e}"
+                + ("" if permanent else f"; retrying in {retry_in:.0f}s")
+            )
+        finally:
+            JOB_SECONDS.observe(time.perf_counter() - started, kind)
+            request_id_var.reset(token)
+
+
+job_queue = JobQueue()
+JOB_QUEUE_DEPTH.set_function(lambda: float(job_queue.store.depth()) if job_queue.store._initialized else None)
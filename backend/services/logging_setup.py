@@ -0,0 +1,208 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Correlation fields carried through the request (and into worker threads via run_blocking)
+request_id_var = ContextVar("request_id", default=None)  # type: ContextVar[Optional[str]]
+endpoint_var = ContextVar("endpoint", default=None)  # type: ContextVar[Optional[str]]
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Share of requests whose DEBUG lines are kept, optionally per endpoint:
+# LOG_DEBUG_SAMPLE_RATES="/api/generate-itinerary-with-amadeus=0.1,/places/autocomplete=0"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.05"))
+
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "request_id", "endpoint", "color_message"
+}
+
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        path, _, rate = item.partition("=")
+        try:
+            rates[path.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+LOG_DEBUG_SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_DEBUG_SAMPLE_RATES", ""))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "endpoint", None):
+            entry["endpoint"] = record.endpoint
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Attach request id / endpoint and sample DEBUG lines per endpoint"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        endpoint = endpoint_var.get()
+        record.request_id = request_id
+        record.endpoint = endpoint
+
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = LOG_DEBUG_SAMPLE_RATES.get(endpoint, LOG_DEBUG_SAMPLE_RATE) if endpoint else LOG_DEBUG_SAMPLE_RATE
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        # Decide per request so a sampled request keeps all of its debug lines
+        key = request_id or f"{record.name}:{record.lineno}"
+        return (zlib.crc32(key.encode()) % 10000) < rate * 10000
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Never blocks the caller: records are dropped (and counted) when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve the message here; JSON formatting happens on the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# uvicorn installs its own synchronous stdout handlers; route them through the queue too
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "gunicorn.error", "gunicorn.access")
+
+_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_level: str = LOG_LEVEL
+
+
+def _install():
+    """Create the queue, handler and writer thread and attach them to the root logger"""
+    global _handler, _listener
+    handler = BoundedQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(_level)
+
+    for name in SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        for existing in list(server_logger.handlers):
+            server_logger.removeHandler(existing)
+        server_logger.propagate = True
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter())
+    listener = QueueListener(handler.queue, writer, respect_handler_level=False)
+    listener.start()
+    _handler, _listener = handler, listener
+
+
+def _reinstall_after_fork():
+    # The inherited queue may hold locks or records owned by the parent's threads;
+    # give the child its own queue, handler and writer thread
+    global _listener
+    _listener = None
+    if _handler is not None:
+        _install()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_logging(level: str = LOG_LEVEL) -> BoundedQueueHandler:
+    """Route all logging through a bounded queue drained by a background JSON writer"""
+    global _level
+    if _handler is not None:
+        return _handler
+
+    _level = level
+    _install()
+    atexit.register(_stop_listener)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_reinstall_after_fork)
+    return _handler
+
+
+def dropped_log_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+class RequestContextMiddleware:
+    """ASGI middleware assigning a request id (X-Request-ID) and endpoint to the log context"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        request_token = request_id_var.set(request_id)
+        endpoint_token = endpoint_var.set(scope["path"])
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(request_token)
+            endpoint_var.reset(endpoint_token)
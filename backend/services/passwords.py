@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+from .metrics import registry
+
+# bcrypt cost factor for new hashes; stored hashes with another cost are replaced on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Processes dedicated to hashing (0 hashes in the calling thread)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Hash/verify calls allowed to wait for a process before new ones are refused
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+PASSWORD_HASH_PENDING = registry.gauge(
+    "password_hash_pending", "Password hash/verify calls queued or running in the hashing pool")
+PASSWORD_HASH_SECONDS = registry.histogram(
+    "password_hash_seconds", "Password hash/verify latency including queueing", ("operation",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PASSWORD_HASH_REJECTED = registry.counter(
+    "password_hash_rejected_total", "Password hash/verify calls refused because the pool was saturated")
+
+_BCRYPT_HASH = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class HasherBusy(Exception):
+    """Raised when too many hash/verify calls are already waiting"""
+
+
+def _secret(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes (passlib truncated silently; bcrypt>=5 raises)
+    return password.encode("utf-8")[:72]
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def check_password(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(_secret(password), hashed.encode("ascii"))
+    except ValueError:
+        return False
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    match = _BCRYPT_HASH.match(hashed or "")
+    return int(match.group(1)) if match else None
+
+
+def needs_rehash(hashed: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    return hash_rounds(hashed) != rounds
+
+
+def _verify_and_rehash(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    # Runs in the pool: verify, and hash again with the current cost in the same round trip
+    if not check_password(password, hashed):
+        return False, None
+    return True, hash_password(password, rounds) if needs_rehash(hashed, rounds) else None
+
+
+class PasswordHasher:
+    """
+    bcrypt on a small dedicated process pool, so a burst of signups/logins uses at most
+    `workers` cores and never holds the request threadpool's CPU.
+    Calls beyond `max_pending` are refused (HasherBusy) instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 rounds: int = BCRYPT_ROUNDS):
+        self.workers = workers
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Created on first use and again after a fork (pools do not survive one)
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    methods = multiprocessing.get_all_start_methods()
+                    # forkserver/spawn: never fork the threaded server process itself
+                    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _run(self, operation: str, func, *args):
+        if not self._slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTED.inc()
+            raise HasherBusy("Too many password operations in progress")
+        started = time.perf_counter()
+        with self._pending_lock:
+            self._pending += 1
+            PASSWORD_HASH_PENDING.set(self._pending)
+        try:
+            if self.workers <= 0:
+                return func(*args)
+            return self._executor().submit(func, *args).result()
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+                PASSWORD_HASH_PENDING.set(self._pending)
+            self._slots.release()
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, operation)
+
+    def hash(self, password: str) -> str:
+        return self._run("hash", hash_password, password, self.rounds)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run("verify", check_password, password, hashed)
+
+    def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new hash when the stored one uses another cost factor)"""
+        return self._run("verify", _verify_and_rehash, password, hashed, self.rounds)
+
+    def shutdown(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Callable, Dict
+
+from .runtime import run_blocking
+
+# Seconds a provider may take before the plan is returned without its section
+DEFAULT_PROVIDER_DEADLINE = 5.0
+
+
+class Provider:
+    """
+    Async source for one section of a trip plan ("flights", "hotels", ...).
+    Subclasses implement fetch(); the recommender runs all providers concurrently and
+    drops a section whose provider misses its deadline.
+    """
+
+    name = "provider"
+    section = "data"
+    deadline = DEFAULT_PROVIDER_DEADLINE
+
+    async def fetch(self, preferences: Dict) -> Any:
+        raise NotImplementedError
+
+
+class BlockingProvider(Provider):
+    """Adapter for synchronous provider code (runs on the provider thread pool)"""
+
+    def __init__(self, name: str, section: str, func: Callable[[Dict], Any], deadline: float = DEFAULT_PROVIDER_DEADLINE):
+        self.name = name
+        self.section = section
+        self.deadline = deadline
+        self._func = func
+
+    async def fetch(self, preferences: Dict) -> Any:
+        return await run_blocking(self._func, preferences)
+
+
+async def fetch_with_deadline(provider: Provider, preferences: Dict) -> Any:
+    return await asyncio.wait_for(provider.fetch(preferences), provider.deadline)
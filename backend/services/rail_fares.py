@@ -0,0 +1,199 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Class codes in table order
+CLASS_CODES = ("SL", "3A", "2A", "1A", "CC", "EC", "2S", "3E")
+
+# Base fare per km for the first distance band (INR, before charges)
+CLASS_RATE_PER_KM = np.array([0.45, 1.16, 1.68, 2.85, 1.00, 2.05, 0.24, 1.08])
+
+# Minimum chargeable distance per class (km)
+CLASS_MIN_DISTANCE = np.array([200, 300, 300, 300, 50, 50, 15, 300])
+
+# Reservation charge per class (INR)
+CLASS_RESERVATION_CHARGE = np.array([20, 40, 50, 60, 40, 60, 15, 40])
+
+# Superfast surcharge per class (INR)
+CLASS_SUPERFAST_CHARGE = np.array([30, 45, 45, 75, 45, 75, 15, 45])
+
+# GST applies to AC classes only
+CLASS_GST_RATE = np.array([0.0, 0.05, 0.05, 0.05, 0.05, 0.05, 0.0, 0.05])
+
+# Train types: (multiplier on base fare, superfast surcharge applies)
+TRAIN_TYPES = ("MAIL EXPRESS", "SUPERFAST", "RAJDHANI", "SHATABDI", "DURONTO", "VANDE BHARAT", "PASSENGER")
+TRAIN_TYPE_MULTIPLIER = np.array([1.0, 1.0, 1.3, 1.25, 1.25, 1.4, 0.55])
+TRAIN_TYPE_SUPERFAST = np.array([0.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.0])
+
+# Aliases used by upstream APIs for train types
+TRAIN_TYPE_ALIASES = {
+    "MEX": "MAIL EXPRESS",
+    "EXP": "MAIL EXPRESS",
+    "MAIL": "MAIL EXPRESS",
+    "EXPRESS": "MAIL EXPRESS",
+    "SF": "SUPERFAST",
+    "SUF": "SUPERFAST",
+    "SUPERFAST EXPRESS": "SUPERFAST",
+    "GR": "SUPERFAST",
+    "JSHT": "SHATABDI",
+    "SHT": "SHATABDI",
+    "RAJ": "RAJDHANI",
+    "DRNT": "DURONTO",
+    "VB": "VANDE BHARAT",
+    "PAS": "PASSENGER",
+    "PASS": "PASSENGER",
+}
+
+# Telescopic tapering: rate factor applied within each distance band (km)
+TAPER_BANDS = np.array([0, 500, 1000, 2500])
+TAPER_FACTORS = np.array([1.0, 0.85, 0.7, 0.6])
+
+# Distance slabs (upper edges, km): 5 km steps up to 1000 km, 25 km steps up to 5000 km
+SLAB_EDGES = np.concatenate([np.arange(5, 1000, 5), np.arange(1000, 5001, 25)]).astype(np.float64)
+
+# How strongly a single upstream observation moves the calibration
+REFRESH_WEIGHT = 0.3
+SCALE_BOUNDS = (0.5, 2.0)
+
+
+def _cumulative_distance_cost(distances: np.ndarray) -> np.ndarray:
+    """Tapered chargeable km for each distance (telescopic fare structure)"""
+    band_starts = TAPER_BANDS.astype(np.float64)
+    band_ends = np.append(band_starts[1:], np.inf)
+    in_band = np.clip(distances[:, None] - band_starts[None, :], 0, band_ends - band_starts)
+    return in_band @ TAPER_FACTORS
+
+
+def _round_up_to_five(values: np.ndarray) -> np.ndarray:
+    """Indian Railways rounds fares up to the next multiple of 5"""
+    return np.ceil(values / 5.0) * 5.0
+
+
+class RailFareEngine:
+    """Distance-slab fare tables per train type and class, evaluated in bulk with NumPy"""
+
+    def __init__(self):
+        self.class_index = {code: i for i, code in enumerate(CLASS_CODES)}
+        self.type_index = {name: i for i, name in enumerate(TRAIN_TYPES)}
+        self.slab_edges = SLAB_EDGES
+        self.fare_table = self._build_fare_table()
+        # Calibration factors learnt from upstream fare lookups
+        self.scale = np.ones((len(TRAIN_TYPES), len(CLASS_CODES)))
+        self._scale_lock = threading.Lock()
+
+    def _build_fare_table(self) -> np.ndarray:
+        """Precompute the per-passenger fare for every (train type, class, slab)"""
+        chargeable_km = _cumulative_distance_cost(self.slab_edges)                    # (slabs,)
+        base = CLASS_RATE_PER_KM[:, None] * chargeable_km[None, :]                    # (classes, slabs)
+        base = TRAIN_TYPE_MULTIPLIER[:, None, None] * base[None, :, :]                # (types, classes, slabs)
+        charges = (CLASS_RESERVATION_CHARGE[None, :]
+                   + TRAIN_TYPE_SUPERFAST[:, None] * CLASS_SUPERFAST_CHARGE[None, :])  # (types, classes)
+        fares = (base + charges[:, :, None]) * (1.0 + CLASS_GST_RATE[None, :, None])
+        return _round_up_to_five(fares)
+
+    def normalize_train_type(self, train_type: Optional[str]) -> str:
+        """Map upstream train type labels onto the fare table rows"""
+        key = (train_type or "").upper().strip()
+        if key in self.type_index:
+            return key
+        if key in TRAIN_TYPE_ALIASES:
+            return TRAIN_TYPE_ALIASES[key]
+        for name in TRAIN_TYPES:
+            if name in key:
+                return name
+        return "MAIL EXPRESS"
+
+    def _type_indices(self, train_types: Sequence[Optional[str]]) -> np.ndarray:
+        return np.fromiter(
+            (self.type_index[self.normalize_train_type(t)] for t in train_types),
+            dtype=np.intp, count=len(train_types)
+        )
+
+    def fare_matrix(self, distances: Sequence[float], train_types: Sequence[Optional[str]],
+                    passengers: Iterable[int] = (1,)) -> np.ndarray:
+        """
+        Fares for every train x class x passenger count in one vectorized pass.
+        Returns an int array of shape (trains, len(CLASS_CODES), passenger counts).
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        passengers = np.asarray(list(passengers), dtype=np.int64)
+        if distances.size == 0:
+            return np.zeros((0, len(CLASS_CODES), passengers.size), dtype=np.int64)
+
+        type_idx = self._type_indices(train_types)                                    # (trains,)
+        chargeable = np.maximum(distances[:, None], CLASS_MIN_DISTANCE[None, :])      # (trains, classes)
+        slab_idx = np.minimum(np.searchsorted(self.slab_edges, chargeable, side="left"),
+                              self.slab_edges.size - 1)
+        class_idx = np.arange(len(CLASS_CODES))[None, :]
+
+        per_person = self.fare_table[type_idx[:, None], class_idx, slab_idx]
+        per_person = _round_up_to_five(per_person * self.scale[type_idx[:, None], class_idx])
+        return (per_person[:, :, None] * passengers[None, None, :]).astype(np.int64)
+
+    def fare(self, distance: float, class_type: str = "SL", train_type: Optional[str] = None,
+             passengers: int = 1) -> Optional[int]:
+        """Single fare lookup (thin wrapper over fare_matrix)"""
+        if class_type not in self.class_index:
+            return None
+        matrix = self.fare_matrix([distance], [train_type], (passengers,))
+        return int(matrix[0, self.class_index[class_type], 0])
+
+    def refresh(self, observations: Iterable[Tuple[Optional[str], str, float, float]]) -> int:
+        """
+        Recalibrate the tables from upstream fares.
+        Each observation is (train_type, class_code, distance_km, observed_fare_per_person).
+        """
+        applied = 0
+        for train_type, class_code, distance, observed in observations:
+            if class_code not in self.class_index or not distance or not observed:
+                continue
+            t = self.type_index[self.normalize_train_type(train_type)]
+            c = self.class_index[class_code]
+            chargeable = max(float(distance), float(CLASS_MIN_DISTANCE[c]))
+            s = min(int(np.searchsorted(self.slab_edges, chargeable, side="left")), self.slab_edges.size - 1)
+            modelled = self.fare_table[t, c, s]
+            if modelled <= 0:
+                continue
+            ratio = float(observed) / float(modelled)
+            # Refreshes arrive from pool threads; keep the read-modify-write atomic
+            with self._scale_lock:
+                updated = (1 - REFRESH_WEIGHT) * self.scale[t, c] + REFRESH_WEIGHT * ratio
+                self.scale[t, c] = min(max(updated, SCALE_BOUNDS[0]), SCALE_BOUNDS[1])
+            applied += 1
+
+        if applied:
+            logger.info(f"💱 Refreshed fare tables from {applied} upstream fare(s)")
+        return applied
+
+
+def parse_upstream_fares(data: Dict) -> List[Tuple[str, float]]:
+    """Extract (class_code, fare) pairs from an IRCTC fare API response"""
+    pairs = []
+    if not isinstance(data, dict):
+        return pairs
+
+    payload = data.get("data", data)
+    if isinstance(payload, dict):
+        rows = payload.get("general") or payload.get("fares") or []
+        if not rows and "fare" in payload:
+            rows = [payload]
+    elif isinstance(payload, list):
+        rows = payload
+    else:
+        rows = []
+
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        class_code = row.get("classType") or row.get("class_type") or row.get("class")
+        fare = row.get("fare") or row.get("totalFare") or row.get("total_fare")
+        try:
+            if class_code and fare:
+                pairs.append((str(class_code), float(fare)))
+        except (TypeError, ValueError):
+            continue
+    return pairs
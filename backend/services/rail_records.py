@@ -0,0 +1,232 @@
+import json
+import re
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+ALL_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# Top-level keys that hold the train list in known IRCTC response shapes
+TRAIN_LIST_KEYS = frozenset(("data", "trains", "result", "trainBtwnStnsList"))
+
+# Keys that identify a train entry when the list sits under an unknown key
+TRAIN_FIELD_KEYS = frozenset(("train_number", "trainNumber", "train_name", "trainName", "trainNo"))
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_intern = sys.intern
+
+
+def parse_distance(value: Any, default: float = 0.0) -> float:
+    """Parse distances such as 485, "485" or "485 km" into km"""
+    try:
+        return float(str(value).lower().replace("km", "").strip())
+    except (TypeError, ValueError):
+        return default
+
+
+class Train:
+    """Compact train record; dicts are only built at the API boundary via to_dict()"""
+
+    __slots__ = (
+        "number", "name", "from_code", "to_code", "from_name", "to_name", "departure", "arrival",
+        "duration", "distance_km", "train_type", "class_codes", "run_days", "fares"
+    )
+
+    def __init__(self, number: str, name: str, from_code: str, to_code: str, from_name: str, to_name: str,
+                 departure: str, arrival: str, duration: str, distance_km: float, train_type: str,
+                 class_codes: Tuple[str, ...], run_days: Tuple[str, ...], fares: Tuple[int, ...] = ()):
+        self.number = number
+        self.name = name
+        self.from_code = from_code
+        self.to_code = to_code
+        self.from_name = from_name
+        self.to_name = to_name
+        self.departure = departure
+        self.arrival = arrival
+        self.duration = duration
+        self.distance_km = distance_km
+        self.train_type = train_type
+        self.class_codes = class_codes
+        self.run_days = run_days
+        self.fares = fares
+
+    def __repr__(self):
+        return f"Train({self.number!r}, {self.name!r}, {self.from_code}->{self.to_code})"
+
+    @classmethod
+    def from_api(cls, entry: Dict, source_code: str, dest_code: str) -> Optional["Train"]:
+        """Build a record from one IRCTC API train entry (None if it is not a train)"""
+        number = entry.get("train_number")
+        name = entry.get("train_name")
+        if not number or not name:
+            return None
+
+        return cls(
+            number=str(number),
+            name=str(name),
+            from_code=_intern(source_code),
+            to_code=_intern(dest_code),
+            from_name=_intern(str(entry.get("from_station_name", source_code))),
+            to_name=_intern(str(entry.get("to_station_name", dest_code))),
+            departure=str(entry.get("from_std", "")),
+            arrival=str(entry.get("to_std", "")),
+            duration=str(entry.get("duration", "")),
+            distance_km=parse_distance(entry.get("distance", 0)),
+            train_type=_intern(str(entry.get("train_type", "MAIL EXPRESS"))),
+            class_codes=tuple(_intern(str(c)) for c in (entry.get("class_type") or ("SL",))),
+            run_days=tuple(_intern(str(d)) for d in (entry.get("run_days") or ALL_DAYS)),
+        )
+
+    def to_dict(self) -> Dict:
+        """Standard train dict used by the rest of the API"""
+        distance = int(self.distance_km) if self.distance_km.is_integer() else self.distance_km
+        return {
+            "trainNumber": self.number,
+            "trainName": self.name,
+            "departure": {
+                "station": self.from_name,
+                "stationCode": self.from_code,
+                "time": self.departure,
+                "platform": "1"
+            },
+            "arrival": {
+                "station": self.to_name,
+                "stationCode": self.to_code,
+                "time": self.arrival,
+                "platform": "1"
+            },
+            "duration": self.duration,
+            "distance": f"{distance} km",
+            "classes": {
+                code: {"fare": fare, "available": "Available"}
+                for code, fare in zip(self.class_codes, self.fares)
+            },
+            "runsOn": list(self.run_days),
+            "route": [self.from_code, self.to_code],
+            "trainType": self.train_type
+        }
+
+
+class _Scanner:
+    """Walks a JSON document, decoding one value at a time"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def skip(self) -> str:
+        self.pos = _WHITESPACE.match(self.text, self.pos).end()
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def expect(self, char: str):
+        if self.skip() != char:
+            raise ValueError(f"Expected '{char}' at position {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.skip()
+        obj, self.pos = self.decoder.raw_decode(self.text, self.pos)
+        return obj
+
+    def array_items(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.skip() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.skip()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed array at position {self.pos}")
+
+
+def _looks_like_train(entry: Any) -> bool:
+    return isinstance(entry, dict) and not TRAIN_FIELD_KEYS.isdisjoint(entry)
+
+
+class TrainPayload:
+    """
+    Incremental view over an IRCTC train search response.
+    The train list is located once per payload and its entries are decoded one at a
+    time; any "errors" value is collected into .errors while iterating.
+    """
+
+    def __init__(self, payload: Union[str, bytes, Dict, List]):
+        if isinstance(payload, (bytes, bytearray)):
+            payload = payload.decode("utf-8")
+        self.payload = payload
+        self.errors = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        if isinstance(self.payload, str):
+            return self._iter_text(self.payload)
+        return self._iter_decoded(self.payload)
+
+    def _iter_decoded(self, data: Union[Dict, List]) -> Iterator[Dict]:
+        if isinstance(data, list):
+            yield from data
+            return
+        if not isinstance(data, dict):
+            return
+        self.errors = data.get("errors")
+        for key, value in data.items():
+            if isinstance(value, list) and (key in TRAIN_LIST_KEYS or (value and _looks_like_train(value[0]))):
+                yield from value
+                return
+
+    def _iter_text(self, text: str) -> Iterator[Dict]:
+        scanner = _Scanner(text)
+        first = scanner.skip()
+        if first == "[":
+            yield from scanner.array_items()
+            return
+        if first != "{":
+            return
+
+        scanner.pos += 1
+        found = False
+        if scanner.skip() == "}":
+            return
+        while True:
+            key = scanner.value()
+            scanner.expect(":")
+
+            if key == "errors":
+                self.errors = scanner.value()
+            elif not found and scanner.skip() == "[":
+                items = scanner.array_items()
+                head = next(items, None)
+                if head is not None and (key in TRAIN_LIST_KEYS or _looks_like_train(head)):
+                    found = True
+                    yield head
+                    yield from items
+                else:
+                    for _ in items:
+                        pass
+            else:
+                scanner.value()
+
+            char = scanner.skip()
+            scanner.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed object at position {scanner.pos}")
+
+
+def parse_trains(payload: Union[str, bytes, Dict, List], source_code: str,
+                 dest_code: str) -> Tuple[List[Train], Optional[Any]]:
+    """Parse a train search response into Train records; returns (trains, errors)"""
+    source_code = _intern(source_code)
+    dest_code = _intern(dest_code)
+    view = TrainPayload(payload)
+    trains = []
+    for entry in view:
+        if isinstance(entry, dict):
+            train = Train.from_api(entry, source_code, dest_code)
+            if train is not None:
+                trains.append(train)
+    return trains, view.errors
@@ -1,17 +1,65 @@
-from backend.services.scraper import scrape_hotels, scrape_restaurants
-from backend.services.travel_api import get_flights
+import asyncio
+import logging
+import time
+from typing import Dict, List, Sequence
 
-def generate_trip_plan(preferences: dict):
+from .metrics import registry
+from .providers import Provider, fetch_with_deadline
+from .scraper import HotelProvider, RestaurantProvider
+from .tracing import span
+from .travel_api import FlightProvider
+
+logger = logging.getLogger(__name__)
+
+PLAN_PROVIDER_CALLS = registry.counter(
+    "plan_provider_calls_total", "Trip-plan provider calls by provider and outcome", ("provider", "outcome"))
+PLAN_PROVIDER_SECONDS = registry.histogram(
+    "plan_provider_seconds", "Trip-plan provider latency", ("provider",))
+
+# Providers queried for every plan; each one adds a section, not latency
+PROVIDERS = [FlightProvider(), HotelProvider(), RestaurantProvider()]
+
+
+async def _run_provider(provider: Provider, preferences: Dict) -> Dict:
+    started = time.perf_counter()
+    outcome = {"status": "ok"}
+    with span(f"provider.{provider.name}") as provider_span:
+        try:
+            outcome["data"] = await fetch_with_deadline(provider, preferences)
+        except asyncio.TimeoutError:
+            outcome["status"] = "timeout"
+            logger.warning(f"⏱️ Provider {provider.name} missed its {provider.deadline:.1f}s deadline")
+        except Exception as e:
+            outcome["status"] = "error"
+            outcome["error"] = str(e)
+            logger.warning(f"⚠️ Provider {provider.name} failed: {e}")
+        if provider_span is not None:
+            provider_span.set_attribute("outcome", outcome["status"])
+    elapsed = time.perf_counter() - started
+    outcome["ms"] = round(elapsed * 1000, 1)
+    PLAN_PROVIDER_CALLS.inc(provider.name, outcome["status"])
+    PLAN_PROVIDER_SECONDS.observe(elapsed, provider.name)
+    return outcome
+
+
+async def generate_trip_plan_async(preferences: dict, providers: Sequence[Provider] = None) -> Dict:
+    """
+    Query every provider concurrently, each under its own deadline. Sections whose
+    provider timed out or failed come back empty and the plan is marked partial.
+    """
+    providers = list(PROVIDERS if providers is None else providers)
     origin = preferences.get("origin", "Delhi")
     destination = preferences.get("destination", "Goa")
-    date = preferences.get("travel_date", "2025-08-20")
-    flights = get_flights(origin, destination, date)
-    hotels = scrape_hotels(destination, date, preferences.get("return_date"))
-    restaurants = scrape_restaurants(destination, preferences.get("food_pref") == "veg")
-    itinerary = {
-        "summary": f"{origin} -> {destination} for {preferences.get('days',3)} days",
-        "flights": flights,
-        "hotels": hotels,
-        "restaurants": restaurants
-    }
+    outcomes: List[Dict] = await asyncio.gather(*(_run_provider(p, preferences) for p in providers))
+
+    itinerary = {"summary": f"{origin} -> {destination} for {preferences.get('days',3)} days"}
+    for provider, outcome in zip(providers, outcomes):
+        itinerary[provider.section] = outcome.pop("data", [])
+    itinerary["providers"] = {provider.name: outcome for provider, outcome in zip(providers, outcomes)}
+    itinerary["partial"] = any(outcome["status"] != "ok" for outcome in outcomes)
     return itinerary
+
+
+def generate_trip_plan(preferences: dict):
+    """Synchronous entry point (from threads without a running event loop)"""
+    return asyncio.run(generate_trip_plan_async(preferences))
@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+
+from .compression import compress, negotiate_encoding
+from .logging_setup import endpoint_var
+from .metrics import registry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Fast levels: dynamic responses are compressed on every request
+COMPRESSION_LEVELS = {"br": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")), "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))}
+COMPRESSIBLE_TYPES = (b"application/json", b"text/", b"application/javascript", b"image/svg+xml")
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+SERIALIZE_SECONDS = registry.histogram(
+    "response_serialize_seconds", "Time spent encoding JSON responses", ("endpoint",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+RESPONSE_BYTES = registry.histogram(
+    "response_body_bytes", "Response body size before and after compression", ("encoding",), buckets=SIZE_BUCKETS)
+COMPRESSION_SECONDS = registry.histogram(
+    "response_compress_seconds", "Time spent compressing responses", ("encoding",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "tolist"):  # NumPy scalars and arrays
+        return value.tolist()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson. Return it directly from large endpoints so
+    FastAPI's jsonable_encoder pass is skipped as well.
+    """
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = dumps(content)
+        SERIALIZE_SECONDS.observe(time.perf_counter() - started, endpoint_var.get() or "unknown")
+        return body
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing single-message responses above COMPRESSION_MIN_BYTES
+    with the best encoding the client accepts (brotli, then gzip). Streaming responses
+    and bodies that are already encoded pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            content_type = headers.get("content-type", "").encode("latin-1")
+            if (message.get("more_body") or len(body) < self.minimum_size or "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                await send(start)
+                await send(message)
+                return
+
+            started = time.perf_counter()
+            compressed = compress(body, encoding, COMPRESSION_LEVELS[encoding])
+            COMPRESSION_SECONDS.observe(time.perf_counter() - started, encoding)
+            RESPONSE_BYTES.observe(len(body), "identity")
+            RESPONSE_BYTES.observe(len(compressed), encoding)
+
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            start["headers"] = headers.raw
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
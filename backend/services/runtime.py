@@ -0,0 +1,186 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Dedicated pool for synchronous provider code (Amadeus, IRCTC, Gemini over requests)
+PROVIDER_MAX_WORKERS = int(os.getenv("PROVIDER_MAX_WORKERS", "16"))
+PROVIDER_MAX_PENDING = int(os.getenv("PROVIDER_MAX_PENDING", str(PROVIDER_MAX_WORKERS * 4)))
+
+# Loop stall detection: "off", "debug" (low threshold, asyncio debug) or "production"
+LOOP_MONITOR_MODE = os.getenv("LOOP_MONITOR", "production").lower()
+LOOP_STALL_THRESHOLDS = {"debug": 0.1, "production": 0.5}
+LOOP_STALL_THRESHOLD = float(os.getenv("LOOP_STALL_THRESHOLD", "0") or 0) or LOOP_STALL_THRESHOLDS.get(LOOP_MONITOR_MODE, 0.5)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_pending_slots = weakref.WeakKeyDictionary()
+
+
+def get_provider_executor() -> ThreadPoolExecutor:
+    """Bounded executor for blocking provider calls (recreated after a fork)"""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=PROVIDER_MAX_WORKERS, thread_name_prefix="provider")
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _slots_for(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    slots = _pending_slots.get(loop)
+    if slots is None:
+        slots = _pending_slots[loop] = asyncio.Semaphore(PROVIDER_MAX_PENDING)
+    return slots
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run synchronous provider code off the event loop.
+    Context variables (request id, trace span) are carried into the worker thread, and
+    the number of queued calls is capped so a slow upstream cannot pile up unbounded work.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    async with _slots_for(loop):
+        return await loop.run_in_executor(get_provider_executor(), call)
+
+
+def submit_in_context(executor, func: Callable, *args, **kwargs):
+    """executor.submit() that carries the caller's context variables into the worker"""
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+class LoopStallMonitor:
+    """
+    Detects event-loop stalls.
+    A heartbeat callback runs on the loop; a watchdog thread notices when it stops
+    firing for longer than the threshold and captures the loop thread's stack and the
+    endpoint of the task that is currently running.
+    """
+
+    def __init__(self, mode: str = LOOP_MONITOR_MODE, threshold: float = LOOP_STALL_THRESHOLD):
+        self.mode = mode
+        self.threshold = threshold
+        self.interval = max(0.02, threshold / 4)
+        self.stall_count = 0
+        self.recent_stalls = deque(maxlen=20)
+        self._task_endpoints = weakref.WeakKeyDictionary()
+        self._last_reported = {}
+        self._loop = None
+        self._loop_thread_id = None
+        self._last_beat = time.monotonic()
+        self._stalled = False
+        self._running = False
+        self._watchdog = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in LOOP_STALL_THRESHOLDS
+
+    def start(self):
+        """Start monitoring the running loop (call from a startup hook)"""
+        if not self.enabled or self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if self.mode == "debug":
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold
+
+        self._running = True
+        self._last_beat = time.monotonic()
+        self._loop.call_soon(self._heartbeat)
+        self._watchdog = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"🩺 Event loop stall monitor on ({self.mode}, threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        self._running = False
+
+    def tag_current_task(self, endpoint: str):
+        """Remember which endpoint the current task is serving"""
+        task = asyncio.current_task()
+        if task is not None:
+            self._task_endpoints[task] = endpoint
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        lag = now - self._last_beat - self.interval
+        self._last_beat = now
+        if self._stalled:
+            self._stalled = False
+            logger.warning(f"🐢 Event loop recovered after a {lag * 1000:.0f} ms stall")
+        if self._running:
+            self._loop.call_later(self.interval, self._heartbeat)
+
+    def _current_endpoint(self) -> Optional[str]:
+        # Called from the watchdog thread; current_task(loop) only reads the loop's
+        # current-task slot, which is safe while that loop is stuck in a callback
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        return self._task_endpoints.get(task) if task is not None else None
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.interval)
+            blocked_for = time.monotonic() - self._last_beat - self.interval
+            if blocked_for < self.threshold or self._stalled:
+                continue
+
+            self._stalled = True
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame, limit=None if self.mode == "debug" else 12) if frame else []
+            endpoint = self._current_endpoint() or "unknown"
+            self.stall_count += 1
+            self.recent_stalls.append({
+                "endpoint": endpoint,
+                "blockedMs": round(blocked_for * 1000),
+                "at": time.time(),
+                "stack": stack
+            })
+
+            # In production report each endpoint at most once a minute
+            now = time.monotonic()
+            if self.mode != "debug" and now - self._last_reported.get(endpoint, -60) < 60:
+                continue
+            self._last_reported[endpoint] = now
+            logger.warning(
+                f"🧊 Event loop blocked for {blocked_for * 1000:.0f}+ ms while serving {endpoint}\n"
+                + "".join(stack)
+            )
+
+    def report(self) -> List[Dict]:
+        """Recent stalls (newest last)"""
+        return list(self.recent_stalls)
+
+
+loop_monitor = LoopStallMonitor()
+
+
+class LoopStallMiddleware:
+    """ASGI middleware tagging each request task with its endpoint for stall reports"""
+
+    def __init__(self, app, monitor: LoopStallMonitor = loop_monitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.monitor.enabled:
+            self.monitor.tag_current_task(f"{scope['method']} {scope['path']}")
+        await self.app(scope, receive, send)
@@ -0,0 +1,222 @@
+import functools
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Relative weight of each score component; components without a signal (no budget,
+# no accessibility needs, no POIs...) drop out and the rest are renormalized
+SCORE_WEIGHTS = {"price": 0.35, "rating": 0.25, "accessibility": 0.2, "food": 0.1, "distance": 0.1}
+
+# Shares of the trip budget expected to go to accommodation and to meals out
+HOTEL_BUDGET_SHARE = float(os.getenv("HOTEL_BUDGET_SHARE", "0.4"))
+MEAL_BUDGET_SHARE = float(os.getenv("MEAL_BUDGET_SHARE", "0.25"))
+# Distance at which the proximity score has dropped to 1/e
+DISTANCE_SCALE_KM = float(os.getenv("SCORING_DISTANCE_SCALE_KM", "5"))
+
+# Accessibility features (bit order) and the amenity keywords that provide them
+ACCESSIBILITY_FEATURES = (
+    ("step_free", ("WHEELCHAIR", "ACCESSIBLE", "DISABLED", "HANDICAP", "RAMP")),
+    ("elevator", ("ELEVATOR", "LIFT")),
+    ("visual", ("BRAILLE", "ACCESSIBLE")),
+    ("hearing", ("HEARING", "VISUAL_ALARM", "ACCESSIBLE")),
+    ("assistance", ("ROOM_SERVICE", "24_HOUR", "CONCIERGE", "ASSISTANCE")),
+    ("infant", ("BABY", "CRIB", "COT", "KIDS")),
+)
+_FEATURE_BITS = {name: 1 << bit for bit, (name, _) in enumerate(ACCESSIBILITY_FEATURES)}
+
+# Accessibility needs offered by the frontend -> features that serve them
+NEED_FEATURES = {
+    "wheelchair access": ("step_free", "elevator"),
+    "visual assistance": ("visual",),
+    "hearing assistance": ("hearing",),
+    "mobility support": ("step_free", "elevator"),
+    "differently-abled accommodation": ("step_free", "assistance"),
+    "senior citizens": ("elevator", "assistance"),
+    "children below 3 years": ("infant",),
+}
+
+# Set bits per byte, for the vectorized feature match
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.float64)
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def _number(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or ""))
+    return float(match.group(0).replace(",", "")) if match else math.nan
+
+
+def _features(amenities) -> int:
+    return _feature_mask(tuple(amenities)) if amenities else 0
+
+
+@functools.lru_cache(maxsize=4096)
+def _feature_mask(amenities: tuple) -> int:
+    # Listings share a handful of amenity sets, so the keyword scan runs once per set
+    text = " ".join(str(a).upper().replace(" ", "_") for a in amenities)
+    mask = 0
+    for name, keywords in ACCESSIBILITY_FEATURES:
+        if any(keyword in text for keyword in keywords):
+            mask |= _FEATURE_BITS[name]
+    return mask
+
+
+def _coordinate(item: Dict, *keys: str) -> float:
+    for key in keys:
+        if item.get(key) is not None:
+            return float(item[key])
+    return math.nan
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance; arguments broadcast (e.g. (n, 1) candidates against (m,) POIs)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """(n, 3) points on the unit sphere; a dot product of two of them is the cosine of their great-circle angle"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=1)
+
+
+class Candidates:
+    """Hotels or restaurants as column arrays, built once and scored in a single pass"""
+
+    __slots__ = ("items", "price", "rating", "lat", "lon", "xyz", "features", "veg")
+
+    def __init__(self, items: Sequence[Dict], price_keys: Sequence[str]):
+        self.items = list(items)
+        n = len(self.items)
+        self.price = np.fromiter(
+            (_number(next((item[k] for k in price_keys if item.get(k) is not None), None)) for item in self.items),
+            dtype=np.float64, count=n)
+        self.rating = np.fromiter((_number(item.get("rating")) for item in self.items), dtype=np.float64, count=n)
+        self.lat = np.fromiter((_coordinate(item, "latitude", "lat") for item in self.items), dtype=np.float64, count=n)
+        self.lon = np.fromiter((_coordinate(item, "longitude", "lon", "lng") for item in self.items),
+                               dtype=np.float64, count=n)
+        self.xyz = unit_vectors(self.lat, self.lon)
+        self.features = np.fromiter((_features(item.get("amenities")) for item in self.items), dtype=np.uint8, count=n)
+        self.veg = np.fromiter((bool(item.get("veg_friendly")) for item in self.items), dtype=bool, count=n)
+
+    @classmethod
+    def hotels(cls, items: Sequence[Dict]) -> "Candidates":
+        return cls(items, ("pricePerNight", "price"))
+
+    @classmethod
+    def restaurants(cls, items: Sequence[Dict]) -> "Candidates":
+        return cls(items, ("cost_for_two", "price"))
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Preferences:
+    """What a trip asks of its hotels and restaurants"""
+
+    __slots__ = ("nightly_budget", "meal_budget", "needs", "veg", "poi_lat", "poi_lon", "poi_xyz")
+
+    def __init__(self, nightly_budget: Optional[float] = None, meal_budget: Optional[float] = None,
+                 accessibility_needs: Iterable[str] = (), food_preference: str = "",
+                 pois: Sequence[Dict] = ()):
+        self.nightly_budget = nightly_budget or None
+        self.meal_budget = meal_budget or None
+        self.needs = 0
+        for need in accessibility_needs or ():
+            for feature in NEED_FEATURES.get(need.strip().lower(), ()):
+                self.needs |= _FEATURE_BITS[feature]
+        preference = (food_preference or "").strip().lower()
+        self.veg = preference in ("veg", "vegetarian", "vegan", "pure veg")
+        coordinates = [poi.get("coordinates") or poi for poi in pois or ()]
+        self.poi_lat = np.array([_coordinate(c, "latitude", "lat") for c in coordinates], dtype=np.float64)
+        self.poi_lon = np.array([_coordinate(c, "longitude", "lon", "lng") for c in coordinates], dtype=np.float64)
+        known = ~(np.isnan(self.poi_lat) | np.isnan(self.poi_lon))
+        self.poi_lat, self.poi_lon = self.poi_lat[known], self.poi_lon[known]
+        self.poi_xyz = unit_vectors(self.poi_lat, self.poi_lon).T
+
+    @classmethod
+    def for_trip(cls, budget: float, persons: int, nights: int, food_preference: str = "",
+                 accessibility_needs: Iterable[str] = (), pois: Sequence[Dict] = ()) -> "Preferences":
+        """Split a total trip budget into a nightly hotel budget and a per-meal budget for two"""
+        if not budget:
+            return cls(None, None, accessibility_needs, food_preference, pois)
+        nights = max(int(nights or 1), 1)
+        persons = max(int(persons or 1), 1)
+        # Two meals out a day, priced the way listings are (cost for two)
+        meal_for_group = budget * MEAL_BUDGET_SHARE / (nights * 2)
+        return cls(budget * HOTEL_BUDGET_SHARE / nights, meal_for_group * 2 / persons,
+                   accessibility_needs, food_preference, pois)
+
+
+def _price_score(price: np.ndarray, budget: Optional[float]) -> Optional[np.ndarray]:
+    if not budget:
+        return None
+    ratio = price / budget
+    # Anything within budget is fine; over budget decays quickly; unknown prices are neutral
+    score = np.where(ratio <= 1.0, 1.0, np.exp(-3.0 * (ratio - 1.0)))
+    return np.where(np.isnan(ratio), 0.5, score)
+
+
+def _distance_score(candidates: Candidates, preferences: Preferences) -> Optional[np.ndarray]:
+    if not len(preferences.poi_lat):
+        return None
+    # Great-circle angles for the whole (candidates x POIs) matrix from one matrix product
+    angles = candidates.xyz @ preferences.poi_xyz
+    np.clip(angles, -1.0, 1.0, out=angles)
+    np.arccos(angles, out=angles)
+    score = np.exp(-angles.mean(axis=1) * EARTH_RADIUS_KM / DISTANCE_SCALE_KM)
+    return np.where(np.isnan(score), 0.5, score)
+
+
+def score(candidates: Candidates, preferences: Preferences, budget: Optional[float]) -> np.ndarray:
+    """Weighted score in [0, 1] for every candidate"""
+    components = {
+        "price": _price_score(candidates.price, budget),
+        "rating": np.where(np.isnan(candidates.rating), 0.6, np.clip(candidates.rating / 5.0, 0.0, 1.0)),
+        "distance": _distance_score(candidates, preferences),
+    }
+    if preferences.needs:
+        matched = _POPCOUNT[candidates.features & preferences.needs]
+        components["accessibility"] = matched / _POPCOUNT[preferences.needs]
+    if preferences.veg:
+        components["food"] = candidates.veg.astype(np.float64)
+
+    total = np.zeros(len(candidates))
+    weight = 0.0
+    for name, values in components.items():
+        if values is not None:
+            total += SCORE_WEIGHTS[name] * values
+            weight += SCORE_WEIGHTS[name]
+    return total / weight
+
+
+def score_hotels(candidates: Candidates, preferences: Preferences) -> np.ndarray:
+    return score(candidates, preferences, preferences.nightly_budget)
+
+
+def score_restaurants(candidates: Candidates, preferences: Preferences) -> np.ndarray:
+    return score(candidates, preferences, preferences.meal_budget)
+
+
+def top(candidates: Candidates, scores: np.ndarray, limit: int) -> List[Dict]:
+    """The best `limit` items, best first, each with its matchScore"""
+    best = np.argsort(-scores, kind="stable")[:limit]
+    return [dict(candidates.items[i], matchScore=round(float(scores[i]), 3)) for i in best]
+
+
+def rank_hotels(hotels: Sequence[Dict], preferences: Preferences, limit: int = 3) -> List[Dict]:
+    candidates = Candidates.hotels(hotels)
+    return top(candidates, score_hotels(candidates, preferences), limit)
+
+
+def rank_restaurants(restaurants: Sequence[Dict], preferences: Preferences, limit: int = 5) -> List[Dict]:
+    candidates = Candidates.restaurants(restaurants)
+    return top(candidates, score_restaurants(candidates, preferences), limit)
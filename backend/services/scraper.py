@@ -1,13 +1,65 @@
+import os
+from typing import Dict, List
+
+from .catalog import catalog
+from .providers import Provider
+from .runtime import run_blocking
+from .scoring import Preferences, rank_hotels, rank_restaurants
+
+# Shown until the crawler (python -m services.crawler) has filled the catalog for a destination
+SAMPLE_HOTELS = [
+    {"name": "Hotel Paradise", "price": 2500, "rating": 4.5, "type": "Deluxe AC"},
+    {"name": "Green Valley Inn", "price": 1800, "rating": 4.0, "type": "Standard Non-AC"}
+]
+SAMPLE_RESTAURANTS = [
+    {"name": "Tandoori Treats", "speciality": "North Indian", "veg_friendly": True},
+    {"name": "Sea Breeze", "speciality": "Seafood", "veg_friendly": False}
+]
+
 def scrape_hotels(destination: str, check_in: str=None, check_out: str=None):
-    # Stubbed sample results; replace with real scraping logic
-    return [
-        {"name": "Hotel Paradise", "price": 2500, "rating": 4.5, "type": "Deluxe AC"},
-        {"name": "Green Valley Inn", "price": 1800, "rating": 4.0, "type": "Standard Non-AC"}
-    ]
+    """Crawled hotels for a destination, read from the local catalog (never fetched inline)"""
+    hotels = [] if catalog.is_empty() else catalog.hotels(destination)
+    return hotels or list(SAMPLE_HOTELS)
 
 def scrape_restaurants(destination: str, veg_only: bool=False):
-    return [
-        {"name": "Tandoori Treats", "speciality": "North Indian", "veg_friendly": True},
-        {"name": "Sea Breeze", "speciality": "Seafood", "veg_friendly": False}
-    ]
-    
\ No newline at end of file
+    """Crawled restaurants for a destination, read from the local catalog"""
+    restaurants = [] if catalog.is_empty() else catalog.restaurants(destination)
+    if not restaurants:
+        return list(SAMPLE_RESTAURANTS)
+    return [r for r in restaurants if r.get("veg_friendly")] if veg_only else restaurants
+
+SCRAPER_PROVIDER_DEADLINE = float(os.getenv("SCRAPER_PROVIDER_DEADLINE", "3"))
+# Listings per plan section, best matches for the trip first
+SCRAPER_RESULT_LIMIT = int(os.getenv("SCRAPER_RESULT_LIMIT", "5"))
+
+def trip_preferences(preferences: Dict) -> Preferences:
+    return Preferences.for_trip(preferences.get("budget"), preferences.get("persons", 1), preferences.get("days", 3),
+                                preferences.get("food_pref", ""), preferences.get("accessibility_needs", ()))
+
+class HotelProvider(Provider):
+    name = "hotels"
+    section = "hotels"
+    deadline = SCRAPER_PROVIDER_DEADLINE
+
+    async def fetch(self, preferences: Dict) -> List[Dict]:
+        # Catalog reads and ranking block; run them off the loop so the deadline holds
+        return await run_blocking(self.lookup, preferences)
+
+    @staticmethod
+    def lookup(preferences: Dict) -> List[Dict]:
+        hotels = scrape_hotels(preferences.get("destination", "Goa"), preferences.get("travel_date"),
+                               preferences.get("return_date"))
+        return rank_hotels(hotels, trip_preferences(preferences), SCRAPER_RESULT_LIMIT)
+
+class RestaurantProvider(Provider):
+    name = "restaurants"
+    section = "restaurants"
+    deadline = SCRAPER_PROVIDER_DEADLINE
+
+    async def fetch(self, preferences: Dict) -> List[Dict]:
+        return await run_blocking(self.lookup, preferences)
+
+    @staticmethod
+    def lookup(preferences: Dict) -> List[Dict]:
+        restaurants = scrape_restaurants(preferences.get("destination", "Goa"), preferences.get("food_pref") == "veg")
+        return rank_restaurants(restaurants, trip_preferences(preferences), SCRAPER_RESULT_LIMIT)
@@ -0,0 +1,85 @@
+import re
+from typing import Any, Dict, List, Optional
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # only the crawler needs it; request-time code reads the catalog
+    LexborHTMLParser = None
+
+_NUMBER = re.compile(r"[-+]?\d[\d,]*(?:\.\d+)?")
+
+
+def _number(text: str) -> Optional[float]:
+    match = _NUMBER.search(text or "")
+    if not match:
+        return None
+    value = float(match.group(0).replace(",", ""))
+    return int(value) if value.is_integer() else value
+
+
+class FieldSelector:
+    """
+    One field of a listing item: CSS selector plus how to read it
+    (text or an attribute, one or many values, converted to number/bool).
+    """
+
+    __slots__ = ("name", "css", "attr", "many", "type", "pattern")
+
+    def __init__(self, name: str, spec: Dict):
+        self.name = name
+        self.css = spec.get("css")
+        self.attr = spec.get("attr")
+        self.many = bool(spec.get("many"))
+        self.type = spec.get("type", "text")
+        if self.type not in ("text", "number", "bool"):
+            raise ValueError(f"Unknown type {self.type!r} for field {name}")
+        self.pattern = re.compile(spec["pattern"], re.IGNORECASE) if spec.get("pattern") else None
+
+    def _value(self, node) -> Any:
+        raw = node.attributes.get(self.attr) if self.attr else node.text(strip=True, separator=" ")
+        raw = raw or ""
+        if self.type == "number":
+            return _number(raw)
+        if self.type == "bool":
+            return bool(self.pattern.search(raw)) if self.pattern else True
+        return raw
+
+    def extract(self, item) -> Any:
+        nodes = item.css(self.css) if self.css else [item]
+        if self.many:
+            return [value for value in (self._value(node) for node in nodes) if value not in (None, "")]
+        if not nodes:
+            return False if self.type == "bool" else None
+        return self._value(nodes[0])
+
+
+class SiteSpec:
+    """
+    Parsing rules for one site, compiled once: an item selector and its field selectors.
+
+        {"name": "goa-stays", "kind": "hotels", "destination": "Goa",
+         "urls": ["https://example.com/goa/hotels"], "item": "div.hotel-card",
+         "fields": {"name": {"css": "h2"}, "price": {"css": ".price", "type": "number"}}}
+    """
+
+    def __init__(self, spec: Dict):
+        self.name = spec["name"]
+        self.kind = spec["kind"]
+        if self.kind not in ("hotels", "restaurants"):
+            raise ValueError(f"Unknown catalog kind {self.kind!r} in {self.name}")
+        self.destination = spec["destination"]
+        self.urls = list(spec["urls"])
+        self.item = spec["item"]
+        self.fields = [FieldSelector(name, field) for name, field in spec["fields"].items()]
+        if not any(field.name == "name" for field in self.fields):
+            raise ValueError(f"Site {self.name} must extract a 'name' field")
+
+    def parse(self, html: str) -> List[Dict]:
+        if LexborHTMLParser is None:
+            raise RuntimeError("selectolax is required to parse crawled pages (pip install selectolax)")
+        items = []
+        for node in LexborHTMLParser(html).css(self.item):
+            item = {field.name: field.extract(node) for field in self.fields}
+            if item.get("name"):
+                items.append(item)
+        return items
@@ -0,0 +1,186 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, Mapping, Optional
+
+from starlette.responses import FileResponse, PlainTextResponse, Response
+
+from .compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are not held in memory (served from disk instead)
+STATIC_MAX_FILE_BYTES = int(os.getenv("STATIC_MAX_FILE_BYTES", str(8 * 1024 * 1024)))
+# Smaller files are not worth compressing
+STATIC_MIN_COMPRESS_BYTES = 512
+
+# Content-hashed build output (CRA: main.1a2b3c4d.js, 453.8e1f0c2a.chunk.css, logo.6ce24c58.svg)
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/manifest+json",
+                      "application/xml", "image/svg+xml", "image/x-icon", "image/vnd.microsoft.icon",
+                      "font/ttf", "font/otf", "application/vnd.ms-fontobject")
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("application/json", ".map")
+
+
+def _strip_weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _route_path(scope) -> str:
+    """Path below the mount point"""
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path) and path[len(root_path):len(root_path) + 1] in ("", "/"):
+        return path[len(root_path):]
+    return path
+
+
+class Asset:
+    """One build file with its precompressed variants, validators and caching policy"""
+
+    __slots__ = ("path", "content_type", "cache_control", "last_modified", "etag", "variants", "etags")
+
+    def __init__(self, path: str, body: bytes, mtime: float, hashed: bool):
+        self.path = path
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+            content_type += "; charset=utf-8"
+        self.content_type = content_type
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if hashed else REVALIDATE_CACHE_CONTROL
+        self.last_modified = formatdate(mtime, usegmt=True)
+
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        # encoding (None = identity) -> body; each representation gets its own strong ETag
+        self.variants = {None: body}
+        self.etags = {None: self.etag}
+        if len(body) >= STATIC_MIN_COMPRESS_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+            for encoding in SUPPORTED_ENCODINGS:
+                compressed = compress(body, encoding, 9 if encoding == "gzip" else None)
+                if len(compressed) < len(body):
+                    self.variants[encoding] = compressed
+                    self.etags[encoding] = f'"{digest}-{encoding}"'
+
+    def not_modified(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {_strip_weak(tag.strip()) for tag in if_none_match.split(",")}
+        return not candidates.isdisjoint(self.etags.values())
+
+    def response(self, headers: Mapping[str, str], method: str = "GET") -> Response:
+        """200 with the best variant for the client, or 304 when its ETag still matches"""
+        encoding = negotiate_encoding(headers.get("accept-encoding"), tuple(e for e in self.variants if e))
+        response_headers = {
+            "etag": self.etags[encoding],
+            "cache-control": self.cache_control,
+            "last-modified": self.last_modified,
+            "vary": "Accept-Encoding",
+        }
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and self.not_modified(if_none_match):
+            return Response(status_code=304, headers=response_headers)
+
+        body = self.variants[encoding]
+        if encoding:
+            response_headers["content-encoding"] = encoding
+        response_headers["content-length"] = str(len(body))
+        return Response(b"" if method == "HEAD" else body, headers=response_headers,
+                        media_type=self.content_type)
+
+
+class StaticAssets:
+    """
+    The React build held in memory: every file is read once, precompressed (gzip and,
+    when available, brotli) and served with strong ETags. Content-hashed bundles are
+    marked immutable; everything else is revalidated.
+    """
+
+    def __init__(self, root: str, max_file_bytes: int = STATIC_MAX_FILE_BYTES):
+        self.root = os.path.abspath(root)
+        self.max_file_bytes = max_file_bytes
+        self.assets = {}
+        self.on_disk = {}
+        self.loaded = False
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict:
+        """Read and precompress the build directory (idempotent)"""
+        with self._lock:
+            if self.loaded:
+                return self.stats
+            started = time.perf_counter()
+            raw_bytes = stored_bytes = 0
+            if not os.path.isdir(self.root):
+                logger.warning(f"⚠️ Frontend build not found at {self.root}; static files will 404")
+            for directory, _, files in os.walk(self.root):
+                for name in files:
+                    full_path = os.path.join(directory, name)
+                    rel_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                    stat = os.stat(full_path)
+                    if stat.st_size > self.max_file_bytes:
+                        self.on_disk[rel_path] = full_path
+                        continue
+                    with open(full_path, "rb") as f:
+                        asset = Asset(rel_path, f.read(), stat.st_mtime, bool(HASHED_NAME.search(name)))
+                    self.assets[rel_path] = asset
+                    raw_bytes += stat.st_size
+                    stored_bytes += sum(len(body) for body in asset.variants.values())
+
+            self.stats = {
+                "files": len(self.assets),
+                "servedFromDisk": len(self.on_disk),
+                "bytes": raw_bytes,
+                "memoryBytes": stored_bytes,
+                "loadSeconds": round(time.perf_counter() - started, 3),
+            }
+            self.loaded = True
+        logger.info(f"📦 Loaded {self.stats['files']} static file(s) ({raw_bytes} bytes) in {self.stats['loadSeconds']}s")
+        return self.stats
+
+    def get(self, path: str) -> Optional[Asset]:
+        if not self.loaded:
+            self.load()
+        return self.assets.get(path.lstrip("/"))
+
+    def response(self, path: str, headers: Mapping[str, str], method: str = "GET") -> Optional[Response]:
+        """Response for a build file, or None if the build has no such file"""
+        asset = self.get(path)
+        if asset is not None:
+            return asset.response(headers, method)
+        full_path = self.on_disk.get(path.lstrip("/"))
+        if full_path is not None:
+            return FileResponse(full_path)
+        return None
+
+
+class StaticAssetsApp:
+    """ASGI app serving one directory of the in-memory build (replacement for StaticFiles)"""
+
+    def __init__(self, assets: StaticAssets, prefix: str):
+        self.assets = assets
+        self.prefix = prefix.strip("/")
+
+    async def __call__(self, scope, receive, send):
+        method = scope.get("method", "GET")
+        if method not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"allow": "GET, HEAD"})
+        else:
+            path = _route_path(scope)
+            headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+            response = self.assets.response(f"{self.prefix}/{path.lstrip('/')}", headers, method)
+            if response is None:
+                response = PlainTextResponse("Not Found", status_code=404)
+        await response(scope, receive, send)
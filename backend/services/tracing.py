@@ -0,0 +1,291 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from .logging_setup import request_id_var
+
+logger = logging.getLogger(__name__)
+
+# Exporters: comma separated "file", "console", "otlp" (empty disables tracing)
+TRACE_EXPORTERS = [name.strip() for name in os.getenv("TRACE_EXPORTERS", "").lower().split(",") if name.strip()]
+TRACE_FILE = os.getenv("TRACE_FILE") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "traces.jsonl")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://127.0.0.1:4318").rstrip("/")
+TRACE_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "dream-destiny-backend")
+
+# Tail sampling: slow or failed requests are always kept, the rest at TRACE_SAMPLE_RATE
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_SLOW_THRESHOLD = float(os.getenv("TRACE_SLOW_THRESHOLD", "2.0"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "512"))
+TRACE_QUEUE_SIZE = 1000
+
+current_span = ContextVar("current_span", default=None)  # type: ContextVar[Optional[Span]]
+
+
+def _new_id(bits: int) -> str:
+    return "{:0{}x}".format(random.getrandbits(bits), bits // 4)
+
+
+class Trace:
+    """Spans of one request, buffered until the root span ends so sampling can see its duration"""
+
+    __slots__ = ("trace_id", "spans", "lock", "dropped")
+
+    def __init__(self, trace_id: str = None):
+        self.trace_id = trace_id or _new_id(128)
+        self.spans = []
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+    def add(self, span: "Span"):
+        with self.lock:
+            if len(self.spans) < TRACE_MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start", "end", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict):
+        self.trace = trace
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time_ns()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        return ((self.end or time.time_ns()) - self.start) / 1e9
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict:
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start,
+            "endTimeUnixNano": self.end,
+            "durationMs": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of spans"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [{
+                    "traceId": span.trace.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 2 if span.parent_id is None else 1,
+                    "startTimeUnixNano": str(span.start),
+                    "endTimeUnixNano": str(span.end),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+                } for span in spans]
+            }]
+        }]
+    }
+
+
+class FileExporter:
+    """Appends one JSON span per line, for offline analysis"""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class ConsoleExporter:
+    """Logs a compact per-trace breakdown"""
+
+    def export(self, spans: List[Span]):
+        root = next((s for s in spans if s.parent_id is None), spans[0])
+        steps = ", ".join(f"{s.name}={s.duration * 1000:.0f}ms" for s in spans if s is not root)
+        logger.info(f"🔎 Trace {root.trace.trace_id} {root.name} {root.duration * 1000:.0f}ms: {steps}")
+
+
+class OTLPExporter:
+    """Posts spans to an OTLP/HTTP collector (JSON encoding)"""
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT, timeout: float = 5):
+        self.url = f"{endpoint}/v1/traces"
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def export(self, spans: List[Span]):
+        self.session.post(self.url, json=to_otlp(spans), timeout=self.timeout)
+
+
+EXPORTERS = {"file": FileExporter, "console": ConsoleExporter, "otlp": OTLPExporter}
+
+
+class Tracer:
+    """
+    Creates spans and hands finished, sampled traces to the exporters on a background
+    thread. With no exporters configured every call is a cheap no-op.
+    """
+
+    def __init__(self, exporters: List = None, sample_rate: float = TRACE_SAMPLE_RATE,
+                 slow_threshold: float = TRACE_SLOW_THRESHOLD):
+        self.exporters = exporters if exporters is not None else [EXPORTERS[name]() for name in TRACE_EXPORTERS if name in EXPORTERS]
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.exported = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._worker = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, trace_id: str = None, **attributes) -> Iterator[Optional[Span]]:
+        """
+        Open a span as a child of the current one. Outside a trace (and unless root=True)
+        nothing is recorded and None is yielded.
+        """
+        parent = current_span.get()
+        if not self.enabled or (parent is None and not root):
+            yield None
+            return
+
+        trace = Trace(trace_id) if parent is None else parent.trace
+        span = Span(trace, name, parent.span_id if parent is not None else None, attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.time_ns()
+            current_span.reset(token)
+            trace.add(span)
+            if parent is None:
+                self._finish(trace, span)
+
+    def _should_keep(self, root: Span) -> bool:
+        if root.error or root.duration >= self.slow_threshold:
+            return True
+        if root.attributes.get("http.status_code", 200) >= 500:
+            return True
+        return random.random() < self.sample_rate
+
+    def _finish(self, trace: Trace, root: Span):
+        if not self._should_keep(root):
+            return
+        if trace.dropped:
+            root.attributes["trace.dropped_spans"] = trace.dropped
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(trace.spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker_pid != os.getpid():
+            with self._lock:
+                if self._worker is None or self._worker_pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+                    self._worker = threading.Thread(target=self._export_loop, name="trace-exporter", daemon=True)
+                    self._worker_pid = os.getpid()
+                    self._worker.start()
+
+    def _export_loop(self):
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            for exporter in self.exporters:
+                try:
+                    exporter.export(spans)
+                except Exception as e:
+                    logger.debug(f"Trace export via {type(exporter).__name__} failed: {e}")
+            self.exported += 1
+
+    def flush(self, timeout: float = 2.0):
+        """Wait (briefly) for queued traces to be exported"""
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+tracer = Tracer()
+span = tracer.span
+atexit.register(tracer.flush)
+
+
+def _traceparent(scope) -> Optional[str]:
+    """Trace id from a W3C traceparent header, so upstream traces can be continued"""
+    for name, value in scope.get("headers", []):
+        if name == b"traceparent":
+            parts = value.decode("latin-1").split("-")
+            if len(parts) == 4 and len(parts[1]) == 32:
+                return parts[1]
+    return None
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span for every HTTP request"""
+
+    def __init__(self, app, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with self.tracer.span(f"{scope['method']} {scope['path']}", root=True,
+                              trace_id=_traceparent(scope), **{"request.id": request_id_var.get()}) as root:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope['method']} {route}"
@@ -1,7 +1,26 @@
 import os
+from typing import Dict, List
+
+from .providers import Provider
+from .runtime import run_blocking
+
 def get_flights(origin: str, destination: str, date: str):
     # Mocked flights
     return [
         {"airline": "IndiGo", "price": 4800, "duration": "2h 20m"},
         {"airline": "Air India", "price": 5500, "duration": "2h 10m"}
     ]
+
+class FlightProvider(Provider):
+    name = "flights"
+    section = "flights"
+    deadline = float(os.getenv("FLIGHT_PROVIDER_DEADLINE", "5"))
+
+    async def fetch(self, preferences: Dict) -> List[Dict]:
+        # Off the loop, so the deadline holds and other providers keep running
+        return await run_blocking(
+            get_flights,
+            preferences.get("origin", "Delhi"),
+            preferences.get("destination", "Goa"),
+            preferences.get("travel_date", "2025-08-20"),
+        )
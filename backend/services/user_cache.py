@@ -0,0 +1,65 @@
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from .cache import TTLCache, get_cache
+
+# Upper bound on how stale a cached user may be in another worker after a change
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+_decoded_tokens = TTLCache(max_entries=USER_CACHE_MAX_ENTRIES)
+_users = get_cache("users", default_ttl=USER_CACHE_TTL, max_entries=USER_CACHE_MAX_ENTRIES)
+
+
+class CachedUser:
+    """Minimal user record kept in the cache (no password hash)"""
+
+    __slots__ = ("id", "username", "email")
+
+    def __init__(self, id: int, username: str, email: str):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "username": self.username, "email": self.email}
+
+    @classmethod
+    def from_model(cls, user) -> "CachedUser":
+        return cls(user.id, user.username, user.email)
+
+
+def _ttl_until(exp: Optional[float], ttl: float) -> float:
+    # Never keep anything past the token's own expiry
+    return ttl if exp is None else min(ttl, exp - time.time())
+
+
+def decode_token(token: str, decode: Callable[[str], Dict]) -> Dict:
+    """JWT claims, decoded once per token until it expires"""
+    payload = _decoded_tokens.get(token)
+    if payload is None:
+        payload = decode(token)
+        ttl = _ttl_until(payload.get("exp"), USER_CACHE_TTL)
+        if ttl > 0:
+            _decoded_tokens.set(token, payload, ttl)
+    return payload
+
+
+def get_user(username: str, exp: Optional[float], load: Callable[[str], Optional[object]]) -> Optional[CachedUser]:
+    """The user for a token subject; `load` (a DB query) only runs on a cache miss"""
+    record = _users.get(username)
+    if record is None:
+        user = load(username)
+        if user is None:
+            return None
+        record = CachedUser.from_model(user).to_dict()
+        ttl = _ttl_until(exp, USER_CACHE_TTL)
+        if ttl > 0:
+            _users.set(username, record, ttl)
+    return CachedUser(**record)
+
+
+def invalidate_user(username: str):
+    """Drop a user after it changed (shared tiers at once, other workers' memory within USER_CACHE_TTL)"""
+    _users.delete(username)
@@ -7,6 +7,7 @@ This script handles different Python environments and ensures uvicorn runs prope
 import sys
 import subprocess
 import os
+import argparse
 from pathlib import Path
 
 def check_python_version():
@@ -50,6 +51,40 @@ def check_env_file():
     print("✅ .env file found")
     return True
 
+def default_workers():
+    """One event-loop worker per available CPU core"""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+def start_production_server(host, port, workers):
+    """Start the multi-worker production server"""
+    backend_dir = Path(__file__).parent
+    os.chdir(backend_dir)
+
+    env = dict(os.environ, HOST=host, PORT=str(port))
+    if workers:
+        env["WEB_CONCURRENCY"] = str(workers)
+
+    if os.name != "nt":
+        try:
+            import gunicorn  # noqa: F401
+            print(f"🚀 Starting Dream Destiny Backend (production, gunicorn) on {host}:{port}...")
+            # Settings (workers, preload, graceful timeouts) live in gunicorn.conf.py
+            cmd = [sys.executable, "-m", "gunicorn", "main:app", "-c", str(backend_dir / "gunicorn.conf.py")]
+            return subprocess.run(cmd, env=env).returncode == 0
+        except ImportError:
+            print("⚠️  gunicorn not installed; falling back to uvicorn workers (no preload)")
+
+    # Windows (or no gunicorn): uvicorn's own process manager
+    count = workers or default_workers()
+    print(f"🚀 Starting Dream Destiny Backend (production, uvicorn x{count}) on {host}:{port}...")
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", host, "--port", str(port),
+           "--workers", str(count), "--timeout-graceful-shutdown", os.getenv("GRACEFUL_TIMEOUT", "30"),
+           "--no-access-log", "--proxy-headers"]
+    return subprocess.run(cmd, env=env).returncode == 0
+
 def start_server():
     """Start the uvicorn server"""
     print("🚀 Starting Dream Destiny Backend Server...")
@@ -83,8 +118,20 @@ def start_server():
     
     return True
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the Dream Destiny backend")
+    parser.add_argument("--prod", action="store_true", default=os.getenv("SERVER_MODE", "").lower() == "production",
+                        help="multi-worker production server (default: development server with --reload)")
+    parser.add_argument("--host", default=os.getenv("HOST"), help="bind address (prod default 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0") or 0),
+                        help="worker processes (default: one per CPU core)")
+    parser.add_argument("--skip-install", action="store_true", help="do not pip install requirements first")
+    return parser.parse_args()
+
 def main():
     """Main function"""
+    args = parse_args()
     print("=" * 60)
     print("🌟 Dream Destiny Backend Startup Script")
     print("=" * 60)
@@ -94,7 +141,7 @@ def main():
         return
     
     # Install requirements
-    if not install_requirements():
+    if not args.skip_install and not install_requirements():
         return
     
     # Check environment file
@@ -103,7 +150,10 @@ def main():
         return
     
     # Start server
-    start_server()
+    if args.prod:
+        start_production_server(args.host or "0.0.0.0", args.port, args.workers)
+    else:
+        start_server()
 
 if __name__ == "__main__":
     main()
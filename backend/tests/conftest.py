@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import backend modules the same way main.py does (from the backend directory)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the shared cache tiers (SQLite file, Redis) out of tests unless a test builds its own
+os.environ.setdefault("CACHE_TIERS", "")
@@ -0,0 +1,70 @@
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _bulk(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            self.server.commands.append(command.decode())
+            if command == b"GET":
+                entry = store.get(args[1])
+                if entry and entry[1] is not None and entry[1] <= time.time():
+                    store.pop(args[1], None)
+                    entry = None
+                reply = self._bulk(entry[0] if entry else None)
+            elif command == b"SET":
+                expires_at = None
+                if len(args) >= 5 and args[3].upper() == b"PX":
+                    expires_at = time.time() + int(args[4]) / 1000
+                store[args[1]] = (args[2], expires_at)
+                reply = b"+OK\r\n"
+            elif command == b"DEL":
+                reply = b":%d\r\n" % sum(1 for key in args[1:] if store.pop(key, None) is not None)
+            elif command in (b"PING", b"AUTH", b"SELECT"):
+                reply = b"+OK\r\n"
+            else:
+                reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+class MiniRedis(socketserver.ThreadingTCPServer):
+    """In-memory stand-in for a Redis server (GET/SET PX/DEL) used by the cache tests"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.store = {}
+        self.commands = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,66 @@
+import random
+import time
+
+from services.budget import duration_minutes, optimize, transport_cost
+from services.scoring import Preferences
+
+FLIGHT = {"mode": "Flight", "provider": "AI 101", "departure": "08:00", "arrival": "10:15",
+          "duration": "PT2H15M", "price": "₹18,000 total"}
+TRAIN = {"mode": "Train", "provider": "Goa Express (12779)", "departure": "15:00", "arrival": "09:30",
+         "duration": "18h 30m", "price": "₹2400 total"}
+HOTELS = [
+    {"name": "Taj Fort Aguada", "pricePerNight": 14000, "rating": 5},
+    {"name": "Calangute Comfort", "pricePerNight": 2500, "rating": 4.2},
+    {"name": "Backpacker Hostel", "pricePerNight": 600, "rating": 3.4},
+]
+
+
+def test_costs_and_durations():
+    assert duration_minutes("PT2H15M") == 135 and duration_minutes("18h 30m") == 1110
+    assert duration_minutes("06:15") == 375 and duration_minutes("") is None
+    # Trains are searched one way, flight offers include the return
+    assert transport_cost(TRAIN, 2) == 4800 and transport_cost(FLIGHT, 2) == 18000
+    assert transport_cost({"mode": "Bus", "pricePerPerson": "₹450 per person"}, 3) == 1350
+
+
+def test_best_combination_fits_the_budget():
+    plan = optimize([FLIGHT, TRAIN], HOTELS, budget=22000, persons=2, days=4)
+    assert plan.feasible
+    for combination in plan.combinations:
+        # 700 per person per day stays free for meals and sightseeing
+        assert combination.total + 700 * 2 * 4 <= 22000
+    best = plan.best
+    assert (best.transport["provider"], best.hotel["name"]) == ("Goa Express (12779)", "Calangute Comfort")
+    assert best.hotel_cost == 2500 * 3
+    assert plan.daily_allowance() >= 700
+
+
+def test_generous_budget_buys_speed_and_comfort():
+    plan = optimize([FLIGHT, TRAIN], HOTELS, budget=200000, persons=2, days=4)
+    assert (plan.best.transport["mode"], plan.best.hotel["name"]) == ("Flight", "Taj Fort Aguada")
+
+
+def test_infeasible_budget_reports_cheapest_combination():
+    plan = optimize([FLIGHT, TRAIN], HOTELS, budget=5000, persons=2, days=4)
+    assert not plan.feasible
+    assert plan.best.total == 4800 + 600 * 3
+    assert plan.to_dict()["combinations"][0]["leftOver"] == 5000 - 6600
+
+
+def test_pruned_search_matches_exhaustive_search():
+    rng = random.Random(11)
+    transports = [{"mode": rng.choice(["Train", "Flight"]), "provider": f"T{i}", "duration": f"{rng.randint(2, 30)}h",
+                   "price": rng.randint(1000, 30000)} for i in range(40)]
+    hotels = [{"name": f"H{i}", "pricePerNight": rng.randint(500, 15000), "rating": rng.uniform(2.5, 5)}
+              for i in range(400)]
+    preferences = Preferences.for_trip(60000, 3, 5)
+
+    started = time.perf_counter()
+    plan = optimize(transports, hotels, 60000, 3, 5, preferences, limit=5)
+    assert time.perf_counter() - started < 0.1
+
+    # With room for every pair nothing is pruned: the top 5 must be the same
+    exhaustive = optimize(transports, hotels, 60000, 3, 5, preferences, limit=len(transports) * len(hotels))
+    assert [(c.transport["provider"], c.hotel["name"]) for c in plan.combinations] == \
+        [(c.transport["provider"], c.hotel["name"]) for c in exhaustive.combinations[:5]]
+    assert all(c.total <= 60000 - 700 * 3 * 5 for c in exhaustive.combinations)
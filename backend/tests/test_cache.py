@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from resp_server import MiniRedis
+from services.cache import Cache, RedisTier, SQLiteTier, dumps, loads
+
+
+@pytest.fixture
+def redis_server():
+    server = MiniRedis()
+    yield server
+    server.close()
+
+
+def test_entries_round_trip_with_expiry():
+    value = {"trains": [{"trainNumber": "12951", "fare": 1450}], "dataSource": "irctc_api"}
+    expires_at, decoded = loads(dumps(value, 123.5))
+    assert expires_at == 123.5
+    assert decoded == value
+
+
+def test_sqlite_tier_is_shared_between_caches(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = Cache("rail", tiers=[SQLiteTier(path)])
+    writer.set(("search", "NDLS", "BCT", None), {"totalTrains": 3}, ttl=60)
+
+    # A fresh cache (another worker) misses in memory and finds the entry on disk
+    reader = Cache("rail", tiers=[SQLiteTier(path)])
+    assert reader.get(("search", "NDLS", "BCT", None)) == {"totalTrains": 3}
+    assert reader.stats()["sqlite"]["hits"] >= 1
+    assert Cache("other", tiers=[SQLiteTier(path)]).get(("search", "NDLS", "BCT", None)) is None
+
+
+def test_sqlite_entries_expire(tmp_path):
+    cache = Cache("rail", tiers=[SQLiteTier(str(tmp_path / "cache.db"))])
+    cache.set("fare", {"SL": 300}, ttl=0.05)
+    time.sleep(0.1)
+    assert Cache("rail", tiers=cache.tiers).get("fare") is None
+
+
+def test_redis_tier_backfills_upper_tiers(redis_server, tmp_path):
+    redis = RedisTier(redis_server.url)
+    Cache("rail", tiers=[redis]).set("schedule|12951", {"stops": 8}, ttl=60)
+    assert b"dd:rail:schedule|12951" in redis_server.store
+
+    sqlite = SQLiteTier(str(tmp_path / "cache.db"))
+    cache = Cache("rail", tiers=[sqlite, redis])
+    assert cache.get("schedule|12951") == {"stops": 8}
+    assert sqlite.get("dd:rail:schedule|12951") is not None
+
+
+def test_delete_invalidates_every_tier(redis_server):
+    cache = Cache("users", tiers=[RedisTier(redis_server.url)])
+    cache.set("uid-1", {"name": "Asha"})
+    cache.delete("uid-1")
+    assert cache.get("uid-1") is None
+    assert not redis_server.store
+
+
+def test_unreachable_redis_degrades_to_memory():
+    cache = Cache("rail", tiers=[RedisTier("redis://127.0.0.1:1/0", timeout=0.05)])
+    cache.set("k", 1)
+    assert cache.get("k") == 1
+    assert cache.get_or_set("missing", lambda: 2) == 2
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import time
+
+from services.container import ServiceContainer
+
+
+def test_factory_runs_once_under_concurrency():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    container = ServiceContainer()
+    container.register("slow", factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(container.get("slow"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+    assert container.report()["services"]["slow"]["created"] is True
+
+
+def test_peek_never_creates():
+    container = ServiceContainer()
+    container.register("lazy", object)
+    assert container.peek("lazy") is None
+    assert not container.created("lazy")
+
+
+def test_warm_up_creates_everything_and_survives_failures():
+    def broken():
+        raise RuntimeError("no credentials")
+
+    container = ServiceContainer()
+    container.register("ok", dict)
+    container.register("broken", broken)
+    asyncio.run(container.warm_up())
+
+    report = container.report()
+    assert report["services"]["ok"]["created"] is True
+    assert report["services"]["broken"]["created"] is False
+    assert "warmUp" in report["phases"]
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from page_server import PageServer
+from services import scraper
+from services.catalog import Catalog
+from services.crawler import Crawler
+from services.site_parsers import SiteSpec
+
+SITES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sites.json")
+
+
+@pytest.fixture
+def server():
+    server = PageServer()
+    yield server
+    server.close()
+
+
+def load_sites(base_url):
+    with open(SITES_PATH, "r", encoding="utf-8") as f:
+        specs = json.loads(f.read().replace("{base}", base_url))
+    return [SiteSpec(spec) for spec in specs]
+
+
+def test_recorded_pages_are_parsed_into_the_catalog(server, tmp_path):
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    summary = asyncio.run(Crawler(catalog, domain_delay=0).crawl(load_sites(server.url)))
+    assert summary == {"updated": 2, "not_modified": 0, "error": 0}
+
+    hotels = catalog.hotels("goa")
+    assert [h["name"] for h in hotels] == ["Palm Grove Inn", "Sea Shell Resort"]
+    sea_shell = hotels[1]
+    assert sea_shell["price"] == 3450 and sea_shell["rating"] == 4.6
+    assert sea_shell["accessible"] is True and hotels[0]["accessible"] is False
+    assert sea_shell["amenities"] == ["Free WiFi", "Wheelchair accessible", "Pool"]
+    assert (sea_shell["lat"], sea_shell["lon"]) == (15.5527, 73.7517)
+
+    assert [r["name"] for r in catalog.restaurants("Goa", veg_only=True)] == ["Shree Krishna Bhojanalay"]
+    assert server.requests[0][2]["User-Agent"].startswith("DreamDestinyBot")
+
+
+def test_recrawl_is_conditional_and_keeps_the_catalog(server, tmp_path):
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    sites = load_sites(server.url)
+    asyncio.run(Crawler(catalog, domain_delay=0).crawl(sites))
+    summary = asyncio.run(Crawler(catalog, domain_delay=0).crawl(sites))
+
+    assert summary == {"updated": 0, "not_modified": 2, "error": 0}
+    assert all("If-None-Match" in headers for _, _, headers in server.requests[2:])
+    assert len(catalog.hotels("Goa")) == 2
+
+
+def test_requests_to_one_domain_are_spaced(server, tmp_path):
+    site = load_sites(server.url)[0]
+    site.urls = [f"{server.url}/goa_hotels.html?page={n}" for n in range(3)]
+    asyncio.run(Crawler(Catalog(str(tmp_path / "catalog.db")), domain_delay=0.1).crawl([site]))
+
+    starts = sorted(at for at, _, _ in server.requests)
+    assert all(later - earlier >= 0.09 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_throttled_pages_are_retried(server, tmp_path):
+    server.throttle["goa_restaurants.html"] = 1
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    summary = asyncio.run(Crawler(catalog, domain_delay=0).crawl(load_sites(server.url)[1:]))
+
+    assert summary["updated"] == 1
+    assert len(catalog.restaurants("goa")) == 2
+
+
+def test_request_time_lookups_read_the_catalog(server, tmp_path, monkeypatch):
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    monkeypatch.setattr(scraper, "catalog", catalog)
+    assert scraper.scrape_hotels("Goa") == scraper.SAMPLE_HOTELS
+
+    asyncio.run(Crawler(catalog, domain_delay=0).crawl(load_sites(server.url)))
+    fetched = len(server.requests)
+    assert [h["name"] for h in scraper.scrape_hotels("Goa")] == ["Palm Grove Inn", "Sea Shell Resort"]
+    assert [r["name"] for r in scraper.scrape_restaurants("Goa", veg_only=True)] == ["Shree Krishna Bhojanalay"]
+    assert scraper.scrape_hotels("Manali") == scraper.SAMPLE_HOTELS
+    assert len(server.requests) == fetched
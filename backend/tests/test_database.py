@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import text
+
+import database
+
+
+def test_sqlite_engine_uses_wal_and_pool(tmp_path):
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == database.SQLITE_BUSY_TIMEOUT_MS
+    assert engine.pool.size() == database.DB_POOL_SIZE
+    engine.dispose()
+
+
+def test_concurrent_writers_do_not_fail(tmp_path):
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE signups (id INTEGER PRIMARY KEY, name TEXT)"))
+    errors = []
+
+    def signup(index):
+        try:
+            for n in range(20):
+                with engine.begin() as conn:
+                    conn.execute(text("INSERT INTO signups (name) VALUES (:name)"), {"name": f"{index}-{n}"})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=signup, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM signups")).scalar() == 160
+    engine.dispose()
+
+
+def test_async_url_mapping():
+    assert database.async_url("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+    assert database.async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+def test_async_session_reads_the_same_database(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = database.create_db_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE trips (destination TEXT)"))
+        conn.execute(text("INSERT INTO trips VALUES ('Goa')"))
+    engine.dispose()
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", url)
+    monkeypatch.setattr(database, "_async_engine", None)
+
+    async def read():
+        async with database.AsyncSessionLocal() as db:
+            destination = (await db.execute(text("SELECT destination FROM trips"))).scalar()
+        await database.get_async_engine().dispose()
+        return destination
+
+    assert asyncio.run(read()) == "Goa"
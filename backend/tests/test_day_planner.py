@@ -0,0 +1,85 @@
+import itertools
+import random
+
+import numpy as np
+
+from services.day_planner import cluster, format_skeleton, order_day, plan_days, _project, _stops
+
+# Two neighbourhoods of Goa ~25 km apart, plus a beach for the evening
+NORTH = [("Fort Aguada", "Historical Site", 15.4920, 73.7737), ("Candolim Market", "Shopping", 15.5170, 73.7630),
+         ("Baga Beach", "Beach", 15.5553, 73.7517)]
+SOUTH = [("Basilica of Bom Jesus", "Religious Site", 15.5009, 73.9116),
+         ("Se Cathedral", "Religious Site", 15.5036, 73.9123),
+         ("Goa State Museum", "Museum", 15.4960, 73.8330)]
+HOTEL = {"name": "Calangute Comfort", "latitude": 15.5439, "longitude": 73.7553}
+
+
+def poi(name, kind, lat, lon, rank="5"):
+    return {"name": name, "type": kind, "rank": rank, "coordinates": {"latitude": lat, "longitude": lon}}
+
+
+def goa_pois():
+    return [poi(*p) for p in NORTH + SOUTH]
+
+
+def test_days_follow_neighbourhoods():
+    plan = plan_days(goa_pois(), 3, HOTEL, arrival_day=False)
+    days = [{stop["name"] for stop in day["stops"]} for day in plan]
+    assert days[0] == {name for name, *_ in NORTH}
+    assert days[1] == {name for name, *_ in SOUTH}
+    assert days[2] == set()
+
+
+def test_arrival_day_only_plans_afternoon_and_evening():
+    plan = plan_days(goa_pois(), 3, HOTEL)
+    first = plan[0]["stops"]
+    assert [stop["slot"] for stop in first] == ["afternoon", "evening"]
+    # The sights closest to the hotel come first
+    assert "Baga Beach" in {stop["name"] for stop in first}
+    assert sum(len(day["stops"]) for day in plan) == 6
+
+
+def test_nightlife_goes_to_the_evening():
+    # Nearest to the hotel, but it only suits the evening
+    pois = [poi("Tito's Lane", "Nightlife", 15.5440, 73.7560)] + [poi(*p) for p in NORTH[:2]]
+    plan = plan_days(pois, 1, HOTEL, arrival_day=False)
+    slots = {stop["name"]: stop["slot"] for stop in plan[0]["stops"]}
+    assert slots == {"Fort Aguada": "morning", "Candolim Market": "afternoon", "Tito's Lane": "evening"}
+
+
+def test_route_is_as_short_as_any_order():
+    rng = random.Random(5)
+    pois = [poi(f"P{i}", "Sights", 15.3 + rng.random() * 0.3, 73.7 + rng.random() * 0.3) for i in range(6)]
+    stops = _stops(pois)
+    points = _project(np.array([s.lat for s in stops]), np.array([s.lon for s in stops]), 15.45)
+    start = points.mean(axis=0)
+    order = order_day(list(range(6)), start, points, stops, slots=("any",) * 6)
+
+    def length(route):
+        legs = [start] + [points[i] for i in route]
+        return sum(float(np.linalg.norm(b - a)) for a, b in zip(legs, legs[1:]))
+
+    optimum = min(length(route) for route in itertools.permutations(range(6)))
+    assert length(order) <= optimum * 1.1
+
+
+def test_clusters_respect_capacity():
+    rng = np.random.default_rng(2)
+    points = rng.uniform(0, 30, size=(14, 2))
+    groups = cluster(points, [2, 3, 3, 3, 3])
+    assert sorted(i for group in groups for i in group) == list(range(14))
+    assert [len(group) <= cap for group, cap in zip(groups, [2, 3, 3, 3, 3])] == [True] * 5
+
+
+def test_plans_are_reproducible_and_compact():
+    pois = goa_pois()
+    plan = plan_days(pois, 4, HOTEL)
+    assert plan_days(list(reversed(pois)), 4, HOTEL) == plan
+    skeleton = format_skeleton(plan)
+    assert skeleton.splitlines()[0].startswith("Day 1: Afternoon: ")
+    assert skeleton.splitlines()[-1] == "Day 4: free / travel"
+
+
+def test_pois_without_coordinates_are_skipped():
+    plan = plan_days([{"name": "Somewhere", "type": "Sights", "coordinates": {}}], 2)
+    assert plan == [{"day": 1, "stops": []}, {"day": 2, "stops": []}]
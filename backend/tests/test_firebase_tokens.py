@@ -0,0 +1,130 @@
+import base64
+import datetime
+import json
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509.oid import NameOID
+
+from services.firebase_tokens import FirebaseTokenVerifier, InvalidIdToken, SigningKeys
+
+PROJECT = "dream-destiny-test"
+
+
+def make_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.test")])
+    now = datetime.datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return key, certificate.public_bytes(serialization.Encoding.PEM).decode("ascii")
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def sign(key, kid, **overrides):
+    now = int(time.time())
+    claims = {"aud": PROJECT, "iss": f"https://securetoken.google.com/{PROJECT}", "sub": "uid-123",
+              "iat": now - 10, "auth_time": now - 10, "exp": now + 3600, "email": "asha@example.com"}
+    claims.update(overrides)
+    signing_input = b64(json.dumps({"alg": "RS256", "kid": kid}).encode()) + "." + b64(json.dumps(claims).encode())
+    signature = key.sign(signing_input.encode("ascii"), padding.PKCS1v15(), hashes.SHA256())
+    return signing_input + "." + b64(signature)
+
+
+@pytest.fixture(scope="module")
+def keypair():
+    return make_key()
+
+
+@pytest.fixture
+def verifier(keypair):
+    fetches = []
+
+    def fetch():
+        fetches.append(time.time())
+        return {"kid-1": keypair[1]}, 3600
+
+    verifier = FirebaseTokenVerifier(PROJECT, SigningKeys(fetch))
+    verifier.fetches = fetches
+    return verifier
+
+
+def test_valid_token_is_verified_locally_and_remembered(verifier, keypair):
+    token = sign(keypair[0], "kid-1")
+    claims = verifier.verify(token)
+    assert claims["uid"] == "uid-123"
+    assert claims["email"] == "asha@example.com"
+    assert verifier.verify(token) is claims
+    assert len(verifier.fetches) == 1
+
+
+@pytest.mark.parametrize("overrides", [
+    {"aud": "another-project"},
+    {"iss": "https://securetoken.google.com/another-project"},
+    {"exp": int(time.time()) - 5},
+    {"iat": int(time.time()) + 600},
+    {"sub": ""},
+])
+def test_invalid_claims_are_rejected(verifier, keypair, overrides):
+    with pytest.raises(InvalidIdToken):
+        verifier.verify(sign(keypair[0], "kid-1", **overrides))
+
+
+def test_bad_signatures_and_unknown_keys_are_rejected(verifier, keypair):
+    other_key, _ = make_key()
+    with pytest.raises(InvalidIdToken):
+        verifier.verify(sign(other_key, "kid-1"))
+    with pytest.raises(InvalidIdToken):
+        verifier.verify(sign(keypair[0], "kid-unknown"))
+    with pytest.raises(InvalidIdToken):
+        verifier.verify("not.a-token")
+
+
+def test_rotated_keys_are_picked_up_in_the_background(keypair):
+    rotated_key, rotated_pem = make_key()
+    responses = [({"kid-1": keypair[1]}, 3600), ({"kid-1": keypair[1], "kid-2": rotated_pem}, 3600)]
+    keys = SigningKeys(lambda: responses.pop(0) if len(responses) > 1 else responses[0], min_refresh_interval=0)
+    verifier = FirebaseTokenVerifier(PROJECT, keys)
+    token = sign(rotated_key, "kid-2")
+    with pytest.raises(InvalidIdToken):
+        verifier.verify(token)
+
+    deadline = time.monotonic() + 5
+    while keys.get("kid-2") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert verifier.verify(token)["uid"] == "uid-123"
+
+
+def test_unknown_key_right_after_a_refresh_is_deferred_not_dropped(keypair):
+    rotated_key, rotated_pem = make_key()
+    responses = [({"kid-1": keypair[1]}, 3600), ({"kid-1": keypair[1], "kid-2": rotated_pem}, 3600)]
+    fetches = []
+
+    def fetch():
+        fetches.append(time.monotonic())
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    keys = SigningKeys(fetch, min_refresh_interval=0.3)
+    keys.refresh()
+    assert keys.get("kid-2") is None
+
+    deadline = time.monotonic() + 5
+    while keys.get("kid-2") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert keys.get("kid-2") is not None
+    assert fetches[1] - fetches[0] >= 0.3
+
+
+def test_signing_keys_are_warmed_up_with_the_other_services():
+    import main
+    assert "firebase_keys" in main.services.names
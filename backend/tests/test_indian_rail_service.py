@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+import services.indian_rail_service as indian_rail_service
+from services.cache import Cache
+from services.indian_rail_service import IndianRailService
+from services.rail_fares import RailFareEngine
+
+
+@pytest.fixture
+def rail(tmp_path, monkeypatch):
+    monkeypatch.setenv("IRCTC_QUOTA_STATE_PATH", str(tmp_path / "quota.db"))
+    monkeypatch.setenv("IRCTC_REQUESTS_PER_SECOND", "5")
+    return IndianRailService()
+
+
+def test_station_pairs_take_source_and_destination_alternates_in_turn(rail):
+    pairs = rail._station_pairs(rail.get_station_codes("chennai"), rail.get_station_codes("mumbai"))
+    assert pairs == [("MAS", "CSTM"), ("MAS", "BCT"), ("MS", "CSTM"), ("MAS", "LTT")]
+    # Both sides get alternates before the cap
+    assert any(source != "MAS" for source, _ in pairs)
+
+
+def test_station_pairs_for_a_single_station_origin(rail):
+    pairs = rail._station_pairs(("RPM",), rail.get_station_codes("chennai"))
+    assert pairs == [("RPM", "MAS"), ("RPM", "MS"), ("RPM", "TBM")]
+
+
+class StubResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class StubClient:
+    """Counts upstream calls by kind; trains listed in `slow` answer their schedule late"""
+
+    def __init__(self, slow=(), delay=1.0):
+        self.slow = set(slow)
+        self.delay = delay
+        self.calls = Counter()
+        self.fares = []
+        self._lock = threading.Lock()
+
+    def get(self, path, params=None, timeout=10):
+        if path.startswith("/train-schedule/"):
+            number = path.rsplit("/", 1)[1]
+            self._count("schedule", number)
+            if number in self.slow:
+                time.sleep(self.delay)
+            return StubResponse({"data": {"trainNumber": number, "route": []}})
+        if path.startswith("/train-fare/"):
+            number, _, _, class_code = path.split("/")[2:]
+            self._count("fare", number)
+            # Upstream charges 20% more than the modelled tables
+            return StubResponse({"data": {"general": [{"classType": class_code, "fare": 245 * 1.2}]}})
+        if path == "/api/v1/checkSeatAvailability":
+            self._count("availability", (params["trainNo"], params["classType"]))
+            return StubResponse({"data": [{"current_status": "AVAILABLE-0042"}]})
+        raise AssertionError(f"unexpected call {path}")
+
+    def _count(self, kind, key):
+        with self._lock:
+            self.calls[kind] += 1
+            if kind == "fare":
+                self.fares.append(key)
+
+
+def train(number, train_type, *classes, distance=497):
+    return {"trainNumber": number, "trainType": train_type, "distance": distance,
+            "departure": {"stationCode": "MDU"}, "arrival": {"stationCode": "MAS"},
+            "classes": {code: {} for code in classes}}
+
+
+@pytest.fixture
+def enrich_rail(rail, monkeypatch):
+    monkeypatch.setattr(indian_rail_service, "ENRICH_FARE_SAMPLE_SIZE", 2)
+    rail.lookup_cache = Cache("rail-test", max_entries=4096)
+    return rail
+
+
+def test_enrichment_samples_one_fare_per_type_and_dedupes_lookups(enrich_rail):
+    rail = enrich_rail
+    rail.client = StubClient()
+    trains = [
+        train("12635", "SF", "SL", "3A"),
+        train("12636", "SF", "SL"),
+        train("16101", "EXP", "SL"),
+        train("12635", "SF", "SL"),  # listed twice (e.g. found through two station pairs)
+        train("12951", "RAJ", "3A"),
+    ]
+    enriched = rail.enrich_trains({"source": "MDU", "destination": "MAS", "trains": trains}, "2026-11-01")
+
+    assert rail.client.calls == {"schedule": 4, "availability": 5, "fare": 2}
+    # One sample per train type, up to the sample size: Rajdhani is priced from the tables only
+    assert rail.client.fares == ["12635", "16101"]
+    assert all(item["enrichment"]["complete"] for item in enriched)
+    assert enriched[0]["classes"]["SL"]["available"] == "AVAILABLE-0042"
+    # The sample recalibrated the superfast sleeper table before every train was priced
+    assert enriched[0]["classes"]["SL"]["fare"] > RailFareEngine().fare(497, "SL", "SF")
+    assert enriched[4]["classes"]["3A"]["fare"] == RailFareEngine().fare(497, "3A", "RAJ")
+
+
+def test_enrichment_drops_lookups_that_miss_the_deadline(enrich_rail):
+    rail = enrich_rail
+    rail.client = StubClient(slow={"22671"})
+    trains = [train("22671", "SF", "SL"), train("16101", "EXP", "SL")]
+    started = time.monotonic()
+    enriched = rail.enrich_trains({"source": "MDU", "destination": "MAS", "trains": trains}, "2026-11-01",
+                                  deadline=0.2)
+    assert time.monotonic() - started < 0.8
+    assert enriched[0]["enrichment"] == {"complete": False, "missing": ["schedule"]}
+    assert "schedule" not in enriched[0]
+    # The rest of the batch is not held up by the slow train
+    assert enriched[1]["enrichment"]["complete"]
+    assert enriched[0]["classes"]["SL"]["available"] == "AVAILABLE-0042"
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+import services.irctc_client as irctc_client
+from services.irctc_client import IRCTCClient, QuotaExceeded, TokenBucket
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping only moves the clock"""
+
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(url)
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(irctc_client, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "quota.db")
+
+
+def make_client(state_path, session, **options):
+    options.setdefault("requests_per_second", 2)
+    options.setdefault("monthly_quota", 100)
+    options.setdefault("max_queue_wait", 1)
+    client = IRCTCClient("test-key", state_path=state_path, **options)
+    client._session, client._session_pid = session, os.getpid()
+    return client
+
+
+def test_bucket_refills_at_its_rate(clock, state_path):
+    bucket = TokenBucket(rate=2, capacity=2, monthly_quota=100, state_path=state_path)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.sleep(0.5)
+    assert bucket.try_acquire() == 0
+    # Idle time never refills past the burst capacity
+    clock.sleep(60)
+    assert [bucket.try_acquire() == 0 for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_on_one_state_file_share_the_budget(clock, state_path):
+    first = TokenBucket(rate=1, capacity=2, monthly_quota=100, state_path=state_path)
+    second = TokenBucket(rate=1, capacity=2, monthly_quota=100, state_path=state_path)
+    assert first.try_acquire() == 0
+    assert second.try_acquire() == 0
+    assert first.try_acquire() == pytest.approx(1.0)
+    assert second.usage()["monthlyUsed"] == 2
+
+
+def test_monthly_quota_sheds_calls(clock, state_path):
+    session = FakeSession(FakeResponse())
+    client = make_client(state_path, session, monthly_quota=2)
+    client.get("/api/v3/trainBetweenStations")
+    client.get("/api/v3/trainBetweenStations")
+    with pytest.raises(QuotaExceeded):
+        client.get("/api/v3/trainBetweenStations")
+    assert len(session.calls) == 2
+    stats = client.stats()
+    assert (stats["shedQuotaExhausted"], stats["monthlyRemaining"]) == (1, 0)
+
+
+def test_rate_limited_response_pauses_every_client(clock, state_path):
+    session = FakeSession(FakeResponse(429, {"Retry-After": "30"}), FakeResponse())
+    client = make_client(state_path, session)
+    other = make_client(state_path, FakeSession(FakeResponse()))
+    assert client.get("/api/v3/trainBetweenStations").status_code == 429
+    assert client.stats()["rateLimited"] == 1
+    # The cooldown is longer than anyone is willing to queue for
+    with pytest.raises(QuotaExceeded):
+        other.get("/api/v3/trainBetweenStations")
+    assert other.stats()["shedTimeout"] == 1
+
+    clock.sleep(30)
+    assert client.get("/api/v3/trainBetweenStations").status_code == 200
+
+
+def test_calls_wait_briefly_for_a_token(clock, state_path):
+    client = make_client(state_path, FakeSession(FakeResponse()), requests_per_second=1)
+    client.get("/a")
+    started = clock.now
+    client.get("/b")
+    assert clock.now - started == pytest.approx(1.0)
+
+
+def test_provider_remaining_count_corrects_the_monthly_counter(clock, state_path):
+    session = FakeSession(FakeResponse(200, {"X-RateLimit-Requests-Remaining": "40"}))
+    client = make_client(state_path, session)
+    client.get("/api/v3/trainBetweenStations")
+    assert client.stats()["monthlyUsed"] == 60
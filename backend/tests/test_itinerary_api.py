@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import main
+from database import Base, create_db_engine, get_db
+from services.user_cache import invalidate_user
+
+USERNAME = "itinerary-tester"
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+        # The user cache is process-wide; do not leak this user into other tests
+        invalidate_user(USERNAME)
+        engine.dispose()
+
+
+def test_tables_are_created_at_startup():
+    assert main.create_tables in main.app.router.on_startup
+
+
+def test_saved_itineraries_are_listed_and_fetched(client):
+    account = {"username": USERNAME, "email": "tester@example.com", "password": "s3cret"}
+    assert client.post("/signup", json=account).status_code == 200
+    token = client.post("/login", json=account).json()["access_token"]
+
+    saved = client.post("/itineraries", params={"token": token}, json={
+        "source": "Chennai", "destination": "Goa", "startDate": "2026-11-01",
+        "itinerary": "Day 1: Arrival\nEvening: Baga Beach\n",
+    })
+    assert saved.status_code == 201
+    item_id = saved.json()["id"]
+
+    page = client.get("/itineraries", params={"token": token}).json()
+    assert [item["id"] for item in page["items"]] == [item_id]
+    assert client.get(f"/itineraries/{item_id}", params={"token": token}).json()["structured"][0]["evening"] == "Baga Beach"
+    assert client.get("/itineraries", params={"token": "not-a-token"}).status_code == 401
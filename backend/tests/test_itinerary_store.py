@@ -0,0 +1,50 @@
+from datetime import date, datetime
+
+import pytest
+
+from services.itinerary_store import (
+    compress_text, decode_cursor, decompress_text, encode_cursor, parse_date, parse_itinerary,
+)
+
+ITINERARY = """Here is your plan:
+
+**Day 1: Departure from Chennai to Goa**
+Morning: Board the 12345 Express at 6:00 AM
+Afternoon: Check in near Calangute
+  and rest after the journey
+Evening: Sunset at Baga Beach
+Meals: Fish thali at Britto's (₹800 for 2)
+Accommodation: Beachside guesthouse
+
+Day 2: Exploring Goa
+Morning: Fort Aguada
+"""
+
+
+def test_parse_itinerary_days_and_sections():
+    days = parse_itinerary(ITINERARY)
+    assert [day["day"] for day in days] == [1, 2]
+    assert days[0]["title"] == "Departure from Chennai to Goa"
+    assert days[0]["afternoon"] == "Check in near Calangute and rest after the journey"
+    assert days[0]["meals"].startswith("Fish thali")
+    assert days[1] == {"day": 2, "title": "Exploring Goa", "morning": "Fort Aguada"}
+
+
+def test_text_round_trips_compressed():
+    data = compress_text(ITINERARY * 10)
+    assert len(data) < len((ITINERARY * 10).encode("utf-8")) / 4
+    assert decompress_text(data) == ITINERARY * 10
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    created_at = datetime(2026, 10, 19, 5, 56, 45, 63186)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("zzz")
+
+
+def test_parse_date():
+    assert parse_date("2026-11-01") == date(2026, 11, 1)
+    assert parse_date("2026-11-01T00:00:00.000Z") == date(2026, 11, 1)
+    assert parse_date("next week") is None
+    assert parse_date(None) is None
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+import services.jobs as jobs
+from services.jobs import JobQueue, JobStore, PermanentJobError
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    job_queue = JobQueue(JobStore(str(tmp_path / "jobs.db")), workers=2)
+    yield job_queue
+    job_queue.stop()
+
+
+def wait_for(job_queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = job_queue.get(job_id)
+        if job["status"] in jobs.FINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish: {job}")
+
+
+def test_job_result_is_stored(queue):
+    queue.register("echo", lambda payload: {"itinerary": f"{payload['days']} days in Goa"})
+    job = wait_for(queue, queue.submit("echo", {"days": 3}))
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert job["result"] == {"itinerary": "3 days in Goa"}
+
+
+def test_failed_attempts_are_retried(queue):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        if len(calls) < 3:
+            raise RuntimeError("Gemini API failed: 503")
+        return {"itinerary": "ok"}
+
+    queue.register("flaky", flaky)
+    job = wait_for(queue, queue.submit("flaky", {}))
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 3
+
+
+def test_permanent_errors_and_exhausted_retries_fail(queue):
+    def invalid(payload):
+        raise PermanentJobError("Invalid input data")
+
+    def down(payload):
+        raise RuntimeError("upstream down")
+
+    queue.register("invalid", invalid)
+    queue.register("down", down)
+    invalid_job = wait_for(queue, queue.submit("invalid", {}))
+    down_job = wait_for(queue, queue.submit("down", {}))
+    assert (invalid_job["status"], invalid_job["attempts"]) == ("failed", 1)
+    assert (down_job["status"], down_job["attempts"]) == ("failed", jobs.JOB_MAX_ATTEMPTS)
+    assert down_job["error"] == "upstream down"
+
+
+def test_expired_lease_is_handed_out_again(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.add("echo", {})
+    assert store.claim(lease=-1)["id"] == job_id
+    # The first worker "died": its lease has already run out
+    assert store.claim()["attempts"] == 2
+    assert store.claim() is None
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.add("echo", {}, max_attempts=2)
+    assert store.claim(lease=-1)["attempts"] == 1
+    assert store.claim(lease=-1)["attempts"] == 2
+    # The second worker died too: no third attempt
+    assert store.claim() is None
+    job = store.get(job_id)
+    assert (job["status"], job["attempts"]) == ("failed", 2)
+
+
+def test_invalid_amadeus_input_fails_the_job_without_retries():
+    import main
+
+    handler = main._job_handler(main.create_itinerary_with_amadeus, main.TripRequest)
+    payload = {"source": "Chennai", "destination": "Goa", "numberOfPersons": "2", "transportMode": "train",
+               "budget": "20000", "days": "three", "startDate": "2026-11-01", "endDate": "2026-11-03"}
+    with pytest.raises(PermanentJobError):
+        handler(payload)
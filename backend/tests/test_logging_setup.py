@@ -0,0 +1,89 @@
+import contextvars
+import logging
+import queue
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import services.logging_setup as logging_setup
+from services.logging_setup import (
+    BoundedQueueHandler, ContextFilter, RequestContextMiddleware, endpoint_var, request_id_var,
+)
+from services.runtime import run_blocking
+
+
+def record(level=logging.DEBUG, msg="step %d", args=(1,)):
+    return logging.LogRecord("services.test", level, __file__, 10, msg, args, None)
+
+
+def in_request(func, request_id, endpoint):
+    """Run func with the log context a request would have"""
+    def run():
+        request_id_var.set(request_id)
+        endpoint_var.set(endpoint)
+        return func()
+    return contextvars.copy_context().run(run)
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(record(logging.INFO, "line %d", (i,)))
+    assert handler.dropped == 3
+    first = handler.queue.get_nowait()
+    # Formatted on the caller's side so the writer thread never touches the arguments
+    assert (first.msg, first.args) == ("line 0", None)
+
+
+def test_debug_lines_are_sampled_per_endpoint(monkeypatch):
+    monkeypatch.setattr(logging_setup, "LOG_DEBUG_SAMPLE_RATES", {"/quiet": 0.0, "/loud": 1.0})
+    context_filter = ContextFilter()
+    assert not in_request(lambda: context_filter.filter(record()), "req-1", "/quiet")
+    assert in_request(lambda: context_filter.filter(record()), "req-1", "/loud")
+    # Warnings and above are never sampled away
+    assert in_request(lambda: context_filter.filter(record(logging.WARNING)), "req-1", "/quiet")
+
+
+def test_sampling_keeps_or_drops_a_whole_request(monkeypatch):
+    monkeypatch.setattr(logging_setup, "LOG_DEBUG_SAMPLE_RATE", 0.5)
+    context_filter = ContextFilter()
+    kept = 0
+    for i in range(400):
+        decisions = {in_request(lambda: context_filter.filter(record(msg=f"line {n}", args=())), f"req-{i}", "/api")
+                     for n in range(3)}
+        assert len(decisions) == 1
+        kept += decisions.pop()
+    assert 120 < kept < 280
+
+
+def test_filter_attaches_request_context():
+    item = record(logging.INFO)
+    assert in_request(lambda: ContextFilter().filter(item), "req-7", "/api/travel-data")
+    assert (item.request_id, item.endpoint) == ("req-7", "/api/travel-data")
+
+
+async def context_endpoint(request):
+    return JSONResponse({
+        "requestId": request_id_var.get(),
+        "endpoint": endpoint_var.get(),
+        "workerRequestId": await run_blocking(request_id_var.get),
+    })
+
+
+def client():
+    return TestClient(RequestContextMiddleware(Starlette(routes=[Route("/context", context_endpoint)])))
+
+
+def test_request_id_reaches_handlers_workers_and_the_response():
+    response = client().get("/context", headers={"X-Request-ID": "trace-abc"})
+    assert response.headers["x-request-id"] == "trace-abc"
+    assert response.json() == {"requestId": "trace-abc", "endpoint": "/context", "workerRequestId": "trace-abc"}
+
+
+def test_request_id_is_generated_when_missing():
+    response = client().get("/context")
+    body = response.json()
+    assert len(body["requestId"]) == 16
+    assert response.headers["x-request-id"] == body["requestId"] == body["workerRequestId"]
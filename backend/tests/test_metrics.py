@@ -0,0 +1,44 @@
+import pytest
+
+from services.metrics import Registry, upstream_call, UPSTREAM_CALLS, UPSTREAM_LATENCY
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, "/a")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.counter("calls_total", "test", ("path",))
+    counter.inc('a"b\\c')
+    assert 'calls_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_gauge_callback_and_label_count():
+    registry = Registry()
+    gauge = registry.gauge("mock_mode", "test")
+    gauge.set_function(lambda: 1.0)
+    assert "mock_mode 1" in registry.render()
+    with pytest.raises(ValueError):
+        registry.counter("labelled_total", "test", ("a",)).inc()
+
+
+def test_upstream_call_records_status_and_errors():
+    with upstream_call("test_upstream") as call:
+        call.status = 200
+    with pytest.raises(TimeoutError):
+        with upstream_call("test_upstream"):
+            raise TimeoutError()
+
+    assert UPSTREAM_CALLS.value("test_upstream", 200) == 1
+    assert UPSTREAM_CALLS.value("test_upstream", "TimeoutError") == 1
+    assert UPSTREAM_LATENCY.count("test_upstream") == 2
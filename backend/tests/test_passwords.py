@@ -0,0 +1,48 @@
+import pytest
+
+from services.passwords import HasherBusy, PasswordHasher, hash_password, hash_rounds
+
+
+def test_hash_and_verify_inline():
+    hasher = PasswordHasher(workers=0, rounds=4)
+    hashed = hasher.hash("s3cret")
+    assert hash_rounds(hashed) == 4
+    assert hasher.verify("s3cret", hashed)
+    assert not hasher.verify("wrong", hashed)
+    assert not hasher.verify("s3cret", "not-a-bcrypt-hash")
+
+
+def test_login_rehashes_when_cost_changes():
+    old_hash = hash_password("s3cret", rounds=4)
+    hasher = PasswordHasher(workers=0, rounds=5)
+    valid, new_hash = hasher.verify_and_update("s3cret", old_hash)
+    assert valid and hash_rounds(new_hash) == 5
+    assert hasher.verify_and_update("s3cret", new_hash) == (True, None)
+    assert hasher.verify_and_update("wrong", old_hash) == (False, None)
+
+
+def test_process_pool():
+    hasher = PasswordHasher(workers=1, rounds=4)
+    try:
+        assert hasher.verify("s3cret", hasher.hash("s3cret"))
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_pool_refuses_work():
+    with pytest.raises(HasherBusy):
+        PasswordHasher(workers=0, max_pending=0).hash("s3cret")
+
+
+def test_hashing_metrics_are_exported_by_the_app():
+    from fastapi.testclient import TestClient
+
+    import main
+    import routers.auth
+    from services import passwords
+
+    # The auth router shares main's module (and so its metrics registry)
+    assert routers.auth.password_hasher is passwords.password_hasher
+    body = TestClient(main.app).get("/metrics").text
+    assert "password_hash_pending" in body
+    assert "password_hash_rejected_total" in body
@@ -0,0 +1,100 @@
+import threading
+
+import numpy as np
+import pytest
+
+from services.rail_fares import CLASS_CODES, SCALE_BOUNDS, RailFareEngine, parse_upstream_fares
+
+
+@pytest.fixture
+def engine():
+    return RailFareEngine()
+
+
+@pytest.mark.parametrize("distance, class_type, train_type, expected", [
+    # 500 km slab, first taper band: 0.45 * 500 + 20 reservation, no GST
+    (497, "SL", "EXP", 245),
+    # 1200 km: 500 + 500 * 0.85 + 200 * 0.7 chargeable km; superfast charge and 5% GST
+    (1200, "3A", "SF", 1390),
+    (1200, "2A", "RAJ", 2545),
+    # Below the class minimum the minimum distance is charged
+    (50, "SL", None, 110),
+])
+def test_known_fares(engine, distance, class_type, train_type, expected):
+    assert engine.fare(distance, class_type, train_type) == expected
+
+
+def test_fares_are_flat_within_a_slab_and_step_up_after_it(engine):
+    assert {engine.fare(km, "SL") for km in (496, 498, 500)} == {245}
+    assert engine.fare(501, "SL") == 250
+    assert engine.fare(50, "SL") == engine.fare(200, "SL")
+
+
+def test_fare_matrix_covers_trains_classes_and_group_sizes(engine):
+    matrix = engine.fare_matrix([497, 1200], ["EXP", "SF"], passengers=(1, 3))
+    assert matrix.shape == (2, len(CLASS_CODES), 2)
+    assert matrix[0, CLASS_CODES.index("SL")].tolist() == [245, 735]
+    assert matrix[1, CLASS_CODES.index("3A"), 0] == 1390
+    assert engine.fare_matrix([], []).shape == (0, len(CLASS_CODES), 1)
+    assert engine.fare(497, "XX") is None
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("SF", "SUPERFAST"), ("Rajdhani", "RAJDHANI"), ("12951 MUMBAI RAJDHANI", "RAJDHANI"), ("", "MAIL EXPRESS"),
+])
+def test_train_type_labels(engine, label, expected):
+    assert engine.normalize_train_type(label) == expected
+
+
+def test_refresh_moves_fares_towards_observed_ones(engine):
+    assert engine.refresh([("EXP", "SL", 497, 245 * 1.5)]) == 1
+    # 0.7 * 1.0 + 0.3 * 1.5
+    assert engine.fare(497, "SL", "EXP") == 285
+    # Only that train type and class is recalibrated
+    assert engine.fare(497, "SL", "SF") == RailFareEngine().fare(497, "SL", "SF")
+    assert engine.refresh([("EXP", "XX", 497, 300), ("EXP", "SL", 0, 300), ("EXP", "SL", 497, None)]) == 0
+
+
+def test_calibration_is_bounded(engine):
+    engine.refresh([("EXP", "SL", 497, 245 * 10)] * 50)
+    assert engine.scale.max() == SCALE_BOUNDS[1]
+
+
+def test_concurrent_refreshes_lose_no_update(engine):
+    threads = [
+        threading.Thread(target=lambda: [engine.refresh([("EXP", "SL", 497, 245 * 1.5)]) for _ in range(3)])
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Twelve updates of the same ratio: 1.5 - 0.5 * 0.7 ** 12 (a lost update leaves 0.7 ** 11)
+    t, c = engine.type_index["MAIL EXPRESS"], engine.class_index["SL"]
+    assert engine.scale[t, c] == pytest.approx(1.5 - 0.5 * 0.7 ** 12, rel=1e-12)
+    assert np.count_nonzero(engine.scale != 1.0) == 1
+
+
+def test_refresh_updates_under_the_scale_lock(engine):
+    class RecordingLock:
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.entered = 0
+
+        def __enter__(self):
+            self.lock.acquire()
+            self.entered += 1
+
+        def __exit__(self, *exc):
+            self.lock.release()
+
+    engine._scale_lock = RecordingLock()
+    assert engine.refresh([("EXP", "SL", 497, 300), ("SF", "3A", 1200, 1400)]) == 2
+    assert engine._scale_lock.entered == 2
+
+
+def test_parse_upstream_fares():
+    data = {"data": {"general": [{"classType": "SL", "fare": "245"}, {"classType": "3A", "fare": None}]}}
+    assert parse_upstream_fares(data) == [("SL", 245.0)]
+    assert parse_upstream_fares({"data": [{"class": "2A", "totalFare": 1500}]}) == [("2A", 1500.0)]
+    assert parse_upstream_fares("oops") == []
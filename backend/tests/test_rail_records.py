@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from services.rail_records import Train, parse_distance, parse_trains
+
+TRAIN = {
+    "train_number": "12635",
+    "train_name": "Vaigai Express",
+    "distance": 497,
+    "train_type": "SF",
+    "class_type": ["SL", "3A"],
+    "from_std": "06:40",
+    "to_std": "14:20",
+}
+
+
+def numbers(trains):
+    return [t.number for t in trains]
+
+
+def test_known_key_list():
+    trains, errors = parse_trains(json.dumps({"status": True, "data": [TRAIN]}), "MDU", "MAS")
+    assert numbers(trains) == ["12635"]
+    assert errors is None
+
+
+def test_leading_list():
+    trains, errors = parse_trains(json.dumps([TRAIN, dict(TRAIN, train_number="12636")]), "MDU", "MAS")
+    assert numbers(trains) == ["12635", "12636"]
+    assert errors is None
+
+
+def test_list_under_non_standard_key():
+    payload = {"meta": {"count": 1}, "other": [{"x": 1}], "trainsFound": [TRAIN]}
+    trains, _ = parse_trains(json.dumps(payload).encode(), "MDU", "MAS")
+    assert numbers(trains) == ["12635"]
+
+
+def test_errors_before_list():
+    trains, errors = parse_trains(json.dumps({"errors": ["bad date"], "data": [TRAIN]}), "MDU", "MAS")
+    assert errors == ["bad date"]
+    assert numbers(trains) == ["12635"]
+
+
+def test_errors_after_list():
+    trains, errors = parse_trains(json.dumps({"data": [TRAIN], "errors": ["bad date"]}), "MDU", "MAS")
+    assert errors == ["bad date"]
+    assert numbers(trains) == ["12635"]
+
+
+@pytest.mark.parametrize("payload", ['{"data": []}', "[]", "{}", '{"data": [1, "x", null]}'])
+def test_empty_lists(payload):
+    trains, errors = parse_trains(payload, "MDU", "MAS")
+    assert trains == []
+    assert errors is None
+
+
+@pytest.mark.parametrize("payload", ['{"data": [{"train_number": "1"', '{"data" [] }', '{"data": [1 2]}'])
+def test_malformed_input(payload):
+    with pytest.raises(ValueError):
+        parse_trains(payload, "MDU", "MAS")
+
+
+def test_decoded_payload_matches_text():
+    payload = {"result": [TRAIN]}
+    from_text, _ = parse_trains(json.dumps(payload), "MDU", "MAS")
+    from_dict, _ = parse_trains(payload, "MDU", "MAS")
+    assert [t.to_dict() for t in from_text] == [t.to_dict() for t in from_dict]
+
+
+def test_string_distance_is_parsed():
+    trains, _ = parse_trains(json.dumps({"data": [dict(TRAIN, distance="1200 km")]}), "MDU", "MAS")
+    assert trains[0].distance_km == 1200
+    assert trains[0].to_dict()["distance"] == "1200 km"
+    assert parse_distance("n/a", 485) == 485
+
+
+def test_train_is_slotted_and_interned():
+    trains, _ = parse_trains(json.dumps({"data": [TRAIN, TRAIN]}), "MD" + "U", "MAS")
+    assert not hasattr(trains[0], "__dict__")
+    assert trains[0].from_code is trains[1].from_code
+    assert isinstance(trains[0], Train)
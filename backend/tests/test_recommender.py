@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from services.providers import BlockingProvider, Provider
+from services.recommender import generate_trip_plan, generate_trip_plan_async
+
+
+class SleepyProvider(Provider):
+    def __init__(self, name, delay, deadline=1.0, fail=False):
+        self.name = self.section = name
+        self.delay = delay
+        self.deadline = deadline
+        self.fail = fail
+
+    async def fetch(self, preferences):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return [{"name": f"{self.name} for {preferences['destination']}"}]
+
+
+def test_providers_run_concurrently():
+    providers = [SleepyProvider(name, 0.2) for name in ("flights", "hotels", "restaurants")]
+    started = time.perf_counter()
+    plan = asyncio.run(generate_trip_plan_async({"destination": "Goa"}, providers))
+    assert time.perf_counter() - started < 0.5
+    assert plan["hotels"] == [{"name": "hotels for Goa"}]
+    assert not plan["partial"]
+
+
+def test_late_and_failing_providers_give_a_partial_plan():
+    providers = [
+        SleepyProvider("flights", 0.01),
+        SleepyProvider("hotels", 5, deadline=0.1),
+        SleepyProvider("restaurants", 0.01, fail=True),
+        BlockingProvider("trains", "trains", lambda preferences: ["12951"]),
+    ]
+    started = time.perf_counter()
+    plan = asyncio.run(generate_trip_plan_async({"destination": "Goa"}, providers))
+    assert time.perf_counter() - started < 1
+    assert plan["partial"]
+    assert plan["flights"] and plan["trains"] == ["12951"]
+    assert plan["hotels"] == [] and plan["restaurants"] == []
+    assert plan["providers"]["hotels"]["status"] == "timeout"
+    assert plan["providers"]["restaurants"] == {"status": "error", "error": "provider down", "ms": plan["providers"]["restaurants"]["ms"]}
+
+
+def test_default_plan_keeps_its_shape():
+    plan = generate_trip_plan({"origin": "Delhi", "destination": "Goa", "days": 4, "food_pref": "veg"})
+    assert plan["summary"] == "Delhi -> Goa for 4 days"
+    assert plan["flights"] and plan["hotels"] and plan["restaurants"]
+    assert not plan["partial"]
+
+
+def test_blocking_builtin_provider_times_out_without_holding_the_others(monkeypatch):
+    from services import travel_api
+    from services.scraper import HotelProvider
+
+    def slow_flights(origin, destination, date):
+        time.sleep(1)
+        return [{"airline": "late"}]
+
+    monkeypatch.setattr(travel_api, "get_flights", slow_flights)
+    flights = travel_api.FlightProvider()
+    flights.deadline = 0.2
+    started = time.perf_counter()
+    plan = asyncio.run(generate_trip_plan_async({"destination": "Goa"}, [flights, HotelProvider()]))
+    assert time.perf_counter() - started < 0.9
+    assert plan["providers"]["flights"]["status"] == "timeout"
+    assert plan["providers"]["hotels"]["status"] == "ok" and plan["providers"]["hotels"]["ms"] < 500
@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from services.responses import CompressionMiddleware, FastJSONResponse, dumps
+
+PAYLOAD = {"hotels": [{"name": f"Hotel {i}", "rating": 4.5, "amenities": ["WIFI", "POOL"]} for i in range(100)]}
+
+
+def client():
+    app = Starlette(routes=[
+        Route("/big", lambda request: FastJSONResponse(PAYLOAD)),
+        Route("/small", lambda request: FastJSONResponse({"ok": True})),
+        Route("/binary", lambda request: PlainTextResponse("x" * 5000, media_type="application/octet-stream")),
+        Route("/stream", lambda request: StreamingResponse(iter([b"a" * 2000, b"b" * 2000]), media_type="text/plain")),
+    ])
+    return TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+
+def test_dumps_handles_numpy_and_non_string_keys():
+    assert json.loads(dumps({1: np.int64(5), "fares": np.array([1, 2])})) == {"1": 5, "fares": [1, 2]}
+
+
+def test_large_json_is_gzipped():
+    response = client().get("/big", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(dumps(PAYLOAD))
+    assert response.json() == PAYLOAD
+
+
+def test_small_binary_and_streaming_bodies_are_untouched():
+    test_client = client()
+    for path in ("/small", "/binary", "/stream"):
+        response = test_client.get(path, headers={"accept-encoding": "gzip"})
+        assert "content-encoding" not in response.headers, path
+
+
+def test_identity_when_client_does_not_accept_compression():
+    response = client().get("/big", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == PAYLOAD
@@ -0,0 +1,80 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import services.runtime as runtime
+from services.runtime import LoopStallMonitor, run_blocking, submit_in_context
+
+request_id = contextvars.ContextVar("request_id")
+
+
+def test_run_blocking_caps_calls_in_flight(monkeypatch):
+    monkeypatch.setattr(runtime, "PROVIDER_MAX_PENDING", 2)
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def provider_call():
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        return threading.current_thread().name
+
+    async def main():
+        return await asyncio.gather(*(run_blocking(provider_call) for _ in range(6)))
+
+    names = asyncio.run(main())
+    assert state["peak"] == 2
+    assert all(name.startswith("provider") for name in names)
+
+
+def test_context_variables_reach_the_worker_thread():
+    async def main():
+        request_id.set("req-42")
+        return await run_blocking(request_id.get)
+
+    assert asyncio.run(main()) == "req-42"
+
+    request_id.set("req-43")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert submit_in_context(executor, request_id.get).result() == "req-43"
+        # A plain submit runs in the worker's own (empty) context
+        with pytest.raises(LookupError):
+            executor.submit(request_id.get).result()
+
+
+def test_stall_monitor_reports_a_blocking_call():
+    monitor = LoopStallMonitor("production", threshold=0.1)
+
+    async def main():
+        monitor.start()
+        monitor.tag_current_task("GET /slow")
+        await asyncio.sleep(0.05)
+        time.sleep(0.4)  # blocks the event loop
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(main())
+    assert monitor.stall_count == 1
+    stall = monitor.report()[0]
+    assert stall["endpoint"] == "GET /slow"
+    assert stall["blockedMs"] >= 100
+    assert any("time.sleep(0.4)" in line for line in stall["stack"])
+
+
+def test_stall_monitor_is_quiet_when_the_loop_keeps_running():
+    monitor = LoopStallMonitor("production", threshold=0.1)
+
+    async def main():
+        monitor.start()
+        await asyncio.sleep(0.3)
+        monitor.stop()
+
+    asyncio.run(main())
+    assert monitor.stall_count == 0
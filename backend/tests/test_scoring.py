@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+
+from services.amadeus_service import AmadeusService
+from services.scoring import (EARTH_RADIUS_KM, Candidates, Preferences, haversine_km, rank_hotels, rank_restaurants,
+                              score_hotels, unit_vectors)
+
+CALANGUTE = {"coordinates": {"latitude": 15.5439, "longitude": 73.7553}}
+BAGA = {"coordinates": {"latitude": 15.5553, "longitude": 73.7517}}
+
+HOTELS = [
+    {"name": "Budget Far Inn", "pricePerNight": 1500, "rating": 3.5, "latitude": 15.2, "longitude": 74.1,
+     "amenities": ["WIFI"]},
+    {"name": "Beach Palace", "pricePerNight": 12000, "rating": 5, "latitude": 15.55, "longitude": 73.75,
+     "amenities": ["SWIMMING_POOL", "ELEVATOR", "WHEELCHAIR_ACCESSIBLE"]},
+    {"name": "Calangute Comfort", "price": "₹2,400/night", "rating": 4.2, "latitude": 15.545, "longitude": 73.756,
+     "amenities": ["ELEVATOR", "Wheelchair accessible rooms"]},
+]
+
+
+def test_distances_agree_with_haversine():
+    # One degree of longitude on the equator
+    assert abs(float(haversine_km(0, 0, 0, 1)) - 111.195) < 0.01
+
+    lat, lon = np.array([15.2, 18.94]), np.array([74.1, 72.84])
+    angles = np.arccos(np.clip(unit_vectors(lat, lon) @ unit_vectors(np.array([28.63]), np.array([77.22])).T, -1, 1))
+    assert np.allclose(angles[:, 0] * EARTH_RADIUS_KM, haversine_km(lat, lon, 28.63, 77.22))
+
+
+def test_best_hotel_balances_budget_access_and_location():
+    preferences = Preferences.for_trip(30000, 2, 5, "Veg", ["Wheelchair Access"], [CALANGUTE, BAGA])
+    assert preferences.nightly_budget == 2400
+
+    ranked = rank_hotels(HOTELS, preferences, 3)
+    assert [h["name"] for h in ranked] == ["Calangute Comfort", "Beach Palace", "Budget Far Inn"]
+    assert ranked[0]["matchScore"] > ranked[1]["matchScore"]
+
+
+def test_missing_signals_do_not_penalize():
+    hotels = [{"name": "Unknown", "price": "on request"}, {"name": "Rated", "rating": 4.5}]
+    scores = score_hotels(Candidates.hotels(hotels), Preferences())
+    assert np.all(np.isfinite(scores))
+    assert scores[1] > scores[0]
+
+
+def test_restaurants_follow_food_preference():
+    restaurants = [
+        {"name": "Ritz Classic", "cost_for_two": 1200, "veg_friendly": False, "rating": 4.7},
+        {"name": "Shree Krishna", "cost_for_two": 450, "veg_friendly": True, "rating": 4.1},
+    ]
+    veg = rank_restaurants(restaurants, Preferences.for_trip(20000, 2, 4, "Vegetarian"))
+    assert veg[0]["name"] == "Shree Krishna"
+    anything = rank_restaurants(restaurants, Preferences.for_trip(200000, 2, 4, "Non-Veg"))
+    assert anything[0]["name"] == "Ritz Classic"
+
+
+def test_thousands_of_candidates_score_in_one_pass():
+    rng = np.random.default_rng(3)
+    hotels = [{"name": f"H{i}", "pricePerNight": float(p), "rating": float(r), "latitude": float(lat),
+               "longitude": 73.75, "amenities": ["ELEVATOR"] if i % 3 else []}
+              for i, (p, r, lat) in enumerate(zip(rng.uniform(800, 9000, 5000), rng.uniform(2, 5, 5000),
+                                                  rng.uniform(15.3, 15.8, 5000)))]
+    candidates = Candidates.hotels(hotels)
+    preferences = Preferences.for_trip(50000, 2, 5, "Veg", ["Senior citizens"], [CALANGUTE, BAGA])
+    score_hotels(candidates, preferences)
+
+    started = time.perf_counter()
+    scores = score_hotels(candidates, preferences)
+    assert time.perf_counter() - started < 0.02
+    assert scores.shape == (5000,)
+
+
+def test_amadeus_hotels_carry_nightly_price_and_location():
+    service = AmadeusService.__new__(AmadeusService)
+    hotel = service._format_hotel_options(service._mock_hotel_data())[0]
+    # 2596 INR for a two-night stay
+    assert hotel["pricePerNight"] == 1298 and hotel["price"] == "₹1298/night"
+    assert (hotel["latitude"], hotel["longitude"]) == (13.0827, 80.2707)
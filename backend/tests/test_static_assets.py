@@ -0,0 +1,55 @@
+import gzip
+
+from services.compression import negotiate_encoding
+from services.static_assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, StaticAssets
+
+BUNDLE = b"console.log('dream destiny');\n" * 200
+
+
+def build(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "static" / "js" / "main.1a2b3c4d.js").write_bytes(BUNDLE)
+    (tmp_path / "index.html").write_bytes(b"<html></html>")
+    assets = StaticAssets(str(tmp_path))
+    assets.load()
+    return assets
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("br;q=0.5, gzip;q=0.8", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("gzip;q=0", ("gzip",)) is None
+    assert negotiate_encoding("*", ("br", "gzip")) == "br"
+    assert negotiate_encoding(None) is None
+
+
+def test_hashed_bundle_is_compressed_and_immutable(tmp_path):
+    response = build(tmp_path).response("static/js/main.1a2b3c4d.js", {"accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.body) == BUNDLE
+
+
+def test_if_none_match_returns_304(tmp_path):
+    assets = build(tmp_path)
+    first = assets.response("static/js/main.1a2b3c4d.js", {"accept-encoding": "gzip"})
+    etag = first.headers["etag"]
+    again = assets.response("static/js/main.1a2b3c4d.js", {"accept-encoding": "gzip", "if-none-match": f"W/{etag}"})
+    assert again.status_code == 304
+    assert again.body == b""
+
+
+def test_unhashed_files_revalidate_and_missing_files_return_none(tmp_path):
+    assets = build(tmp_path)
+    index = assets.response("index.html", {})
+    assert index.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    assert "content-encoding" not in index.headers
+    assert assets.response("static/js/missing.js", {}) is None
+
+
+def test_missing_build_directory(tmp_path):
+    assets = StaticAssets(str(tmp_path / "no-build"))
+    assert assets.load()["files"] == 0
+    assert assets.response("index.html", {}) is None
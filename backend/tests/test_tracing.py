@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.runtime import submit_in_context
+from services.tracing import Tracer, to_otlp
+
+
+class ListExporter:
+    def __init__(self):
+        self.batches = []
+        self.exported = threading.Event()
+
+    def export(self, spans):
+        self.batches.append(spans)
+        self.exported.set()
+
+
+def make_tracer(sample_rate=0.0, slow_threshold=10.0):
+    exporter = ListExporter()
+    return Tracer([exporter], sample_rate=sample_rate, slow_threshold=slow_threshold), exporter
+
+
+def test_spans_outside_a_trace_are_not_recorded():
+    tracer, exporter = make_tracer(sample_rate=1.0)
+    with tracer.span("orphan") as span:
+        assert span is None
+    assert not exporter.batches
+
+
+def test_child_spans_follow_context_into_threads():
+    tracer, exporter = make_tracer(sample_rate=1.0)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with tracer.span("request", root=True) as root:
+            def work():
+                with tracer.span("worker") as child:
+                    return child
+            child = submit_in_context(pool, work).result()
+
+    assert exporter.exported.wait(2)
+    names = [span.name for span in exporter.batches[0]]
+    assert names == ["worker", "request"]
+    assert child.parent_id == root.span_id
+    assert child.trace is root.trace
+
+
+def test_slow_and_failed_requests_are_always_kept():
+    tracer, exporter = make_tracer(sample_rate=0.0, slow_threshold=0.0)
+    with tracer.span("slow", root=True):
+        pass
+    assert exporter.exported.wait(2)
+
+    tracer, exporter = make_tracer(sample_rate=0.0)
+    try:
+        with tracer.span("failed", root=True):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert exporter.exported.wait(2)
+    assert exporter.batches[0][0].error == "ValueError: boom"
+
+    tracer, exporter = make_tracer(sample_rate=0.0)
+    with tracer.span("fast", root=True):
+        pass
+    assert not exporter.exported.wait(0.1)
+
+
+def test_otlp_payload_shape():
+    tracer, exporter = make_tracer(sample_rate=1.0)
+    with tracer.span("request", root=True, trace_id="a" * 32, **{"http.status_code": 200}):
+        pass
+    assert exporter.exported.wait(2)
+    spans = to_otlp(exporter.batches[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["traceId"] == "a" * 32
+    assert spans[0]["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
@@ -0,0 +1,55 @@
+import time
+
+from services.user_cache import CachedUser, decode_token, get_user, invalidate_user
+
+
+class FakeUser:
+    def __init__(self, id, username, email):
+        self.id, self.username, self.email = id, username, email
+        self.hashed_password = "$2b$12$..."
+
+
+def test_user_is_loaded_once_until_invalidated():
+    loads = []
+    db = {"asha": FakeUser(1, "asha", "asha@example.com")}
+
+    def load(name):
+        loads.append(name)
+        return db.get(name)
+
+    exp = time.time() + 600
+    assert get_user("asha", exp, load).email == "asha@example.com"
+    user = get_user("asha", exp, load)
+    assert isinstance(user, CachedUser) and not hasattr(user, "hashed_password")
+    assert loads == ["asha"]
+
+    db["asha"].email = "asha@new.example.com"
+    invalidate_user("asha")
+    assert get_user("asha", exp, load).email == "asha@new.example.com"
+    assert loads == ["asha", "asha"]
+
+
+def test_unknown_users_and_expired_tokens_are_not_cached():
+    loads = []
+
+    def load(name):
+        loads.append(name)
+        return None if name == "ghost" else FakeUser(2, name, "x@example.com")
+
+    assert get_user("ghost", None, load) is None
+    assert get_user("ghost", None, load) is None
+    get_user("expired", time.time() - 1, load)
+    get_user("expired", time.time() - 1, load)
+    assert loads == ["ghost", "ghost", "expired", "expired"]
+
+
+def test_decoded_tokens_are_reused():
+    decodes = []
+
+    def decode(token):
+        decodes.append(token)
+        return {"sub": "asha", "exp": time.time() + 600}
+
+    assert decode_token("token-a", decode)["sub"] == "asha"
+    decode_token("token-a", decode)
+    assert decodes == ["token-a"]